@@ -0,0 +1,127 @@
+"""Benchmark the single-pass JATS extractor against the previous four-walk implementation.
+
+Run from the project root:
+
+    python benchmarks/bench_jats_parser.py [path/to/article.xml ...]
+
+Without arguments, the JATS fixtures in ``tests/test_data`` are used. Every article is measured as
+published and as a large review, made by repeating its body ``--repeat`` times.
+"""
+
+from __future__ import annotations
+import argparse
+import io
+import re
+import timeit
+import xml.etree.ElementTree as ET
+from pathlib import Path
+import pandas as pd
+from aoptk.literature.jats_parser import JATSArticle
+from aoptk.literature.jats_parser import parse_jats
+
+FIXTURES = sorted(Path("tests/test_data").glob("jats_*.xml"))
+
+
+def four_walk_parse(xml: bytes) -> JATSArticle:
+    """Parse the article as before: build the whole tree, then walk it once per section.
+
+    Args:
+        xml (bytes): The XML content.
+    """
+    root = ET.parse(io.BytesIO(xml)).getroot()
+    abstract_elem = root.find(".//abstract")
+    abstract = " ".join(abstract_elem.itertext()).strip() if abstract_elem is not None else ""
+    full_text = [
+        text
+        for element in root.iter()
+        if element.tag in {"title", "p"} and (text := "".join(element.itertext()).strip())
+    ]
+    figure_descriptions = [
+        text for element in root.iter() if element.tag == "fig" and (text := "".join(element.itertext()).strip())
+    ]
+    tables = [
+        pd.DataFrame(_extract_rows(table_elem))
+        for element in root.iter()
+        if element.tag == "table-wrap" and (table_elem := element.find(".//table")) is not None
+    ]
+    return JATSArticle(
+        abstract=abstract,
+        full_text="\n\n".join(full_text),
+        figure_descriptions="\n\n".join(figure_descriptions),
+        tables=tables,
+    )
+
+
+def _extract_rows(table_elem: ET.Element) -> list[list[str]]:
+    """Extract the rows of a table the way the four-walk implementation did.
+
+    Args:
+        table_elem (ET.Element): The XML element representing the table.
+    """
+    rows = []
+    for row in table_elem.findall(".//tr"):
+        cells = ["".join(cell.itertext()).strip() for cell in row.findall(".//td")]
+        if not cells:
+            cells = ["".join(cell.itertext()).strip() for cell in row.findall(".//th")]
+        rows.append(cells)
+    return rows
+
+
+def single_pass_parse(xml: bytes) -> JATSArticle:
+    """Parse the article with the single-pass extractor.
+
+    Args:
+        xml (bytes): The XML content.
+    """
+    return parse_jats(io.BytesIO(xml))
+
+
+def enlarge(xml: bytes, repeat: int) -> bytes:
+    """Turn an article into a large review by repeating the content of its body.
+
+    Args:
+        xml (bytes): The XML content.
+        repeat (int): How many times the body is repeated.
+    """
+    return re.sub(rb"(?s)(<body>)(.*)(</body>)", lambda match: match[1] + match[2] * repeat + match[3], xml)
+
+
+def assert_same(expected: JATSArticle, actual: JATSArticle) -> None:
+    """Check that both implementations extract the same sections.
+
+    Args:
+        expected (JATSArticle): Sections extracted by the four-walk implementation.
+        actual (JATSArticle): Sections extracted by the single-pass extractor.
+    """
+    assert expected.abstract == actual.abstract
+    assert expected.full_text == actual.full_text
+    assert expected.figure_descriptions == actual.figure_descriptions
+    assert len(expected.tables) == len(actual.tables)
+    for expected_table, actual_table in zip(expected.tables, actual.tables, strict=True):
+        pd.testing.assert_frame_equal(expected_table, actual_table)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", type=Path, default=FIXTURES)
+    parser.add_argument("--repeat", type=int, default=100, help="Body repetitions of the large review.")
+    parser.add_argument("--number", type=int, default=20, help="Parses per measurement.")
+    args = parser.parse_args()
+
+    print(f"{'article':<40} {'tables':>7} {'four walks [ms]':>16} {'single pass [ms]':>17} {'speedup':>8}")
+    for path in args.paths:
+        xml = path.read_bytes()
+        for name, content in ((path.name, xml), (f"{path.name} x{args.repeat}", enlarge(xml, args.repeat))):
+            expected = four_walk_parse(content)
+            assert_same(expected, single_pass_parse(content))
+            four_walks = min(timeit.repeat(lambda c=content: four_walk_parse(c), number=args.number, repeat=3))
+            single_pass = min(timeit.repeat(lambda c=content: single_pass_parse(c), number=args.number, repeat=3))
+            print(
+                f"{name:<40} {len(expected.tables):>7} {four_walks / args.number * 1000:>16.2f} "
+                f"{single_pass / args.number * 1000:>17.2f} {four_walks / single_pass:>7.2f}x",
+            )
+
+
+if __name__ == "__main__":
+    main()
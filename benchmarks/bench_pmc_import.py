@@ -0,0 +1,50 @@
+"""Benchmark the start-up cost of a worker process that imports the PMC module.
+
+Run from the project root:
+
+    python benchmarks/bench_pmc_import.py [--number 10]
+
+Every measurement starts a fresh interpreter, like a short-lived worker process does. The module now
+creates its S3 client on first use, so a worker that never touches S3 only pays for the import, while
+the eager variant pays for boto3 and the client up front, as every import did before.
+"""
+
+from __future__ import annotations
+import argparse
+import statistics
+import subprocess
+import sys
+
+SCENARIOS = {
+    "import only (lazy client)": "import aoptk.literature.databases.pmc",
+    "import + S3 client (eager)": (
+        "import aoptk.literature.databases.pmc as pmc; pmc.shared_s3_client().get_paginator('list_objects_v2')"
+    ),
+}
+
+
+def measure(statement: str) -> float:
+    """Run the statement in a fresh interpreter and return its wall time in milliseconds.
+
+    Args:
+        statement (str): The Python statement to run.
+    """
+    code = f"import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout  # noqa: S603
+    return float(output) * 1000
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=10, help="Fresh interpreters per scenario.")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<30} {'median [ms]':>12} {'min [ms]':>10}")
+    for name, statement in SCENARIOS.items():
+        timings = [measure(statement) for _ in range(args.number)]
+        print(f"{name:<30} {statistics.median(timings):>12.1f} {min(timings):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark the per-call overhead of rendering a prompt template.
+
+Run from the project root:
+
+    python benchmarks/bench_render_prompt.py [--number 2000]
+
+Compares reading and compiling the template file on every call, as `_render_prompt` did before,
+with rendering a template from the process-wide registry, with and without hot reload.
+"""
+
+from __future__ import annotations
+import argparse
+import timeit
+from pathlib import Path
+from jinja2 import Template
+from aoptk.chemical import Chemical
+from aoptk.effect import Effect
+from aoptk.prompt_templates import prompt_templates
+from aoptk.relationships.relationship_type import Causative
+from aoptk.text_generation_api import TextGenerationAPI
+
+TEMPLATE = TextGenerationAPI.relationship_text_prompt_template
+CONTEXT = {
+    "text": Path("tests/test_data/PMC12416454.txt").read_text(encoding="utf-8"),
+    "chem": Chemical(name="thioacetamide").name,
+    "effect": Effect(name="liver fibrosis").name,
+    "rel_type": Causative(),
+    "other_topics": "inhibition",
+    "specification_relationship_text_prompt": "",
+}
+
+
+def compile_every_call() -> str:
+    """Render the template the way `_render_prompt` did before the registry."""
+    with (TextGenerationAPI.prompts_dir / TEMPLATE).open(encoding="utf-8") as template_file:
+        template_content = template_file.read()
+    return str(Template(template_content).render(**CONTEXT))
+
+
+def registry(auto_reload: bool) -> str:
+    """Render the template from the registry.
+
+    Args:
+        auto_reload (bool): Whether the registry checks the template file for changes.
+    """
+    templates = prompt_templates((TextGenerationAPI.prompts_dir,), auto_reload=auto_reload)
+    return templates.get_template(TEMPLATE).render(**CONTEXT)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="Renders per measurement.")
+    args = parser.parse_args()
+
+    scenarios = {
+        "read + compile every call": compile_every_call,
+        "registry": lambda: registry(auto_reload=False),
+        "registry with hot reload": lambda: registry(auto_reload=True),
+    }
+    expected = compile_every_call()
+    print(f"{'scenario':<28} {'per call [us]':>14}")
+    for name, render in scenarios.items():
+        assert render() == expected
+        seconds = min(timeit.repeat(render, number=args.number, repeat=3))
+        print(f"{name:<28} {seconds / args.number * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -34,38 +34,21 @@ publications = list(Path("publications").iterdir())[:3]
 effects = [Effect("liver fibrosis"), Effect("liver cell death")]
 relationship_types = [Causative(), Inhibitive()]
 
-completed = []
-retry = []
+text_generation = TextGenerationAPI(model="gpt-oss-120b", api_key=litellm_api_key)
 failed = []
-is_retry = False
-
-while publications or retry:
-    if publications:
-        publication = publications.pop()
-        is_retry = False
-    elif retry:
-        publication = retry.pop()
-        is_retry = True
 
+for publication in publications:
     with Path.open(publication) as f_in:
         text = f_in.read()
 
     publication_id = Path(publication).stem
 
-    if not Path(f"chemicals/{publication_id}.tsv").exists():
-        try:
-            chemicals = TextGenerationAPI(model="gpt-oss-120b", api_key=litellm_api_key).find_chemicals(text)
-            write_chemicals(publication_id, chemicals)
-        except LLMFailureError:
-            if is_retry:
-                failed.append(publication)
-            else:
-                retry.append(publication)
-            continue
-
     try:
+        if not Path(f"chemicals/{publication_id}.tsv").exists():
+            write_chemicals(publication_id, text_generation.find_chemicals(text))
+
         chemicals = pd.read_csv(f"chemicals/{publication_id}.tsv", sep="\t")["name"].tolist()
-        relationships = TextGenerationAPI(model="gpt-oss-120b", api_key=litellm_api_key).find_relationships_in_text(
+        relationships = text_generation.find_relationships_in_text(
             text=text,
             chemicals=[Chemical(name=name) for name in chemicals],
             effects=effects,
@@ -73,8 +56,4 @@ while publications or retry:
         )
         write_relationships(publication_id, relationships)
     except LLMFailureError:
-        if is_retry:
-            failed.append(publication)
-        else:
-            retry.append(publication)
-        continue
+        failed.append(publication)
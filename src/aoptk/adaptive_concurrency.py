@@ -0,0 +1,122 @@
+from __future__ import annotations
+import asyncio
+import threading
+
+
+class AdaptiveConcurrencyLimiter:
+    """Limit of requests in flight, adapted to the load of the server AIMD-style.
+
+    While responses come back with healthy latency, the limit grows additively by about one request
+    per round trip. When the server signals overload - a 429 or 503 response, a timeout, or a latency
+    spike over `latency_tolerance` times the usual latency - the limit is cut multiplicatively by
+    `backoff_factor`. Waiting threads and tasks are woken whenever a request finishes or the limit
+    grows, so one limiter can pace the synchronous and asynchronous clients of a server together.
+    """
+
+    backoff_factor: float = 0.5
+    latency_smoothing: float = 0.1
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_tolerance: float = 2.0,
+    ):
+        """Create a limiter.
+
+        Args:
+            initial_limit (int): The number of requests allowed in flight at first.
+            min_limit (int): The lowest limit backing off can reach.
+            max_limit (int): The highest limit increasing can reach.
+            latency_tolerance (float): How many times longer than the usual latency a response may
+            take before it is treated as a sign of overload.
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.latency: float | None = None
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def limit(self) -> int:
+        """The number of requests currently allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """The number of requests currently in flight."""
+        return self._in_flight
+
+    def acquire(self) -> None:
+        """Block the calling thread until a request may be sent."""
+        with self._available:
+            self._available.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def async_acquire(self) -> None:
+        """Wait without blocking the event loop until a request may be sent."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._in_flight < self.limit:
+                    self._in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def release(self) -> None:
+        """Mark a request as finished."""
+        with self._lock:
+            self._in_flight -= 1
+            self._wake()
+
+    def record_success(self, latency: float) -> None:
+        """Adapt the limit to the latency of a successful request.
+
+        The usual latency is an exponential moving average, so a lasting slowdown raises it and
+        stops counting as a spike.
+
+        Args:
+            latency (float): The duration of the request in seconds.
+        """
+        with self._lock:
+            spike = self.latency is not None and latency > self.latency_tolerance * self.latency
+            self.latency = (
+                latency
+                if self.latency is None
+                else (1 - self.latency_smoothing) * self.latency + self.latency_smoothing * latency
+            )
+            if spike:
+                self._back_off()
+                return
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self._wake()
+
+    def record_overload(self) -> None:
+        """Back off after the server signalled overload."""
+        with self._lock:
+            self._back_off()
+
+    def _back_off(self) -> None:
+        """Cut the limit multiplicatively, the lock must be held."""
+        self._limit = max(self.min_limit, self._limit * self.backoff_factor)
+
+    def _wake(self) -> None:
+        """Wake the waiting threads and tasks to check the limit again, the lock must be held."""
+        self._available.notify_all()
+        for loop, waiter in self._async_waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_resolve, waiter)
+        self._async_waiters.clear()
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    """Resolve the future of a waiting task unless it was cancelled."""
+    if not waiter.done():
+        waiter.set_result(None)
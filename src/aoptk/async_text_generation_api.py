@@ -0,0 +1,205 @@
+from __future__ import annotations
+import asyncio
+import os
+import time
+from itertools import product
+from weakref import WeakKeyDictionary
+import pandas as pd
+from openai import APIConnectionError
+from openai import APIStatusError
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletion
+from openai.types.chat import ChatCompletionContentPartParam
+from openai.types.chat import ChatCompletionUserMessageParam
+from tenacity import AsyncRetrying
+from aoptk.chemical import Chemical
+from aoptk.effect import Effect
+from aoptk.relationships.relationship import Relationship
+from aoptk.relationships.relationship_type import RelationshipType
+from aoptk.text_generation_api import TextGenerationAPI
+from aoptk.text_generation_api import is_overload
+
+
+class AsyncTextGenerationAPI(TextGenerationAPI):
+    """Text generation API using the asynchronous OpenAI client.
+
+    The `async_` methods mirror the synchronous ones, but are coroutines that send all their prompts
+    at once, so a single event loop can keep many completions in flight. The number of completions
+    in flight is bounded by the limiter, which can be shared by several instances running on the same loop.
+    The synchronous methods are inherited unchanged.
+    """
+
+    max_concurrency: int = 32
+    async_client: AsyncOpenAI
+
+    def __init__(
+        self,
+        model: str = "gpt-oss-120b",
+        url: str = "https://llm.ai.e-infra.cz/v1",
+        api_key: str | None = os.environ.get("CERIT_API_KEY"),
+        limiter: asyncio.Semaphore | None = None,
+    ):
+        """Create an asynchronous client of an OpenAI compatible API.
+
+        Args:
+            model (str): The model to use.
+            url (str): The base URL of the API.
+            api_key (str | None): The API key.
+            limiter (asyncio.Semaphore | None): Limits the number of completions in flight, it can only be used
+            in one event loop. Defaults to a semaphore allowing `max_concurrency` completions in every event loop.
+        """
+        super().__init__(model, url, api_key)
+        self._limiter = limiter
+        self._semaphores: WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = WeakKeyDictionary()
+        self.async_client = AsyncOpenAI(
+            base_url=self.url,
+            api_key=self.api_key,
+            max_retries=0,
+        )
+
+    @property
+    def limiter(self) -> asyncio.Semaphore:
+        """Semaphore limiting the completions in flight, the shared one or one per event loop of the instance."""
+        if self._limiter is not None:
+            return self._limiter
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[loop]
+
+    async def _async_prompt(self, content: str | list[ChatCompletionContentPartParam]) -> str:
+        """Send the prompt and return the response, retrying like the synchronous prompt.
+
+        Args:
+            content (str | list[ChatCompletionContentPartParam]): The prompt text or content parts.
+
+        Raises:
+            LLMFailureError: If the model keeps returning empty responses.
+        """
+        messages = self._messages(content)
+        cache_key = self._cache_key(messages)
+        cache = self.response_cache
+        if cache is not None and cache_key and (cached := cache.get(cache_key)) is not None:
+            return cached
+
+        async for attempt in AsyncRetrying(**self._retry_policy()):
+            with attempt:
+                async with self.limiter:
+                    completion = await self._async_create_completion(messages)
+                return self._completion_response(completion, cache_key)
+        msg = "Unexpected control flow: retry exceeded without returning"
+        raise RuntimeError(msg)
+
+    async def _async_create_completion(self, messages: list[ChatCompletionUserMessageParam]) -> ChatCompletion:
+        """Request a chat completion under the concurrency limiter, if there is one.
+
+        Args:
+            messages (list[ChatCompletionUserMessageParam]): The messages of the chat completion.
+        """
+        limiter = self.concurrency_limiter
+        if limiter is None:
+            return await self.async_client.chat.completions.create(**self._completion_request(messages))
+        await limiter.async_acquire()
+        start = time.monotonic()
+        try:
+            completion = await self.async_client.chat.completions.create(**self._completion_request(messages))
+        except (APIConnectionError, APIStatusError) as error:
+            if is_overload(error):
+                limiter.record_overload()
+            raise
+        finally:
+            limiter.release()
+        limiter.record_success(time.monotonic() - start)
+        return completion
+
+    async def async_find_chemicals(self, text: str) -> list[Chemical]:
+        """Find chemicals in the given text, searching its chunks concurrently.
+
+        Args:
+            text (str): The input text to search for chemicals.
+        """
+        contents, parse = self.chemical_prompts(text)
+        return parse(await asyncio.gather(*map(self._async_prompt, contents)))
+
+    async def async_find_relationships_in_text(
+        self,
+        text: str,
+        chemicals: list[Chemical],
+        effects: list[Effect],
+        relationship_types: list[RelationshipType],
+    ) -> list[Relationship]:
+        """Find relationships between chemicals and effects.
+
+        Args:
+            text (str): The input text.
+            chemicals (list[Chemical]): List of chemical entities.
+            effects (list[Effect]): List of effect entities.
+            relationship_types (list[RelationshipType]): The relationship types to classify.
+        """
+        contents, parse = self.relationship_prompts(text, chemicals, effects, relationship_types)
+        return parse(await asyncio.gather(*map(self._async_prompt, contents)))
+
+    async def async_find_relationships_in_table(
+        self,
+        table_df: pd.DataFrame,
+        effects: list[Effect],
+        relationship_types: list[RelationshipType],
+    ) -> list[Relationship]:
+        """Find relationships between chemicals and effects in a table.
+
+        Args:
+            table_df (pd.DataFrame): Pandas DataFrame.
+            effects (list[Effect]): List of effect entities.
+            relationship_types (list[RelationshipType]): The relationship types to classify.
+        """
+        pairs = list(product(effects, relationship_types))
+        responses = await asyncio.gather(
+            *(self._async_prompt(self._table_content(table_df, *pair)) for pair in pairs),
+        )
+        return [
+            relationship
+            for (effect, relationship_type), response in zip(pairs, responses, strict=True)
+            for relationship in self._process_colon_separated_response(response, effect, relationship_type, "table")
+        ]
+
+    async def async_convert_pdf_scan(self, img_base64: str, mime_type: str) -> str:
+        """Extract text from a base64-encoded image.
+
+        Args:
+            img_base64 (str): Base64-encoded image data.
+            mime_type (str): MIME type of the image.
+        """
+        return await self._async_prompt(self._pdf_scan_content(img_base64, mime_type))
+
+    async def async_convert_pdf_scans(self, images_base64: list[str], mime_type: str) -> list[str]:
+        """Extract text from base64-encoded images of pages, keeping the order of the pages.
+
+        Args:
+            images_base64 (list[str]): Base64-encoded image data of the pages.
+            mime_type (str): MIME type of the images.
+        """
+        return list(
+            await asyncio.gather(*(self.async_convert_pdf_scan(img_base64, mime_type) for img_base64 in images_base64)),
+        )
+
+    async def async_convert_image(self, image_path: str, text: str) -> str:
+        """Convert an image to text.
+
+        Args:
+            image_path (str): Path to the image.
+            text (str): The full text of the publication for context.
+        """
+        return await self._async_prompt(self._image_content(image_path, text))
+
+    async def async_find_relevant_publications(self, question: str, text: str) -> bool | None:
+        """Answer the question based on a given text.
+
+        Args:
+            question (str): The question to search for relevant publications.
+            text (str): The extracted text of the publication.
+        """
+        return self._parse_answer(
+            await self._async_prompt(
+                self._render_prompt(self.find_relevant_publications_prompt_template, question=question, text=text),
+            ),
+        )
@@ -1,11 +1,18 @@
 from __future__ import annotations
-import xml.etree.ElementTree as ET
+import datetime as dt
+import logging
+import threading
 import zipfile
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import chain
 from pathlib import Path
 from typing import ClassVar
 from urllib.error import HTTPError
-import pandas as pd
+from urllib.parse import urlparse
 import requests
+from requests.adapters import DEFAULT_POOLSIZE
 from requests.adapters import HTTPAdapter
 from requests.adapters import MaxRetryError
 from urllib3.util.retry import Retry
@@ -15,22 +22,31 @@ from aoptk.literature.get_id import GetID
 from aoptk.literature.get_metadata import GetMetadata
 from aoptk.literature.get_pdf import GetPDF
 from aoptk.literature.get_publication import GetPublication
+from aoptk.literature.harvest_checkpoint import HarvestCheckpoint
 from aoptk.literature.id import DOI
 from aoptk.literature.id import ID
 from aoptk.literature.id import PMCID
 from aoptk.literature.id import PMID
+from aoptk.literature.jats_parser import JATSArticle
+from aoptk.literature.jats_parser import parse_jats
 from aoptk.literature.metadata import Metadata
 from aoptk.literature.pdf import PDF
 from aoptk.literature.publication import Publication
 from aoptk.literature.query import Query
+from aoptk.literature.utils import RequestLimiter
 from aoptk.literature.utils import convert_image_format
+from aoptk.literature.utils import fetch_publication
 from aoptk.literature.utils import is_europepmc_id
+from aoptk.literature.utils import write_abstracts
+
+logger = logging.getLogger(__name__)
 
 
 class EuropePMC(GetAbstract, GetPDF, GetID, GetPublication, GetMetadata):
     """Class to get data from Europe PMC based on a query."""
 
     page_size = 1000
+    batch_size = 200
     timeout = 30
     headers: ClassVar = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
@@ -52,7 +68,19 @@ class EuropePMC(GetAbstract, GetPDF, GetID, GetPublication, GetMetadata):
         storage: Path,
         figure_storage: Path,
         query: Query | None = None,
+        max_workers: int = 1,
+        requests_per_second: float | None = None,
     ):
+        """Create a Europe PMC client.
+
+        Args:
+            storage (Path): Directory where full texts, abstracts and PDFs are stored.
+            figure_storage (Path): Directory where figures are stored.
+            query (Query | None): Query to search for.
+            max_workers (int): Number of publications fetched concurrently by `get_publications`.
+            requests_per_second (float | None): Maximum number of requests per second sent to a single host.
+            No limit is applied if None.
+        """
         if not query:
             query = Query(search_term="")
         self.search_term = self.build_search_term(query)
@@ -61,6 +89,11 @@ class EuropePMC(GetAbstract, GetPDF, GetID, GetPublication, GetMetadata):
         Path(self.storage).mkdir(parents=True, exist_ok=True)
         Path(self.figure_storage).mkdir(parents=True, exist_ok=True)
 
+        self.max_workers = max_workers
+        self.requests_per_second = requests_per_second
+        self._limiters: dict[str, RequestLimiter] = {}
+        self._limiters_lock = threading.Lock()
+
         self._session = requests.Session()
         self._session.headers.update(self.headers)
         self.retry_strategy = Retry(
@@ -69,7 +102,7 @@ class EuropePMC(GetAbstract, GetPDF, GetID, GetPublication, GetMetadata):
             status_forcelist=[429, 408, 500, 502, 503, 504],
             allowed_methods=["GET", "POST"],
         )
-        self.adapter = HTTPAdapter(max_retries=self.retry_strategy)
+        self.adapter = HTTPAdapter(max_retries=self.retry_strategy, pool_maxsize=self._pool_size)
         self._session.mount("https://", self.adapter)
 
     def build_search_term(self, query: Query) -> str:
@@ -97,9 +130,14 @@ class EuropePMC(GetAbstract, GetPDF, GetID, GetPublication, GetMetadata):
             strategy (Retry): Strategy to use.
         """
         self.retry_strategy = strategy
-        self.adapter = HTTPAdapter(max_retries=self.retry_strategy)
+        self.adapter = HTTPAdapter(max_retries=self.retry_strategy, pool_maxsize=self._pool_size)
         self._session.mount("https://", self.adapter)
 
+    @property
+    def _pool_size(self) -> int:
+        """Size of the connection pool, large enough for all concurrent workers."""
+        return max(DEFAULT_POOLSIZE, self.max_workers)
+
     def _get_license_filter(self, licensing: str) -> str:
         """Get the license filter string for a given licensing type.
 
@@ -134,16 +172,20 @@ class EuropePMC(GetAbstract, GetPDF, GetID, GetPublication, GetMetadata):
         return pdfs
 
     def get_abstracts(self, ids: list[ID]) -> list[Abstract]:
-        """Retrieve Abstracts."""
-        abstracts = []
-        for publication_id in ids:
-            try:
-                if abstract := self._get_abstract(publication_id):
-                    abstracts.append(abstract)
-                    with (Path(self.storage) / f"{abstract.id}.txt").open("w", encoding="utf-8") as f:
-                        f.write(abstract.text)
-            except (HTTPError, MaxRetryError):
-                continue
+        """Retrieve Abstracts.
+
+        The IDs are queried in batches of `batch_size`, see `_search_by_id_batches`.
+
+        Args:
+            ids (list[ID]): A list of publication IDs for which to retrieve abstracts.
+        """
+        results = self._search_by_id_batches(ids, "core")
+        abstracts = [
+            Abstract(text=text, id=publication_id)
+            for publication_id in ids
+            if (text := results.get(publication_id, {}).get("abstractText"))
+        ]
+        write_abstracts(self.storage, abstracts)
         return abstracts
 
     def get_publications(self, ids: list[ID], download_figures_enabled: bool = True) -> list[Publication]:
@@ -154,45 +196,198 @@ class EuropePMC(GetAbstract, GetPDF, GetID, GetPublication, GetMetadata):
             download_figures_enabled (bool): Whether to download figures and
             include their paths in the Publication objects.
         """
-        publications = []
-        for publication_id in ids:
-            try:
-                if publication := self._get_publication(publication_id, download_figures_enabled):
-                    publications.append(publication)
-                    with (Path(self.storage) / f"{publication.id}.txt").open("w", encoding="utf-8") as f:
-                        f.write(publication.full_text)
-            except (HTTPError, MaxRetryError):
-                continue
-        return publications
+        fetch = partial(
+            fetch_publication,
+            lambda publication_id: self._get_publication(publication_id, download_figures_enabled),
+            self.storage,
+        )
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return [publication for publication in executor.map(fetch, ids) if publication]
 
     def get_publications_metadata(self, ids: list[ID]) -> list[Metadata]:
-        """Retrieve Publication metadata."""
-        metadata = []
-        for publication_id in ids:
-            try:
-                if publication := self._get_publication_metadata(publication_id):
-                    metadata.append(publication)
-            except (HTTPError, MaxRetryError):
-                continue
-        return metadata
+        """Retrieve Publication metadata.
+
+        The IDs are queried in batches of `batch_size`, see `_search_by_id_batches`.
+
+        Args:
+            ids (list[ID]): A list of publication IDs for which to retrieve metadata.
+        """
+        results = self._search_by_id_batches(ids, "core")
+        return [
+            self._parse_metadata(publication_id, result)
+            for publication_id in ids
+            if (result := results.get(publication_id))
+        ]
+
+    def get_ids(
+        self,
+        shards: list[str] | None = None,
+        checkpoint: Path | None = None,
+        resume: bool = False,
+    ) -> list[ID]:
+        """Get a list of publication IDs from EuropePMC based on the search term.
+
+        Args:
+            shards (list[str] | None): Search clauses partitioning the results, e.g. from `date_shards`.
+            Each shard is harvested with its own cursor, concurrently on `max_workers` threads, and
+            the IDs are merged in shard order without duplicates. The whole search is harvested
+            with a single cursor if None.
+            checkpoint (Path | None): File recording the progress of the harvest after every page
+            (or every completed shard). No progress is recorded if None.
+            resume (bool): Whether to continue the harvest recorded in the checkpoint instead of starting over.
+        """
+        harvest = HarvestCheckpoint(checkpoint, self.search_term, resume)
+        if not shards:
+            return self._get_ids_with_cursor(harvest)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            shard_ids = executor.map(partial(self._get_shard_ids, harvest=harvest), shards)
+            return list(dict.fromkeys(chain.from_iterable(shard_ids)))
+
+    def _get_ids_with_cursor(self, harvest: HarvestCheckpoint) -> list[ID]:
+        """Harvest the publication IDs with a single cursor, recording the progress after every page.
+
+        Args:
+            harvest (HarvestCheckpoint): The progress of the harvest to continue from and record to.
+        """
+        ids = list(harvest.ids)
+        if harvest.done:
+            return ids
+        for results, next_cursor in self._iter_pages(self.search_term, "idlist", harvest.cursor_mark):
+            page_ids = [_get_publication_id(result) for result in results]
+            ids.extend(page_ids)
+            harvest.record(page_ids, cursor_mark=next_cursor, done=next_cursor is None)
+        return ids
+
+    def iter_ids(self) -> Iterator[ID]:
+        """Yield publication IDs from EuropePMC based on the search term, one result page at a time."""
+        for result in self._iter_results(self.search_term, "idlist"):
+            yield _get_publication_id(result)
+
+    def date_shards(self, first_year: int, last_year: int | None = None, years_per_shard: int = 1) -> list[str]:
+        """Partition the search by publication date, to be harvested in parallel by `get_ids`.
+
+        A final shard covers everything outside of the years, so no publication is lost.
+
+        Args:
+            first_year (int): The first year of publication covered by its own shard.
+            last_year (int | None): The last year of publication covered by its own shard. Current year if None.
+            years_per_shard (int): Number of years covered by a single shard.
+        """
+        last_year = last_year or dt.datetime.now(dt.UTC).year
+        shards = [
+            f"E_PDATE:[{year}-01-01 TO {min(year + years_per_shard - 1, last_year)}-12-31]"
+            for year in range(first_year, last_year + 1, years_per_shard)
+        ]
+        shards.append(f"NOT E_PDATE:[{first_year}-01-01 TO {last_year}-12-31]")
+        return shards
 
-    def get_ids(self) -> list[ID]:
-        """Get a list of publication IDs from EuropePMC based on the search term."""
-        cursor_mark = "*"
-        id_list = []
+    def _get_shard_ids(self, shard: str, harvest: HarvestCheckpoint) -> list[ID]:
+        """Harvest the publication IDs of a single shard of the search, logging the progress.
 
+        Args:
+            shard (str): Search clause restricting the search term to the shard.
+            harvest (HarvestCheckpoint): The progress of the harvest. Shards completed before are not harvested again.
+        """
+        if shard in harvest.completed:
+            logger.info("Shard %s: already completed with %d IDs", shard, len(harvest.completed[shard]))
+            return harvest.completed[shard]
+        # The complement shard starts with NOT, so it needs a left operand even without a search term.
+        query = f"({self.search_term.strip() or '*'}) AND {shard}"
+        shard_ids: list[ID] = []
+        for results, _next_cursor in self._iter_pages(query, "idlist"):
+            shard_ids.extend(_get_publication_id(result) for result in results)
+            logger.info("Shard %s: %d IDs harvested so far", shard, len(shard_ids))
+        harvest.record(shard_ids, completed=shard)
+        logger.info("Shard %s: finished with %d IDs", shard, len(shard_ids))
+        return shard_ids
+
+    def _iter_results(self, query: str, result_type: str) -> Iterator[dict]:
+        """Iterate over all results of a search, following the cursor from page to page.
+
+        Args:
+            query (str): The search query.
+            result_type (str): Whether to search for idlists or core.
+        """
+        for results, _next_cursor in self._iter_pages(query, result_type):
+            yield from results
+
+    def _iter_pages(
+        self,
+        query: str,
+        result_type: str,
+        cursor_mark: str = "*",
+    ) -> Iterator[tuple[list[dict], str | None]]:
+        """Iterate over the pages of a search, following the cursor.
+
+        Args:
+            query (str): The search query.
+            result_type (str): Whether to search for idlists or core.
+            cursor_mark (str): The cursor mark of the first page.
+
+        Returns:
+            Iterator[tuple[list[dict], str | None]]: The results of each page with the cursor mark
+            of the next page, which is None for the last page.
+        """
         while True:
-            data_europepmc = self._call_api(cursor_mark, "idlist", self.search_term)
+            data_europepmc = self._call_api(cursor_mark, result_type, query)
             results = data_europepmc.get("resultList", {}).get("result", [])
 
-            id_list.extend([_get_publication_id(result) for result in results])
-
             next_cursor = data_europepmc.get("nextCursorMark")
             if not next_cursor or next_cursor == cursor_mark:
+                yield results, None
                 break
+            yield results, next_cursor
             cursor_mark = next_cursor
 
-        return id_list
+    def _search_by_id_batches(self, ids: list[ID], result_type: str) -> dict[ID, dict]:
+        """Search for the publications in batches of `batch_size`, one search request per batch.
+
+        The IDs of a failed batch are searched one by one, so a single bad request does not lose the whole batch.
+
+        Args:
+            ids (list[ID]): The publication IDs to search for.
+            result_type (str): Whether to search for idlists or core.
+
+        Returns:
+            dict[ID, dict]: The first result found for each ID. IDs without results or failing are missing.
+        """
+        results: dict[ID, dict] = {}
+        for i in range(0, len(ids), self.batch_size):
+            batch_ids = ids[i : i + self.batch_size]
+            try:
+                results.update(self._search_by_ids(batch_ids, result_type))
+            except requests.RequestException:
+                if len(batch_ids) == 1:
+                    logger.warning("Search for %s failed", batch_ids[0], exc_info=True)
+                    continue
+                logger.warning("Search for a batch of %d IDs failed, searching them one by one", len(batch_ids))
+                for publication_id in batch_ids:
+                    results.update(self._search_by_id_batches([publication_id], result_type))
+        return results
+
+    def _search_by_ids(self, ids: list[ID], result_type: str) -> dict[ID, dict]:
+        """Search for several publications at once and map the results back to the given IDs.
+
+        Args:
+            ids (list[ID]): The publication IDs to search for, joined into a single OR query.
+            result_type (str): Whether to search for idlists or core.
+
+        Returns:
+            dict[ID, dict]: The first result found for each ID. IDs without results are missing.
+        """
+        query = " OR ".join(_build_id_query(publication_id) for publication_id in ids)
+        # DOIs are case-insensitive, so the results are matched by the lowercased IDs.
+        results: dict[str, dict] = {}
+        for result in self._iter_results(query, result_type):
+            for key in ("pmcid", "pmid", "doi", "id"):
+                if value := result.get(key):
+                    results.setdefault(str(value).lower(), result)
+        return {
+            publication_id: found
+            for publication_id in ids
+            if (found := results.get(str(publication_id).lower())) is not None
+        }
 
     def _get_pdf(self, publication_id: ID) -> PDF:
         """Retrieve the PDF for a given publication ID.
@@ -203,11 +398,7 @@ class EuropePMC(GetAbstract, GetPDF, GetID, GetPublication, GetMetadata):
         Returns:
             PDF | None: The PDF object if successful, None otherwise.
         """
-        response = self._session.get(
-            f"https://europepmc.org/api/getPdf?pmcid={publication_id}",
-            stream=True,
-            timeout=self.timeout,
-        )
+        response = self._get(f"https://europepmc.org/api/getPdf?pmcid={publication_id}", stream=True)
         response.raise_for_status()
         return self._write_pdf(publication_id, response)
 
@@ -223,24 +414,6 @@ class EuropePMC(GetAbstract, GetPDF, GetID, GetPublication, GetMetadata):
             f.writelines(response.iter_content(chunk_size=8192))
         return PDF(filepath)
 
-    def _get_abstract(self, publication_id: ID) -> Abstract | None:
-        """Return abstract from Europe PMC for a given publication ID.
-
-        Args:
-            publication_id (ID): The ID of the publication for which to retrieve the abstract.
-
-        Returns:
-            Abstract: The abstract object if successful, None otherwise.
-        """
-        cursor_mark = "*"
-
-        json_data = self._call_api(cursor_mark, "core", publication_id)
-        results = json_data.get("resultList", {}).get("result", [])
-
-        if text := results[0].get("abstractText", None):
-            return Abstract(text=text, id=publication_id)
-        return None
-
     def _call_api(self, cursor_mark: str, result_type: str, query: str | ID) -> dict:
         """Call the EuropePMC web api to query the search.
 
@@ -260,41 +433,63 @@ class EuropePMC(GetAbstract, GetPDF, GetID, GetPublication, GetMetadata):
             "cursorMark": cursor_mark,
             "resultType": result_type,
         }
-        response = self._session.get(url, params=params, timeout=self.timeout)
+        response = self._get(url, params=params)
         response.raise_for_status()
         return response.json()
 
-    def _get_publication_metadata(self, publication_id: ID) -> Metadata | None:
-        """Return abstract from Europe PMC for a given publication ID.
+    def _get(self, url: str, params: dict | None = None, stream: bool = False) -> requests.Response:
+        """Send a GET request through the shared session, respecting the per-host rate limit.
 
         Args:
-            publication_id (ID): The ID of the publication to retrieve metadata for.
+            url (str): The URL to request.
+            params (dict | None): Query parameters of the request.
+            stream (bool): Whether to stream the response content.
         """
-        cursor_mark = "*"
-
-        json_data = self._call_api(cursor_mark, "core", publication_id)
-        results = json_data.get("resultList", {}).get("result", [])
-
-        if results:
-            pmcid = results[0].get("pmcid", None)
-            pmid = results[0].get("pmid", None)
-            doi = results[0].get("doi", None)
-            year = int(year) if (year := results[0].get("pubYear", None)) else None
-            title = results[0].get("title", None)
-            if authors := results[0].get("authorString", None):
-                authors = [author.strip().rstrip(".") for author in authors.split(",") if author.strip()]
-            else:
-                authors = []
-            return Metadata(
-                id=publication_id,
-                pmcid=PMCID(pmcid) if pmcid else None,
-                pmid=PMID(pmid) if pmid else None,
-                doi=DOI(doi) if doi else None,
-                year=year,
-                title=title,
-                authors=authors,
-            )
-        return None
+        if limiter := self._get_limiter(urlparse(url).netloc):
+            limiter.wait_turn()
+        return self._session.get(url, params=params, stream=stream, timeout=self.timeout)
+
+    def _get_limiter(self, host: str) -> RequestLimiter | None:
+        """Return the rate limiter for a given host, creating it on first use.
+
+        Args:
+            host (str): The host the request is sent to.
+
+        Returns:
+            RequestLimiter | None: The rate limiter, None if the requests are not limited.
+        """
+        if not (requests_per_second := self.requests_per_second):
+            return None
+        with self._limiters_lock:
+            if host not in self._limiters:
+                self._limiters[host] = RequestLimiter(requests_per_second)
+            return self._limiters[host]
+
+    def _parse_metadata(self, publication_id: ID, result: dict) -> Metadata:
+        """Parse a single Europe PMC core search result into a Metadata object.
+
+        Args:
+            publication_id (ID): The ID by which the publication was found.
+            result (dict): The core search result of the publication.
+        """
+        pmcid = result.get("pmcid")
+        pmid = result.get("pmid")
+        doi = result.get("doi")
+        year = int(year) if (year := result.get("pubYear")) else None
+        title = result.get("title")
+        if authors := result.get("authorString"):
+            authors = [author.strip().rstrip(".") for author in authors.split(",") if author.strip()]
+        else:
+            authors = []
+        return Metadata(
+            id=publication_id,
+            pmcid=PMCID(pmcid) if pmcid else None,
+            pmid=PMID(pmid) if pmid else None,
+            doi=DOI(doi) if doi else None,
+            year=year,
+            title=title,
+            authors=authors,
+        )
 
     def _get_publication(self, publication_id: ID, download_figures_enabled: bool = True) -> Publication | None:
         """Return a Publication object for a given publication ID.
@@ -304,108 +499,33 @@ class EuropePMC(GetAbstract, GetPDF, GetID, GetPublication, GetMetadata):
             download_figures_enabled (bool): Whether to download figures
             and include their paths in the Publication object.
         """
-        if root := self._get_xml(publication_id):
+        if article := self._get_xml(publication_id):
             return Publication(
                 id=publication_id,
-                abstract=Abstract(text=self._parse_xml_abstract(root), id=publication_id),
-                full_text=self._parse_xml_full_text(root),
+                abstract=Abstract(text=article.abstract, id=publication_id),
+                full_text=article.full_text,
                 figures=self._get_figures(publication_id) if download_figures_enabled else [],
-                figure_descriptions=self._parse_xml_figure_descriptions(root) if download_figures_enabled else [],
-                tables=self._parse_xml_tables(root),
+                figure_descriptions=article.figure_descriptions if download_figures_enabled else [],
+                tables=article.tables,
             )
         return None
 
-    def _parse_xml_abstract(self, root: ET.Element) -> str:
-        """Return the full text content of the first <abstract> element as a single string.
+    def _get_xml(self, publication_id: ID) -> JATSArticle | None:
+        """Retrieve and parse the full text XML for a given publication ID.
 
-        Args:
-            root (ET.Element): The root element of the XML tree.
-        """
-        if (abstract_elem := root.find(".//abstract")) is not None:
-            return " ".join(abstract_elem.itertext()).strip()
-        return ""
-
-    def _parse_xml_full_text(self, root: ET.Element) -> str:
-        """Parse the XML content to extract the full text.
-
-        Args:
-            root (ET.Element): The root element of the XML tree.
-        """
-        lines = []
-
-        for element in root.iter():
-            if element.tag in {"title", "p"}:
-                text = "".join(element.itertext()).strip()
-                if text:
-                    lines.append(text)
-
-        return "\n\n".join(lines)
-
-    def _parse_xml_figure_descriptions(self, root: ET.Element) -> str:
-        """Parse the XML content to extract the figure descriptions.
-
-        Args:
-            root (ET.Element): The root element of the XML tree.
-        """
-        lines = []
-
-        for element in root.iter():
-            if element.tag == "fig":
-                text = "".join(element.itertext()).strip()
-                if text:
-                    lines.append(text)
-
-        return "\n\n".join(lines)
-
-    def _parse_xml_tables(self, root: ET.Element) -> list[pd.DataFrame]:
-        """Parse the XML content to extract tables as a list of DataFrames, preserving order.
-
-        Args:
-            root (ET.Element): The root element of the XML tree.
-        """
-        tables = []
-        for element in root.iter():
-            if element.tag == "table-wrap" and (table_elem := element.find(".//table")) is not None:
-                rows = self._extract_rows(table_elem)
-                df = pd.DataFrame(rows)
-                tables.append(df)
-        return tables
-
-    def _extract_rows(self, table_elem: ET.Element) -> list[list[str]]:
-        """Extract rows from a table element, preserving order.
-
-        Args:
-            table_elem (ET.Element): The XML element representing the table.
-        """
-        rows = []
-        for row in table_elem.findall(".//tr"):
-            cells = ["".join(cell.itertext()).strip() for cell in row.findall(".//td")]
-            if not cells:
-                cells = ["".join(cell.itertext()).strip() for cell in row.findall(".//th")]
-            rows.append(cells)
-        return rows
-
-    def _get_xml(self, publication_id: ID) -> ET.Element | None:
-        """Retrieve the XML root element for a given publication ID.
+        The XML is parsed incrementally, directly from the response byte stream.
 
         Args:
             publication_id (ID): The ID of the publication to retrieve XML for.
         """
         if is_europepmc_id(publication_id):
-            response = self._session.get(
+            with self._get(
                 f"https://www.ebi.ac.uk/europepmc/webservices/rest/{publication_id}/fullTextXML",
                 stream=True,
-                timeout=self.timeout,
-            )
-            response.raise_for_status()
-            xml_path = Path(self.storage) / f"{publication_id}.xml"
-            with xml_path.open("w", encoding="utf-8") as f:
-                f.write(response.text)
-            root = ET.parse(xml_path).getroot()
-            xml_path.unlink()
-            if root is None:
-                return None
-            return root
+            ) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                return parse_jats(response.raw)
         return None
 
     def _get_figures(self, publication_id: ID) -> list[Path]:
@@ -435,10 +555,9 @@ class EuropePMC(GetAbstract, GetPDF, GetID, GetPublication, GetMetadata):
         """
         if is_europepmc_id(publication_id):
             zip_path = Path(self.storage) / f"{publication_id}_supplementary.zip"
-            response = self._session.get(
+            response = self._get(
                 f"https://www.ebi.ac.uk/europepmc/webservices/rest/{publication_id}/supplementaryFiles",
                 stream=True,
-                timeout=self.timeout,
             )
             response.raise_for_status()
             with zip_path.open("wb") as f:
@@ -457,3 +576,19 @@ def _get_publication_id(result: dict) -> ID:
         return ID(publication_id)
     msg = "Europe PMC result is missing a publication id"
     raise ValueError(msg)
+
+
+def _build_id_query(publication_id: ID) -> str:
+    """Build the Europe PMC search clause matching exactly one publication ID.
+
+    Args:
+        publication_id (ID): The publication ID - PMCID, PMID, DOI or another Europe PMC ID such as PPR.
+    """
+    id_str = str(publication_id)
+    if is_europepmc_id(publication_id):
+        return f"PMCID:{id_str}"
+    if id_str.isdigit():
+        return f"(EXT_ID:{id_str} AND SRC:MED)"
+    if id_str.startswith("10."):
+        return f'DOI:"{id_str}"'
+    return f"EXT_ID:{id_str}"
@@ -1,18 +1,55 @@
 import asyncio
-import calendar
 import datetime
+import math
+import threading
+import time
+from collections.abc import AsyncGenerator
 from collections.abc import Callable
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
 from typing import Literal
 from urllib.error import HTTPError
+from weakref import WeakKeyDictionary
 from Bio import Entrez
 from tenacity import AsyncRetrying
 from tenacity import retry_if_exception_type
 from tenacity import stop_after_attempt
 from tenacity import wait_random_exponential
 from aoptk.literature.get_id import GetID
+from aoptk.literature.harvest_checkpoint import HarvestCheckpoint
 from aoptk.literature.id import ID
-from aoptk.literature.utils import AsyncRequestLimiter
+from aoptk.literature.utils import RequestLimiter
+
+
+@dataclass
+class SearchHistory:
+    """A search stored on the NCBI History Server."""
+
+    count: int
+    webenv: str
+    query_key: str
+
+
+_limiters: dict[tuple[float, int], RequestLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def shared_limiter(requests_per_second: float, burst: int = 1) -> RequestLimiter:
+    """Return the rate limiter shared by all NCBI clients of the process with the given rate.
+
+    NCBI applies its rate limit per API key (or IP address), so PubMed and PMC clients
+    must draw from a single quota instead of each assuming they own it.
+
+    Args:
+        requests_per_second (float): The maximum request rate.
+        burst (int): The number of requests that may be sent at once after a pause.
+    """
+    with _limiters_lock:
+        if (requests_per_second, burst) not in _limiters:
+            _limiters[requests_per_second, burst] = RequestLimiter(requests_per_second, burst)
+        return _limiters[requests_per_second, burst]
 
 
 class NCBI(GetID):
@@ -21,21 +58,156 @@ class NCBI(GetID):
     Entrez.max_tries = 10
     Entrez.sleep_between_tries = 45
     max_ncbi_results = 9998
-    max_concurrency = 2
-    max_requests_per_second = 2
+    max_concurrency: int | None = None
+    max_requests_per_second: float | None = None
+    requests_per_second_with_api_key = 10
+    requests_per_second_without_api_key = 3
+    burst = 1
     minimal_year_publication = 1940
     datetype = "pdat"
     batch_size = 200
+    min_batch_size = 20
+    max_batch_size = 2000
+    target_batch_seconds = 10.0
+    history_batch_size = 500
+    max_pubmed_history_results = 10000
     async_retries = 10
 
     def __init__(self, database: Literal["pmc", "pubmed"]):
+        """Create a client of an NCBI database.
+
+        Unless `max_requests_per_second` is set, the rate follows the NCBI limit, which is higher
+        when `Entrez.api_key` - the key the requests are sent with - is set. The rate limiter is shared
+        by all clients of the process with the same rate, while `concurrency` requests - `max_concurrency`,
+        or one per allowed request per second by default - may be in flight per client.
+
+        Args:
+            database (Literal["pmc", "pubmed"]): The NCBI database.
+        """
         self.database = database
-        self.semaphore = asyncio.Semaphore(self.max_concurrency)
-        self.limiter = AsyncRequestLimiter(self.max_requests_per_second)
+        if not (requests_per_second := self.max_requests_per_second):
+            requests_per_second = (
+                self.requests_per_second_with_api_key if Entrez.api_key else self.requests_per_second_without_api_key
+            )
+        self.concurrency: int = self.max_concurrency or math.ceil(requests_per_second)
+        self.limiter = shared_limiter(requests_per_second, self.burst)
+        self._semaphores: WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = WeakKeyDictionary()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Semaphore limiting the concurrent requests, one per event loop the instance is used in."""
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return self._semaphores[loop]
+
+    def get_ids(self, search_term: str, checkpoint: Path | None = None, resume: bool = False) -> list[ID]:
+        """Retrieve a list of publication IDs based on the search term.
 
-    def get_ids(self, search_term: str) -> list[ID]:
-        """Retrieve a list of publication IDs based on the search term."""
-        return asyncio.run(self._async_get_ids(search_term))
+        Args:
+            search_term (str): The search term.
+            checkpoint (Path | None): File recording the progress of the harvest after every completed
+            date range. No progress is recorded if None.
+            resume (bool): Whether to continue the harvest recorded in the checkpoint instead of starting over.
+        """
+        harvest = HarvestCheckpoint(checkpoint, search_term, resume)
+        return asyncio.run(self._async_get_ids(search_term, harvest))
+
+    def iter_ids(self, search_term: str) -> Iterator[ID]:
+        """Yield publication IDs based on the search term, one date range at a time.
+
+        The harvest only progresses while the next ID is requested, so memory does not grow with the number of hits.
+        """
+        loop = asyncio.new_event_loop()
+        id_batches = self.aiter_id_batches(search_term)
+        try:
+            while True:
+                try:
+                    batch = loop.run_until_complete(anext(id_batches))
+                except StopAsyncIteration:
+                    return
+                yield from batch
+        finally:
+            loop.run_until_complete(id_batches.aclose())
+            # The requests run on the threads of the default executor, which would outlive the closed loop.
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
+
+    async def aiter_id_batches(
+        self,
+        search_term: str,
+        harvest: HarvestCheckpoint | None = None,
+    ) -> AsyncGenerator[list[ID], None]:
+        """Asynchronously yield batches of publication IDs based on the search term as soon as they are retrieved.
+
+        If the search exceeds the result limit, the publication date range is bisected: every range
+        over the limit is split in halves, which are searched concurrently, so sparse periods cost a
+        single search and only dense periods are split finely. Ranges within the limit are yielded
+        in the order of completion. The date ranges are disjoint, so the batches do not overlap.
+
+        Args:
+            search_term (str): The search term.
+            harvest (HarvestCheckpoint | None): Progress of the harvest. IDs recorded before are yielded
+            first and completed date ranges are not searched again. Every completed date range is recorded.
+        """
+        harvest = harvest or HarvestCheckpoint(None, search_term)
+        if harvest.ids:
+            yield list(harvest.ids)
+        if harvest.done:
+            return
+
+        count, pmc_ids = await self._async_get_publication_count_and_ids(search_term=search_term)
+        if count <= self.max_ncbi_results:
+            ids = [ID(pmcid) for pmcid in pmc_ids]
+            harvest.record(ids, done=True)
+            yield ids
+            return
+
+        async for ids in self._aiter_bisected_id_batches(search_term, harvest):
+            yield ids
+        harvest.record([], done=True)
+
+    async def _aiter_bisected_id_batches(
+        self,
+        search_term: str,
+        harvest: HarvestCheckpoint,
+    ) -> AsyncGenerator[list[ID], None]:
+        """Yield the IDs of date ranges within the result limit, bisecting the ranges over it.
+
+        Args:
+            search_term (str): The search term.
+            harvest (HarvestCheckpoint): Progress of the harvest, recording every completed date range.
+        """
+        pending: dict[asyncio.Task, tuple[datetime.date, datetime.date]] = {}
+
+        def search(first: datetime.date, last: datetime.date) -> None:
+            if _date_range_key(first, last) not in harvest.completed:
+                task = asyncio.create_task(self._async_get_date_range_count_and_ids(search_term, first, last))
+                pending[task] = (first, last)
+
+        # The whole search is over the limit, so its date range is split right away.
+        for first, last in _bisect_date_range(
+            datetime.date(self.minimal_year_publication, 1, 1),
+            datetime.date(datetime.datetime.now(datetime.UTC).year, 12, 31),
+        ):
+            search(first, last)
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    first, last = pending.pop(task)
+                    range_count, range_ids = task.result()
+                    if range_count > self.max_ncbi_results and first < last:
+                        for half_first, half_last in _bisect_date_range(first, last):
+                            search(half_first, half_last)
+                        continue
+                    ids = [ID(pmcid) for pmcid in range_ids]
+                    harvest.record(ids, completed=_date_range_key(first, last))
+                    yield ids
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
 
     def get_abstract_records(self, ids: list[ID]) -> list[dict]:
         """Retrieve abstract records based on the list of IDs. Note: There is still the 10 000 records limit.
@@ -49,34 +221,179 @@ class NCBI(GetID):
         """Retrieve publication metadata records based on the list of IDs."""
         return self._batch_requests(ids=ids, func=Entrez.esummary)
 
-    def _batch_requests(self, ids: list[ID], func: Callable[..., Any]) -> list[Any]:
-        """Helper function to batch requests to NCBI."""
-        records = []
-        for i in range(0, len(ids), self.batch_size):
-            batch_ids = ids[i : i + self.batch_size]
-            handle = func(db=self.database, id=",".join(map(str, batch_ids)))
-            if self.database == "pubmed":
-                records_batch = Entrez.read(handle)
-            elif self.database == "pmc":
-                records_batch = handle.read()
-            records.append(records_batch)
-            handle.close()
-        return records
+    def get_abstract_records_for_search(self, search_term: str) -> list[Any]:
+        """Retrieve abstract records of all the publications matching the search term via the History Server.
 
-    async def _async_get_ids(self, search_term: str) -> list[ID]:
-        """Asynchronously retrieve a list of publication IDs based on the search term."""
-        count, pmc_ids = await self._async_get_publication_count_and_ids(search_term=search_term)
-        if count <= self.max_ncbi_results:
-            return [ID(pmcid) for pmcid in pmc_ids]
+        Args:
+            search_term (str): The search term.
+        """
+        return asyncio.run(self._async_history_requests(search_term, Entrez.efetch))
+
+    def get_publications_metadata_records_for_search(self, search_term: str) -> list[Any]:
+        """Retrieve metadata records of all the publications matching the search term via the History Server.
+
+        Args:
+            search_term (str): The search term.
+        """
+        return asyncio.run(self._async_history_requests(search_term, Entrez.esummary))
+
+    def search_history(self, search_term: str) -> SearchHistory:
+        """Run the search on the NCBI History Server without retrieving the IDs.
+
+        The records of the search can then be paged through with efetch or esummary, so the IDs
+        never have to be collected and sent back, and large searches do not need to be split by dates.
+        PubMed only pages through the first `max_pubmed_history_results` records of a search.
+
+        Args:
+            search_term (str): The search term.
+
+        Raises:
+            ValueError: If a PubMed search has more results than can be paged through.
+        """
+        return asyncio.run(self._async_search_history(search_term))
+
+    async def _async_search_history(self, search_term: str) -> SearchHistory:
+        """Run the search on the NCBI History Server under the concurrency and rate limits, see `search_history`.
+
+        Args:
+            search_term (str): The search term.
+        """
+        record = await self._retry_limited(self._store_search, search_term=search_term)
+        history = SearchHistory(
+            count=int(record.get("Count", 0)),
+            webenv=record["WebEnv"],
+            query_key=record["QueryKey"],
+        )
+        if self.database == "pubmed" and history.count > self.max_pubmed_history_results:
+            msg = (
+                f"PubMed search has {history.count} results, only {self.max_pubmed_history_results} "
+                "can be retrieved from the History Server. Retrieve the records by IDs instead."
+            )
+            raise ValueError(msg)
+        return history
+
+    def _store_search(self, search_term: str) -> Any:  # noqa: ANN401
+        """Send the search to the NCBI History Server and return the record of the stored search.
+
+        Args:
+            search_term (str): The search term.
+        """
+        handle = Entrez.esearch(db=self.database, term=search_term, usehistory="y", retmax=0)
+        record = Entrez.read(handle)
+        handle.close()
+        return record
+
+    async def _async_history_requests(self, search_term: str, func: Callable[..., Any]) -> list[Any]:
+        """Store the search on the History Server, page through its records concurrently and return the pages in order.
 
-        tasks = [
-            self._collect_ids_for_year(search_term=search_term, year=year)
-            for year in range(self.minimal_year_publication, datetime.datetime.now(datetime.UTC).year + 1)
+        Args:
+            search_term (str): The search term.
+            func (Callable[..., Any]): The Entrez function to call - efetch or esummary.
+        """
+        history = await self._async_search_history(search_term)
+        pages = [
+            self._retry_limited(self._fetch_history_page, history=history, func=func, retstart=retstart)
+            for retstart in range(0, history.count, self.history_batch_size)
         ]
-        yearly_results = await asyncio.gather(*tasks)
+        return list(await asyncio.gather(*pages))
 
-        collected_ids = [ID(pmcid) for year_ids in yearly_results for pmcid in year_ids]
-        return list(set(collected_ids))
+    def _fetch_history_page(self, history: SearchHistory, func: Callable[..., Any], retstart: int) -> Any:  # noqa: ANN401
+        """Retrieve a single page of records of a stored search.
+
+        Args:
+            history (SearchHistory): The stored search.
+            func (Callable[..., Any]): The Entrez function to call - efetch or esummary.
+            retstart (int): The index of the first record of the page.
+        """
+        handle = func(
+            db=self.database,
+            webenv=history.webenv,
+            query_key=history.query_key,
+            retstart=retstart,
+            retmax=self.history_batch_size,
+        )
+        return self._read_records(handle)
+
+    def _batch_requests(self, ids: list[ID], func: Callable[..., Any]) -> list[Any]:
+        """Helper function to batch requests to NCBI.
+
+        The batches are sent concurrently under the rate limit, see `_async_batch_requests`.
+        """
+        return asyncio.run(self._async_batch_requests(ids=ids, func=func))
+
+    async def _async_batch_requests(self, ids: list[ID], func: Callable[..., Any]) -> list[Any]:
+        """Send the IDs to NCBI in concurrent batches and return the records in the order of the IDs.
+
+        Up to `concurrency` batches are in flight, each retried on its own. The first batches
+        have `batch_size` IDs, later ones are sized so that a response takes about `target_batch_seconds`,
+        based on the time per ID of the responses received so far. Batches of small records
+        (e.g. summaries) therefore grow and the number of requests under the rate limit drops,
+        while batches of large records (e.g. full abstracts) shrink.
+
+        Args:
+            ids (list[ID]): The publication IDs.
+            func (Callable[..., Any]): The Entrez function to call - efetch or esummary.
+        """
+        records: dict[int, Any] = {}
+        position = 0
+        received_seconds = 0.0
+        received_ids = 0
+
+        async def fetch_batches() -> None:
+            nonlocal position, received_seconds, received_ids
+            while position < len(ids):
+                start = position
+                position += self._next_batch_size(received_seconds, received_ids)
+                batch_ids = ids[start:position]
+                records[start], seconds = await self._retry_limited(self._fetch_batch, batch_ids=batch_ids, func=func)
+                received_seconds += seconds
+                received_ids += len(batch_ids)
+
+        await asyncio.gather(*(fetch_batches() for _ in range(self.concurrency)))
+        return [records[start] for start in sorted(records)]
+
+    def _next_batch_size(self, seconds: float, batched_ids: int) -> int:
+        """Size the next batch from the time per ID of the batches received so far.
+
+        Args:
+            seconds (float): The total time of the received batches.
+            batched_ids (int): The total number of IDs in the received batches.
+        """
+        if not batched_ids or not seconds:
+            return self.batch_size
+        size = int(self.target_batch_seconds * batched_ids / seconds)
+        return min(self.max_batch_size, max(self.min_batch_size, size))
+
+    def _fetch_batch(self, batch_ids: list[ID], func: Callable[..., Any]) -> tuple[Any, float]:
+        """Send a single batch of IDs to NCBI.
+
+        Args:
+            batch_ids (list[ID]): The publication IDs of the batch.
+            func (Callable[..., Any]): The Entrez function to call - efetch or esummary.
+
+        Returns:
+            tuple[Any, float]: The records of the batch and the time it took to receive them.
+        """
+        start = time.monotonic()
+        handle = func(db=self.database, id=",".join(map(str, batch_ids)))
+        return self._read_records(handle), time.monotonic() - start
+
+    def _read_records(self, handle: Any) -> Any:  # noqa: ANN401
+        """Read the records from an Entrez handle and close it.
+
+        PubMed records are parsed by Entrez, PMC records are returned as the raw XML.
+        """
+        if self.database == "pubmed":
+            records = Entrez.read(handle)
+        elif self.database == "pmc":
+            records = handle.read()
+        handle.close()
+        return records
+
+    async def _async_get_ids(self, search_term: str, harvest: HarvestCheckpoint | None = None) -> list[ID]:
+        """Asynchronously retrieve a list of publication IDs based on the search term."""
+        collected_ids = [pmcid async for batch in self.aiter_id_batches(search_term, harvest) for pmcid in batch]
+        return list(dict.fromkeys(collected_ids))
 
     def _get_publication_count_and_ids(
         self,
@@ -110,6 +427,20 @@ class NCBI(GetID):
         maxdate: str | None = None,
     ) -> tuple[int, list[str]]:
         """Asynchronously retrieve the count of publications and their IDs based on the search term and date range."""
+        return await self._retry_limited(
+            self._get_publication_count_and_ids,
+            search_term=search_term,
+            mindate=mindate,
+            maxdate=maxdate,
+        )
+
+    async def _retry_limited(self, request: Callable[..., Any], **kwargs: Any) -> Any:  # noqa: ANN401
+        """Call a blocking NCBI request function in a thread under the concurrency and rate limits, with retries.
+
+        Args:
+            request (Callable[..., Any]): The function sending the request.
+            **kwargs (Any): The arguments of the function.
+        """
         async for attempt in AsyncRetrying(
             retry=retry_if_exception_type(HTTPError),
             wait=wait_random_exponential(multiplier=0.5, max=30),
@@ -118,51 +449,37 @@ class NCBI(GetID):
         ):
             with attempt:
                 async with self.semaphore:
-                    await self.limiter.wait_turn()
-                    return await asyncio.to_thread(
-                        self._get_publication_count_and_ids,
-                        search_term=search_term,
-                        mindate=mindate,
-                        maxdate=maxdate,
-                    )
+                    await self.limiter.async_wait_turn()
+                    return await asyncio.to_thread(request, **kwargs)
         msg = "Unexpected control flow: retry exceeded without returning"
         raise RuntimeError(msg)
 
-    async def _collect_ids_for_year(self, search_term: str, year: int) -> list[str]:
-        """Collect publication IDs for a specific year, splitting by months and days if the count exceeds the limit."""
-        year_count, year_ids = await self._async_get_publication_count_and_ids(
+    async def _async_get_date_range_count_and_ids(
+        self,
+        search_term: str,
+        first: datetime.date,
+        last: datetime.date,
+    ) -> tuple[int, list[str]]:
+        """Asynchronously retrieve the count of publications and their IDs published within a date range.
+
+        Args:
+            search_term (str): The search term.
+            first (datetime.date): The first day of the range.
+            last (datetime.date): The last day of the range.
+        """
+        return await self._async_get_publication_count_and_ids(
             search_term=search_term,
-            mindate=f"{year}/01/01",
-            maxdate=f"{year}/12/31",
+            mindate=first.strftime("%Y/%m/%d"),
+            maxdate=last.strftime("%Y/%m/%d"),
         )
-        if year_count <= self.max_ncbi_results:
-            return year_ids
 
-        return await self._collect_ids_split_by_months_days(search_term=search_term, year=year)
 
-    async def _collect_ids_split_by_months_days(self, search_term: str, year: int) -> list[str]:
-        """Collect publication IDs for a specific year.
+def _bisect_date_range(first: datetime.date, last: datetime.date) -> list[tuple[datetime.date, datetime.date]]:
+    """Split a date range of at least two days into two disjoint halves."""
+    middle = first + (last - first) // 2
+    return [(first, middle), (middle + datetime.timedelta(days=1), last)]
 
-        Split the search into months and days to avoid exceeding the result
-        limit.
-        """
-        year_month_days_ids = []
-        for month in range(1, 13):
-            days_in_month = calendar.monthrange(year, month)[1]
-            month_count, month_ids = await self._async_get_publication_count_and_ids(
-                search_term=search_term,
-                mindate=f"{year}/{month:02d}/01",
-                maxdate=f"{year}/{month:02d}/{days_in_month:02d}",
-            )
-            if month_count <= self.max_ncbi_results:
-                year_month_days_ids.extend(month_ids)
-                continue
-
-            for day in range(1, days_in_month + 1):
-                _day_count, day_ids = await self._async_get_publication_count_and_ids(
-                    search_term=search_term,
-                    mindate=f"{year}/{month:02d}/{day:02d}",
-                    maxdate=f"{year}/{month:02d}/{day:02d}",
-                )
-                year_month_days_ids.extend(day_ids)
-        return year_month_days_ids
+
+def _date_range_key(first: datetime.date, last: datetime.date) -> str:
+    """Name a date range in the harvest checkpoint."""
+    return f"{first:%Y/%m/%d}-{last:%Y/%m/%d}"
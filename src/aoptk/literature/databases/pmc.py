@@ -1,18 +1,23 @@
+from __future__ import annotations
 import json
 import os
+import threading
 import xml.etree.ElementTree as ET
+from collections.abc import Iterator
+from concurrent.futures import Executor
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING
 from typing import Any
 from urllib.error import HTTPError
 from urllib.parse import urlparse
-import boto3
 import pandas as pd
 from Bio import Entrez
-from botocore import UNSIGNED
-from botocore.client import Config
 from requests.adapters import MaxRetryError
 from aoptk.literature.abstract import Abstract
 from aoptk.literature.databases.ncbi import NCBI
+from aoptk.literature.databases.s3_key_index import S3KeyIndex
 from aoptk.literature.get_abstract import GetAbstract
 from aoptk.literature.get_id import GetID
 from aoptk.literature.get_metadata import GetMetadata
@@ -27,22 +32,53 @@ from aoptk.literature.pdf import PDF
 from aoptk.literature.publication import Publication
 from aoptk.literature.query import Query
 from aoptk.literature.utils import convert_image_format
+from aoptk.literature.utils import fetch_publication
 from aoptk.literature.utils import remove_pmc_prefix
+from aoptk.literature.utils import write_abstracts
+
+if TYPE_CHECKING:
+    from botocore.response import StreamingBody
 
 Entrez.api_key = os.environ.get("NCBI_API_KEY")  # type: ignore[assignment]
 
+AWS_REGION = "us-east-1"
+DEFAULT_MAX_POOL_CONNECTIONS = 10
+
+_s3_clients: dict[tuple[int, int], Any] = {}
+_s3_clients_lock = threading.Lock()
+
+
+def shared_s3_client(max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS) -> Any:  # noqa: ANN401
+    """Return the S3 client shared by the whole process for the given connection pool size.
+
+    The client is created on first use, so importing this module does not pay for boto3.
+    boto3 clients are thread-safe, so a single client serves all the threads of the process.
+    Clients are not shared with forked processes, which create their own.
+
+    Args:
+        max_pool_connections (int): Maximum number of connections the client keeps open.
+    """
+    key = (os.getpid(), max_pool_connections)
+    with _s3_clients_lock:
+        if key not in _s3_clients:
+            import boto3  # noqa: PLC0415
+            from botocore import UNSIGNED  # noqa: PLC0415
+            from botocore.client import Config  # noqa: PLC0415
+
+            _s3_clients[key] = boto3.client(
+                "s3",
+                config=Config(signature_version=UNSIGNED, max_pool_connections=max_pool_connections),
+                region_name=AWS_REGION,
+            )
+        return _s3_clients[key]
+
 
 class PMC(GetPublication, GetPDF, GetID, GetAbstract, GetMetadata):
     """Class to get data from PMC based on a query."""
 
-    aws_region = "us-east-1"
-    s3 = boto3.client(
-        "s3",
-        config=Config(signature_version=UNSIGNED),
-        region_name=aws_region,
-    )
+    aws_region = AWS_REGION
     bucket = "pmc-oa-opendata"
-    paginator = s3.get_paginator("list_objects_v2")
+    max_pool_connections = DEFAULT_MAX_POOL_CONNECTIONS
 
     image_extensions = (".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".tif")
     unified_image_format = "png"
@@ -52,7 +88,19 @@ class PMC(GetPublication, GetPDF, GetID, GetAbstract, GetMetadata):
         storage: Path,
         figure_storage: Path,
         query: Query | None = None,
+        key_index: Path | None = None,
+        max_workers: int = 1,
     ):
+        """Initialize PMC.
+
+        Args:
+            storage (Path): Directory to store the downloaded files.
+            figure_storage (Path): Directory to store the downloaded figures.
+            query (Query | None): The query to search for.
+            key_index (Path | None): SQLite file with a local index of the keys in the PMC bucket.
+            Files are looked up in the index for key prefixes it covers, see refresh_key_index.
+            max_workers (int): Number of publications, and of figures per publication, downloaded concurrently.
+        """
         if not query:
             query = Query(search_term="queryblank")
         self.search_term = self.build_search_term(query)
@@ -65,6 +113,42 @@ class PMC(GetPublication, GetPDF, GetID, GetAbstract, GetMetadata):
         self.figure_storage = figure_storage
         Path(self.figure_storage).mkdir(parents=True, exist_ok=True)
 
+        self.key_index = S3KeyIndex(key_index, self.bucket) if key_index else None
+
+        self.max_workers = max_workers
+        # Publication workers and figure downloads each hold a connection.
+        self._pool_size = max(self.max_pool_connections, 2 * max_workers)
+
+    @property
+    def s3(self) -> Any:  # noqa: ANN401
+        """The S3 client, shared by all PMC instances of the process with the same connection pool size."""
+        return shared_s3_client(self._pool_size)
+
+    @property
+    def paginator(self) -> Any:  # noqa: ANN401
+        """Paginator of the list_objects_v2 operation of the S3 client."""
+        return self.s3.get_paginator("list_objects_v2")
+
+    def refresh_key_index(self, prefix: str = "", full: bool = False) -> int:
+        """List the keys of the PMC bucket under the prefix into the local key index.
+
+        The first refresh of a prefix lists it in bulk, later refreshes only list the keys added after it.
+
+        Args:
+            prefix (str): The key prefix to index. The whole bucket is indexed if empty.
+            full (bool): Whether to list the prefix from the start instead of continuing the previous listing.
+
+        Returns:
+            int: The number of keys added to the index.
+
+        Raises:
+            ValueError: If PMC was created without a key index.
+        """
+        if not self.key_index:
+            msg = "PMC was created without a key_index file."
+            raise ValueError(msg)
+        return self.key_index.refresh(self.paginator, prefix, full=full)
+
     def build_search_term(self, query: Query) -> str:
         """Convert Query to PMC search syntax."""
         search_term = query.search_term
@@ -127,31 +211,54 @@ class PMC(GetPublication, GetPDF, GetID, GetAbstract, GetMetadata):
         Returns:
             list[Publication]: A list of Publication objects.
         """
-        publications = []
-        for publication_id in ids:
-            try:
-                if publication := self._get_publication(publication_id, download_figures_enabled):
-                    publications.append(publication)
-                    with (Path(self.storage) / f"{publication.id}.txt").open("w", encoding="utf-8") as f:
-                        f.write(publication.full_text)
-            except (HTTPError, MaxRetryError):
-                continue
-        return publications
+        # Figures are leaf downloads, so they can share one pool across all publication workers.
+        with (
+            ThreadPoolExecutor(max_workers=self.max_workers) as executor,
+            ThreadPoolExecutor(max_workers=self.max_workers) as downloads,
+        ):
+            fetch = partial(
+                fetch_publication,
+                lambda publication_id: self._get_publication(publication_id, download_figures_enabled, downloads),
+                self.storage,
+            )
+            return [publication for publication in executor.map(fetch, ids) if publication]
+
+    def get_ids(self, checkpoint: Path | None = None, resume: bool = False) -> list[ID]:
+        """Retrieve a list of publication IDs based on the search term.
 
-    def get_ids(self) -> list[ID]:
-        """Retrieve a list of publication IDs based on the search term."""
-        ids = self._ncbi.get_ids(self.search_term)
+        Args:
+            checkpoint (Path | None): File recording the progress of the harvest. No progress is recorded if None.
+            resume (bool): Whether to continue the harvest recorded in the checkpoint instead of starting over.
+        """
+        ids = self._ncbi.get_ids(self.search_term, checkpoint=checkpoint, resume=resume)
         return [ID(f"PMC{pmcid}") for pmcid in ids]
 
+    def iter_ids(self) -> Iterator[ID]:
+        """Yield publication IDs based on the search term, one date range at a time."""
+        for pmcid in self._ncbi.iter_ids(self.search_term):
+            yield ID(f"PMC{pmcid}")
+
     def get_abstracts(self, ids: list[ID]) -> list[Abstract]:
         """Retrieve Abstracts based on the list of IDs."""
         abstracts = []
         try:
             records = self._ncbi.get_abstract_records(ids)
             abstracts = self._parse_pmc_abstract_records(records)
-            for abstract in abstracts:
-                with (Path(self.storage) / f"{abstract.id}.txt").open("w", encoding="utf-8") as f:
-                    f.write(abstract.text)
+            write_abstracts(self.storage, abstracts)
+        except (HTTPError, MaxRetryError):
+            pass
+        return abstracts
+
+    def get_abstracts_for_search(self) -> list[Abstract]:
+        """Retrieve the abstracts of all publications matching the query.
+
+        The records are paged through the NCBI History Server, without collecting and sending the IDs.
+        """
+        abstracts = []
+        try:
+            records = self._ncbi.get_abstract_records_for_search(self.search_term)
+            abstracts = self._parse_pmc_abstract_records(records)
+            write_abstracts(self.storage, abstracts)
         except (HTTPError, MaxRetryError):
             pass
         return abstracts
@@ -187,6 +294,19 @@ class PMC(GetPublication, GetPDF, GetID, GetAbstract, GetMetadata):
             pass
         return metadata
 
+    def get_publications_metadata_for_search(self) -> list[Metadata]:
+        """Retrieve the metadata of all publications matching the query.
+
+        The records are paged through the NCBI History Server, without collecting and sending the IDs.
+        """
+        metadata = []
+        try:
+            records = self._ncbi.get_publications_metadata_records_for_search(self.search_term)
+            metadata = self._parse_pmc_metadata_records(records)
+        except (HTTPError, MaxRetryError):
+            pass
+        return metadata
+
     def _parse_pmc_metadata_records(self, records: list[str]) -> list[Metadata]:
         """Parse PMC metadata records and return a list of PublicationMetadata objects.
 
@@ -222,13 +342,19 @@ class PMC(GetPublication, GetPDF, GetID, GetAbstract, GetMetadata):
                 )
         return publications_metadata
 
-    def _get_publication(self, publication_id: ID, download_figures_enabled: bool = True) -> Publication | None:
+    def _get_publication(
+        self,
+        publication_id: ID,
+        download_figures_enabled: bool,
+        downloads: Executor,
+    ) -> Publication | None:
         """Parse a single PDF and return a Publication object.
 
         Args:
             publication_id (str): The publication ID to retrieve and parse.
             download_figures_enabled (bool): Whether to download figures
             and include their paths in the Publication object.
+            downloads (Executor): The pool downloading the figures.
         """
         abstract = Abstract(id=publication_id, text="")
 
@@ -236,7 +362,7 @@ class PMC(GetPublication, GetPDF, GetID, GetAbstract, GetMetadata):
         if full_text is None:
             return None
 
-        figures = self._get_figures(publication_id) if download_figures_enabled else []
+        figures = self._get_figures(publication_id, downloads) if download_figures_enabled else []
         figure_descriptions: list[str] = []
         tables: list[pd.DataFrame] = []
         return Publication(
@@ -254,15 +380,13 @@ class PMC(GetPublication, GetPDF, GetID, GetAbstract, GetMetadata):
         Args:
             publication_id (str): The publication ID to retrieve the full text for.
         """
-        if txt_path := self._get_file(publication_id, "txt"):
-            with Path.open(txt_path, encoding="utf-8") as f:
-                txt = f.read()
-            Path.unlink(txt_path)
-            return txt
+        if body := self._open_file(publication_id, "txt"):
+            with body:
+                return body.read().decode("utf-8")
         return None
 
     def _get_file(self, publication_id: ID, file_format: str) -> Path | None:
-        """Retrieve the file for a given publication ID and format.
+        """Download the file for a given publication ID and format to the storage.
 
         Args:
             publication_id (str): The publication ID to retrieve the file for.
@@ -270,50 +394,92 @@ class PMC(GetPublication, GetPDF, GetID, GetAbstract, GetMetadata):
             Formats txt, xml, pdf contain full-text, while json contains metadata.
         """
         prefix = f"{publication_id}.1/{publication_id}.1.{file_format}"
+        if key := self._find_key(prefix):
+            filepath = Path(self.storage) / f"{publication_id}.{file_format}"
+            self._download(key, filepath)
+            return filepath
+        return None
+
+    def _open_file(self, publication_id: ID, file_format: str) -> StreamingBody | None:
+        """Open the file for a given publication ID and format as a stream, without storing it on disk.
+
+        Args:
+            publication_id (str): The publication ID to open the file for.
+            file_format (str): The format of the file to open (pdf, xml, json, or txt).
+        """
+        if key := self._find_key(f"{publication_id}.1/{publication_id}.1.{file_format}"):
+            return self.s3.get_object(Bucket=self.bucket, Key=key)["Body"]
+        return None
+
+    def _find_key(self, prefix: str) -> str | None:
+        """Find the first key in the PMC bucket starting with the prefix.
+
+        The local key index is used if it covers the prefix, otherwise the bucket is listed.
+
+        Args:
+            prefix (str): The key prefix to look up.
+        """
+        if self.key_index and self.key_index.covers(prefix):
+            return self.key_index.find(prefix)
         response = self.s3.list_objects_v2(Bucket=self.bucket, Prefix=prefix, MaxKeys=1)
         if contents := response.get("Contents", []):
-            if key := contents[0]["Key"]:
-                filepath = Path(self.storage) / f"{publication_id}.{file_format}"
-                self.s3.download_file(self.bucket, key, str(filepath))
-                return filepath
-            return None
+            return contents[0]["Key"] or None
         return None
 
-    def _get_figures(self, publication_id: ID) -> list[Path]:
+    def _get_figures(self, publication_id: ID, downloads: Executor) -> list[Path]:
         """Retrieve the figure files for a given publication ID.
 
         Args:
             publication_id (ID): The publication ID to retrieve the figure files for.
+            downloads (Executor): The pool downloading the figures.
         """
         if metadata := self._get_json(publication_id):
             supplementary_files = metadata.get("media_urls", [])
-            return self._extract_figures_from_supplements(publication_id, supplementary_files)
+            return self._extract_figures_from_supplements(publication_id, supplementary_files, downloads)
 
         return []
 
-    def _extract_figures_from_supplements(self, publication_id: ID, supplementary_files: list[str]) -> list[Path]:
+    def _extract_figures_from_supplements(
+        self,
+        publication_id: ID,
+        supplementary_files: list[str],
+        downloads: Executor,
+    ) -> list[Path]:
         """Extract figure files from the supplementary files.
 
         Args:
             publication_id (ID): The publication ID to retrieve the figure files for.
             supplementary_files (list[str]): A list of supplementary file URLs to extract figures from.
+            downloads (Executor): The pool downloading the figures.
         """
-        figures_paths = []
-
         base_dir = Path(self.figure_storage) / f"{publication_id}"
         base_dir.mkdir(parents=True, exist_ok=True)
 
+        keys = []
+        figures_paths = []
         for supplement in supplementary_files:
             parsed = urlparse(supplement)
 
             key = parsed.path.lstrip("/")
             if key.lower().endswith(self.image_extensions):
-                image_name = Path(parsed.path).name
-                image_path = base_dir / image_name
-                image_path.parent.mkdir(parents=True, exist_ok=True)
-                self.s3.download_file(self.bucket, key, str(image_path))
-                figures_paths.append(str(image_path))
-        return convert_image_format([Path(path) for path in figures_paths], self.unified_image_format)
+                keys.append(key)
+                figures_paths.append(base_dir / Path(parsed.path).name)
+
+        list(downloads.map(self._download, keys, figures_paths))
+        return convert_image_format(figures_paths, self.unified_image_format)
+
+    def _download(self, key: str, filepath: Path) -> None:
+        """Download an object of the PMC bucket to a file.
+
+        Args:
+            key (str): The key of the object.
+            filepath (Path): The file to write the object to.
+        """
+        from boto3.s3.transfer import TransferConfig  # noqa: PLC0415
+
+        # Objects are downloaded concurrently, so a single download does not spawn threads of its own.
+        transfer_config = TransferConfig(use_threads=self.max_workers == 1)
+        self.s3.download_file(self.bucket, key, str(filepath), Config=transfer_config)
 
     def _get_json(self, publication_id: ID) -> dict[str, Any] | None:
         """Retrieve the json for a given publication ID.
@@ -321,10 +487,9 @@ class PMC(GetPublication, GetPDF, GetID, GetAbstract, GetMetadata):
         Args:
             publication_id (str): The publication ID to retrieve the json for.
         """
-        if json_path := self._get_file(publication_id, "json"):
-            metadata = json.load(json_path.open())
-            Path.unlink(json_path)
-            return metadata
+        if body := self._open_file(publication_id, "json"):
+            with body:
+                return json.load(body)
         return None
 
     def _get_pdf(self, publication_id: ID) -> PDF | None:
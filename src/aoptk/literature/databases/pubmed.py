@@ -1,5 +1,6 @@
 from __future__ import annotations
 import os
+from collections.abc import Iterator
 from itertools import chain
 from pathlib import Path
 from typing import Any
@@ -17,6 +18,7 @@ from aoptk.literature.id import PMCID
 from aoptk.literature.id import PMID
 from aoptk.literature.metadata import Metadata
 from aoptk.literature.query import Query
+from aoptk.literature.utils import write_abstracts
 
 Entrez.api_key = os.environ.get("NCBI_API_KEY")  # type: ignore[assignment]
 
@@ -54,9 +56,21 @@ class PubMed(GetAbstract, GetID, GetMetadata):
         try:
             records = self._ncbi.get_abstract_records(ids)
             abstracts = self._parse_pubmed_abstract_records(records)
-            for abstract in abstracts:
-                with (Path(self.storage) / f"{abstract.id}.txt").open("w", encoding="utf-8") as f:
-                    f.write(abstract.text)
+            write_abstracts(self.storage, abstracts)
+        except (HTTPError, MaxRetryError):
+            pass
+        return abstracts
+
+    def get_abstracts_for_search(self) -> list[Abstract]:
+        """Retrieve the abstracts of all publications matching the query.
+
+        The records are paged through the NCBI History Server, without collecting and sending the IDs.
+        """
+        abstracts = []
+        try:
+            records = self._ncbi.get_abstract_records_for_search(self.search_term)
+            abstracts = self._parse_pubmed_abstract_records(records)
+            write_abstracts(self.storage, abstracts)
         except (HTTPError, MaxRetryError):
             pass
         return abstracts
@@ -84,6 +98,19 @@ class PubMed(GetAbstract, GetID, GetMetadata):
             pass
         return metadata
 
+    def get_publications_metadata_for_search(self) -> list[Metadata]:
+        """Retrieve the metadata of all publications matching the query.
+
+        The records are paged through the NCBI History Server, without collecting and sending the IDs.
+        """
+        metadata = []
+        try:
+            records = self._ncbi.get_publications_metadata_records_for_search(self.search_term)
+            metadata = self._parse_pubmed_metadata_records(records)
+        except (HTTPError, MaxRetryError):
+            pass
+        return metadata
+
     def _parse_pubmed_metadata_records(self, records: list[list[dict[str, Any]]]) -> list[Metadata]:
         """Parse PubMed metadata records and return a list of PublicationMetadata objects.
 
@@ -111,6 +138,15 @@ class PubMed(GetAbstract, GetID, GetMetadata):
                 )
         return publications_metadata
 
-    def get_ids(self) -> list[ID]:
-        """Get a list of PubMed IDs from PubMed based on the query."""
-        return self._ncbi.get_ids(search_term=self.search_term)
+    def get_ids(self, checkpoint: Path | None = None, resume: bool = False) -> list[ID]:
+        """Get a list of PubMed IDs from PubMed based on the query.
+
+        Args:
+            checkpoint (Path | None): File recording the progress of the harvest. No progress is recorded if None.
+            resume (bool): Whether to continue the harvest recorded in the checkpoint instead of starting over.
+        """
+        return self._ncbi.get_ids(search_term=self.search_term, checkpoint=checkpoint, resume=resume)
+
+    def iter_ids(self) -> Iterator[ID]:
+        """Yield PubMed IDs from PubMed based on the query, one date range at a time."""
+        yield from self._ncbi.iter_ids(search_term=self.search_term)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any
+
+
+class S3KeyIndex:
+    """Local, persistent index of the keys stored in an S3 bucket.
+
+    The index is filled from bulk listings of key prefixes and stored in a SQLite database,
+    so that finding the key of a file is a local lookup instead of a request to S3.
+    Only prefixes whose listing was completed are considered covered by the index.
+    """
+
+    def __init__(self, path: Path, bucket: str):
+        """Open the index, creating the database if it does not exist.
+
+        Args:
+            path (Path): The SQLite database file of the index.
+            bucket (str): The bucket whose keys are indexed.
+        """
+        self.path = Path(path)
+        self.bucket = bucket
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS keys (key TEXT PRIMARY KEY) WITHOUT ROWID")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS listings (prefix TEXT PRIMARY KEY, last_key TEXT, complete INTEGER)",
+            )
+            rows = self._connection.execute("SELECT prefix FROM listings WHERE complete = 1").fetchall()
+        self._covered_prefixes = {prefix for (prefix,) in rows}
+
+    def refresh(self, paginator: Any, prefix: str = "", full: bool = False) -> int:  # noqa: ANN401
+        """List the keys under the prefix and add them to the index.
+
+        By default the listing continues after the last key listed under the prefix, which
+        resumes an interrupted listing and picks up keys added since, as long as they sort after it.
+        New articles are assigned increasing PMC IDs, so narrow prefixes such as "PMC12" are
+        kept up to date this way.
+
+        Args:
+            paginator (Any): A boto3 paginator for the list_objects_v2 operation.
+            prefix (str): The key prefix to list. The whole bucket is listed if empty.
+            full (bool): Whether to list the prefix from the start, dropping keys that were removed from the bucket.
+
+        Returns:
+            int: The number of keys added to the index.
+        """
+        with self._lock, self._connection:
+            if full:
+                self._connection.execute("DELETE FROM keys WHERE key >= ? AND key < ?", (prefix, _prefix_end(prefix)))
+                self._connection.execute("DELETE FROM listings WHERE prefix = ?", (prefix,))
+                self._covered_prefixes.discard(prefix)
+            row = self._connection.execute(
+                "SELECT last_key, complete FROM listings WHERE prefix = ?",
+                (prefix,),
+            ).fetchone()
+            last_key, complete = row or ("", 0)
+            if not row:
+                self._connection.execute("INSERT INTO listings VALUES (?, '', 0)", (prefix,))
+
+        parameters = {"Bucket": self.bucket, "Prefix": prefix}
+        if last_key:
+            parameters["StartAfter"] = last_key
+        added = 0
+        for page in paginator.paginate(**parameters):
+            if not (keys := [item["Key"] for item in page.get("Contents", [])]):
+                continue
+            with self._lock, self._connection:
+                before = self._connection.total_changes
+                self._connection.executemany("INSERT OR IGNORE INTO keys VALUES (?)", [(key,) for key in keys])
+                added += self._connection.total_changes - before
+                self._connection.execute("UPDATE listings SET last_key = ? WHERE prefix = ?", (keys[-1], prefix))
+
+        if not complete:
+            with self._lock, self._connection:
+                self._connection.execute("UPDATE listings SET complete = 1 WHERE prefix = ?", (prefix,))
+                self._covered_prefixes.add(prefix)
+        return added
+
+    def covers(self, prefix: str) -> bool:
+        """Whether all the keys starting with the prefix are known to the index.
+
+        Args:
+            prefix (str): The key prefix to check.
+        """
+        with self._lock:
+            covered_prefixes = set(self._covered_prefixes)
+        return any(prefix.startswith(covered) for covered in covered_prefixes)
+
+    def find(self, prefix: str) -> str | None:
+        """Find the first indexed key starting with the prefix.
+
+        Args:
+            prefix (str): The key prefix to look up.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT key FROM keys WHERE key >= ? AND key < ? ORDER BY key LIMIT 1",
+                (prefix, _prefix_end(prefix)),
+            ).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+def _prefix_end(prefix: str) -> str:
+    """Return the smallest string greater than every string starting with the prefix."""
+    return prefix + "\U0010ffff"
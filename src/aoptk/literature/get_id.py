@@ -4,6 +4,7 @@ from abc import abstractmethod
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
     from aoptk.literature.id import ID
 
 
@@ -13,3 +14,7 @@ class GetID(ABC):
     @abstractmethod
     def get_ids(self) -> list[ID]:
         """Return a list of IDs."""
+
+    def iter_ids(self) -> Iterator[ID]:
+        """Yield IDs one by one, so that processing can start before all IDs are retrieved."""
+        yield from self.get_ids()
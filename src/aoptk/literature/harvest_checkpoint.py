@@ -0,0 +1,101 @@
+from __future__ import annotations
+import json
+import threading
+from pathlib import Path
+from aoptk.literature.id import ID
+
+
+class HarvestCheckpoint:
+    """Progress of a publication ID harvest, recorded to a file so that an interrupted harvest can be resumed.
+
+    The file is written in the JSON Lines format. The first line identifies the search term,
+    every following line records the IDs of one finished page or shard together with the position
+    to continue from - the next cursor mark or the name of the completed shard. Lines are only
+    appended, so recording progress costs the same regardless of how many IDs were already collected.
+    Without a path, the progress is not recorded at all.
+    """
+
+    def __init__(self, path: Path | None, search_term: str, resume: bool = False):
+        """Create a checkpoint, loading the recorded progress when resuming.
+
+        Args:
+            path (Path | None): The checkpoint file. Nothing is recorded if None.
+            search_term (str): The search term of the harvest.
+            resume (bool): Whether to continue from the progress recorded in an existing file.
+            Otherwise the file is overwritten.
+
+        Raises:
+            ValueError: If the checkpoint to resume from belongs to a different search term.
+        """
+        self.path = Path(path) if path else None
+        self.search_term = search_term
+        self.ids: list[ID] = []
+        self.cursor_mark = "*"
+        self.completed: dict[str, list[ID]] = {}
+        self.done = False
+        self._lock = threading.Lock()
+
+        if not self.path:
+            return
+        if resume and self.path.exists():
+            self._load(self.path)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps({"search_term": search_term}) + "\n", encoding="utf-8")
+
+    def record(
+        self,
+        ids: list[ID],
+        cursor_mark: str | None = None,
+        completed: str | None = None,
+        done: bool = False,
+    ) -> None:
+        """Record the IDs harvested since the last record and the position to continue from.
+
+        Args:
+            ids (list[ID]): The newly harvested IDs.
+            cursor_mark (str | None): The cursor mark of the next page to harvest.
+            completed (str | None): The name of the shard that was completed.
+            done (bool): Whether the whole harvest is finished.
+        """
+        if not self.path:
+            return
+        entry: dict = {"ids": [str(publication_id) for publication_id in ids]}
+        if cursor_mark:
+            entry["cursor_mark"] = cursor_mark
+        if completed:
+            entry["completed"] = completed
+        if done:
+            entry["done"] = True
+        with self._lock, self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def _load(self, path: Path) -> None:
+        """Load the progress recorded in the checkpoint file.
+
+        A last line left incomplete by an interrupted write is dropped from the file.
+
+        Args:
+            path (Path): The checkpoint file.
+        """
+        with path.open("rb+") as f:
+            header = json.loads(f.readline())
+            if header.get("search_term") != self.search_term:
+                msg = f"Checkpoint {path} belongs to a different search term: {header.get('search_term')}"
+                raise ValueError(msg)
+            valid_size = f.tell()
+            for line in f:
+                try:
+                    entry = json.loads(line) if line.endswith(b"\n") else None
+                except json.JSONDecodeError:
+                    entry = None
+                if entry is None:
+                    f.truncate(valid_size)
+                    break
+                valid_size += len(line)
+                ids = [ID(publication_id) for publication_id in entry.get("ids", [])]
+                self.ids.extend(ids)
+                self.cursor_mark = entry.get("cursor_mark", self.cursor_mark)
+                if completed := entry.get("completed"):
+                    self.completed[completed] = ids
+                self.done = self.done or entry.get("done", False)
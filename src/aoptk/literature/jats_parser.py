@@ -0,0 +1,184 @@
+from __future__ import annotations
+import xml.etree.ElementTree as ET
+from collections.abc import Callable
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import IO
+import pandas as pd
+
+
+@dataclass
+class JATSArticle:
+    """Data structure representing the sections extracted from a JATS XML article."""
+
+    abstract: str
+    full_text: str
+    figure_descriptions: str
+    tables: list[pd.DataFrame]
+
+
+@dataclass
+class _TableWrap:
+    """Parsing state of a single <table-wrap> element."""
+
+    index: int
+    table: ET.Element | None = None
+    rows: list[list[str]] = field(default_factory=list)
+
+
+@dataclass
+class _Row:
+    """Parsing state of a single <tr> element."""
+
+    table_wrap: _TableWrap
+    data_cells: list[str] = field(default_factory=list)
+    header_cells: list[str] = field(default_factory=list)
+
+
+def parse_jats(source: str | Path | IO[bytes]) -> JATSArticle:
+    """Extract the abstract, full text, figure descriptions and tables from a JATS XML article in a single pass.
+
+    The document is parsed incrementally and every element is released as soon as no enclosing
+    section needs its text anymore, so peak memory is bounded by the largest section instead of the article.
+
+    Args:
+        source (str | Path | IO[bytes]): Path to the XML file or a binary stream with the XML content.
+    """
+    return _JATSExtractor().parse(source)
+
+
+class _JATSExtractor:
+    """Single traversal extractor of JATS XML sections."""
+
+    def __init__(self):
+        self.abstract: str | None = None
+        self.full_text: list[str] = []
+        self.figure_descriptions: list[str] = []
+        self.tables: list[pd.DataFrame | None] = []
+        self._text_slots: list[tuple[list[str], int]] = []
+        self._table_wraps: list[_TableWrap] = []
+        self._open_tables: list[_TableWrap] = []
+        self._rows: list[_Row] = []
+        self._in_abstract = False
+        self._open_sections = 0
+        self._start_handlers: dict[str, Callable[[ET.Element], None]] = {
+            "title": self._start_full_text,
+            "p": self._start_full_text,
+            "fig": self._start_figure,
+            "abstract": self._start_abstract,
+            "table-wrap": self._start_table_wrap,
+            "table": self._start_table,
+            "tr": self._start_row,
+        }
+        self._end_handlers: dict[str, Callable[[ET.Element], None]] = {
+            "title": self._end_text,
+            "p": self._end_text,
+            "fig": self._end_text,
+            "abstract": self._end_abstract,
+            "table-wrap": self._end_table_wrap,
+            "table": self._end_table,
+            "td": self._end_cell,
+            "th": self._end_cell,
+            "tr": self._end_row,
+        }
+
+    def parse(self, source: str | Path | IO[bytes]) -> JATSArticle:
+        """Parse the source and return the extracted sections.
+
+        Args:
+            source (str | Path | IO[bytes]): Path to the XML file or a binary stream with the XML content.
+        """
+        for event, element in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                if handler := self._start_handlers.get(element.tag):
+                    handler(element)
+                continue
+            if handler := self._end_handlers.get(element.tag):
+                handler(element)
+            if not self._open_sections:
+                element.clear()
+        return JATSArticle(
+            abstract=self.abstract or "",
+            full_text="\n\n".join(text for text in self.full_text if text),
+            figure_descriptions="\n\n".join(text for text in self.figure_descriptions if text),
+            tables=[table for table in self.tables if table is not None],
+        )
+
+    def _start_full_text(self, _element: ET.Element) -> None:
+        """Reserve the place of a title or paragraph in the full text."""
+        self._start_text(self.full_text)
+
+    def _start_figure(self, _element: ET.Element) -> None:
+        """Reserve the place of a figure in the figure descriptions."""
+        self._start_text(self.figure_descriptions)
+
+    def _start_text(self, lines: list[str]) -> None:
+        """Reserve a place for the text of an element that has just been opened.
+
+        Args:
+            lines (list[str]): The section the text belongs to.
+        """
+        self._text_slots.append((lines, len(lines)))
+        lines.append("")
+        self._open_sections += 1
+
+    def _end_text(self, element: ET.Element) -> None:
+        """Fill the most recently reserved place with the text of the element that has just been closed."""
+        lines, index = self._text_slots.pop()
+        lines[index] = "".join(element.itertext()).strip()
+        self._open_sections -= 1
+
+    def _start_abstract(self, _element: ET.Element) -> None:
+        """Start collecting the first abstract of the article."""
+        if self.abstract is None and not self._in_abstract:
+            self._in_abstract = True
+            self._open_sections += 1
+
+    def _end_abstract(self, element: ET.Element) -> None:
+        """Store the text of the first abstract of the article."""
+        if self._in_abstract:
+            self.abstract = " ".join(element.itertext()).strip()
+            self._in_abstract = False
+            self._open_sections -= 1
+
+    def _start_table_wrap(self, _element: ET.Element) -> None:
+        """Reserve the place of a table in document order."""
+        self._table_wraps.append(_TableWrap(index=len(self.tables)))
+        self.tables.append(None)
+        self._open_sections += 1
+
+    def _end_table_wrap(self, _element: ET.Element) -> None:
+        """Convert the rows collected for a table wrap into a DataFrame, if it contained a table."""
+        table_wrap = self._table_wraps.pop()
+        if table_wrap.table is not None:
+            self.tables[table_wrap.index] = pd.DataFrame(table_wrap.rows)
+        self._open_sections -= 1
+
+    def _start_table(self, element: ET.Element) -> None:
+        """Start collecting rows if this is the first table of the enclosing table wrap."""
+        if self._table_wraps and self._table_wraps[-1].table is None:
+            self._table_wraps[-1].table = element
+            self._open_tables.append(self._table_wraps[-1])
+
+    def _end_table(self, element: ET.Element) -> None:
+        """Stop collecting rows once the table of the enclosing table wrap is closed."""
+        if self._open_tables and self._open_tables[-1].table is element:
+            self._open_tables.pop()
+
+    def _start_row(self, _element: ET.Element) -> None:
+        """Start a new row of the table being collected."""
+        if self._open_tables:
+            self._rows.append(_Row(table_wrap=self._open_tables[-1]))
+
+    def _end_cell(self, element: ET.Element) -> None:
+        """Add the text of a data or header cell to the current row."""
+        if self._rows:
+            cells = self._rows[-1].data_cells if element.tag == "td" else self._rows[-1].header_cells
+            cells.append("".join(element.itertext()).strip())
+
+    def _end_row(self, _element: ET.Element) -> None:
+        """Add the current row to its table, preferring data cells over header cells."""
+        if self._rows:
+            row = self._rows.pop()
+            row.table_wrap.rows.append(row.data_cells or row.header_cells)
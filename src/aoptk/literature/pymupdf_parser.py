@@ -187,8 +187,7 @@ class PymupdfParser(PDFParser):
         """
         full_text = ""
         if self.text_generation:
-            for img_base64 in pdf_as_images:
-                text_from_image = self.text_generation.convert_pdf_scan(img_base64, mime_type="image/png")
+            for text_from_image in self.text_generation.convert_pdf_scans(pdf_as_images, mime_type="image/png"):
                 full_text += text_from_image + "\n"
         return full_text
 
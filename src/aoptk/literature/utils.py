@@ -1,26 +1,87 @@
 import asyncio
+import threading
 import time
+from collections.abc import Callable
 from pathlib import Path
+from urllib.error import HTTPError
 from PIL import Image
+from requests.adapters import MaxRetryError
+from aoptk.literature.abstract import Abstract
 from aoptk.literature.id import ID
+from aoptk.literature.publication import Publication
 
 
-class AsyncRequestLimiter:
-    """Asynchronous request limiter to control the rate of API calls."""
+class RequestLimiter:
+    """Token bucket request limiter to control the rate of API calls.
 
-    def __init__(self, requests_per_second: int):
-        self.min_interval = 1.0 / requests_per_second
-        self._lock = asyncio.Lock()
-        self._next_allowed = 0.0
+    The bucket holds up to `burst` tokens and is refilled at `requests_per_second`. Every request
+    takes a token, waiting for the next one when the bucket is empty, so short bursts pass
+    immediately while the long-term rate stays capped. Blocking and asynchronous callers draw from
+    the same bucket, whatever thread or event loop they run in.
+    """
 
-    async def wait_turn(self) -> None:
-        """Wait until it's the turn for the next request based on the rate limit."""
-        async with self._lock:
+    def __init__(self, requests_per_second: float, burst: int = 1):
+        self.min_interval = 1.0 / requests_per_second
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def wait_turn(self) -> None:
+        """Block the calling thread until it's the turn for the next request based on the rate limit."""
+        if delay := self._reserve():
+            time.sleep(delay)
+
+    async def async_wait_turn(self) -> None:
+        """Wait without blocking the event loop until it's the turn for the next request based on the rate limit."""
+        if delay := self._reserve():
+            await asyncio.sleep(delay)
+
+    def _reserve(self) -> float:
+        """Take a token and return how long to wait until it is available.
+
+        Tokens may be taken ahead of time, leaving a debt that later requests wait for in turn.
+        """
+        with self._lock:
             now = time.monotonic()
-            if now < self._next_allowed:
-                await asyncio.sleep(self._next_allowed - now)
-                now = time.monotonic()
-            self._next_allowed = now + self.min_interval
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) / self.min_interval)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens * self.min_interval)
+
+
+def fetch_publication(
+    get_publication: Callable[[ID], Publication | None],
+    storage: Path,
+    publication_id: ID,
+) -> Publication | None:
+    """Retrieve a single publication and store its full text, skipping it on failure.
+
+    Args:
+        get_publication (Callable[[ID], Publication | None]): Retrieves the publication with the given ID.
+        storage (Path): The directory to write the full text to.
+        publication_id (ID): The ID of the publication to retrieve.
+    """
+    try:
+        if publication := get_publication(publication_id):
+            with (Path(storage) / f"{publication.id}.txt").open("w", encoding="utf-8") as f:
+                f.write(publication.full_text)
+            return publication
+    except (HTTPError, MaxRetryError):
+        return None
+    return None
+
+
+def write_abstracts(storage: Path, abstracts: list[Abstract]) -> None:
+    """Write the abstracts to text files in the storage.
+
+    Args:
+        storage (Path): The directory to write the abstracts to.
+        abstracts (list[Abstract]): The abstracts to write.
+    """
+    for abstract in abstracts:
+        with (Path(storage) / f"{abstract.id}.txt").open("w", encoding="utf-8") as f:
+            f.write(abstract.text)
 
 
 def is_europepmc_id(publication_id: ID) -> bool:
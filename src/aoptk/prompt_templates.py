@@ -0,0 +1,37 @@
+from __future__ import annotations
+import threading
+from pathlib import Path
+from jinja2 import Environment
+from jinja2 import FileSystemLoader
+
+_environments: dict[tuple[tuple[Path, ...], bool], Environment] = {}
+_environments_lock = threading.Lock()
+
+
+def prompt_templates(template_dirs: tuple[Path, ...], auto_reload: bool = False) -> Environment:
+    """Return the registry of the prompt templates in the given directories, shared by the whole process.
+
+    All the templates are loaded and compiled when the registry is created, so rendering a prompt
+    does not touch the filesystem. Templates are looked up in the directories in order, so a template
+    in an earlier directory overrides one with the same name in a later directory.
+
+    Args:
+        template_dirs (tuple[Path, ...]): The directories with the templates.
+        auto_reload (bool): Whether to recompile a template when its file changes, e.g. while developing prompts.
+        The modification time of the file is then checked on every use.
+    """
+    # The registry is looked up on every render, so the directories are only resolved when it is created.
+    key = (tuple(template_dirs), auto_reload)
+    if (environment := _environments.get(key)) is not None:
+        return environment
+    with _environments_lock:
+        if key not in _environments:
+            environment = Environment(
+                loader=FileSystemLoader([Path(template_dir).resolve() for template_dir in template_dirs]),
+                auto_reload=auto_reload,
+                autoescape=False,  # noqa: S701
+            )
+            for name in environment.list_templates():
+                environment.get_template(name)
+            _environments[key] = environment
+        return _environments[key]
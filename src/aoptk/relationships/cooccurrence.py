@@ -0,0 +1,107 @@
+from __future__ import annotations
+import re
+from bisect import bisect_right
+from collections import defaultdict
+from aoptk.chemical import Chemical
+from aoptk.effect import Effect
+
+
+class CooccurrenceFilter:
+    """Lexical pre-filter of the chemicals and effects mentioned close to each other in a text.
+
+    The names and synonyms of the chemicals and the names of the effects are found case-insensitively
+    as whole words in a single scan of the text. A chemical and an effect are mentioned together when
+    they appear at most `window` sentences apart, and the sentences spanning their mentions make up the context.
+    """
+
+    def __init__(self, chemicals: list[Chemical], effects: list[Effect], window: int = 1):
+        """Prepare the scan for the names of the chemicals and effects.
+
+        Args:
+            chemicals (list[Chemical]): The chemicals, found by their name, heading and synonyms.
+            effects (list[Effect]): The effects, found by their name.
+            window (int): How many sentences apart a chemical and an effect may be mentioned.
+        """
+        self.chemicals = chemicals
+        self.effects = effects
+        self.window = window
+        self._entities: dict[str, list[Chemical | Effect]] = defaultdict(list)
+        for chemical in chemicals:
+            for name in {name for name in (chemical.name, chemical.heading, *chemical.synonyms) if name}:
+                self._entities[name.lower()].append(chemical)
+        for effect in effects:
+            self._entities[effect.name.lower()].append(effect)
+        names = sorted(self._entities, key=len, reverse=True)
+        self._pattern = (
+            re.compile(r"(?<!\w)(?:" + "|".join(map(re.escape, names)) + r")(?!\w)", re.IGNORECASE) if names else None
+        )
+
+    def find(self, text: str) -> dict[tuple[Chemical, Effect], str]:
+        """Find the chemical and effect pairs mentioned together.
+
+        Args:
+            text (str): The text to scan.
+
+        Returns:
+            dict[tuple[Chemical, Effect], str]: The context of every pair mentioned together.
+        """
+        sentences, co_mentions = self._co_mentions(text)
+        return {pair: _join(sentences, indices) for pair, indices in co_mentions.items()}
+
+    def find_by_effect(self, text: str) -> dict[Effect, tuple[list[Chemical], str]]:
+        """Find the chemicals mentioned together with every effect.
+
+        Args:
+            text (str): The text to scan.
+
+        Returns:
+            dict[Effect, tuple[list[Chemical], str]]: The chemicals mentioned together with every effect
+            and the context of all their mentions.
+        """
+        sentences, co_mentions = self._co_mentions(text)
+        by_effect: dict[Effect, tuple[list[Chemical], set[int]]] = {}
+        for (chemical, effect), indices in co_mentions.items():
+            chemicals, effect_indices = by_effect.setdefault(effect, ([], set()))
+            chemicals.append(chemical)
+            effect_indices.update(indices)
+        return {effect: (chemicals, _join(sentences, indices)) for effect, (chemicals, indices) in by_effect.items()}
+
+    def _co_mentions(self, text: str) -> tuple[list[str], dict[tuple[Chemical, Effect], set[int]]]:
+        """Find the sentences spanning the mentions of every chemical and effect pair mentioned together.
+
+        Args:
+            text (str): The text to scan.
+
+        Returns:
+            tuple[list[str], dict[tuple[Chemical, Effect], set[int]]]: The sentences of the text and the
+            indices of the sentences spanning the mentions of every pair, in the order of the chemicals and effects.
+        """
+        starts = [0, *(match.end() for match in re.finditer(r"(?<=[.!?])\s+|\n\s*\n", text))]
+        sentences = [text[start:end].strip() for start, end in zip(starts, [*starts[1:], len(text)], strict=True)]
+        mentions: dict[Chemical | Effect, set[int]] = defaultdict(set)
+        for match in self._pattern.finditer(text) if self._pattern else ():
+            sentence = bisect_right(starts, match.start()) - 1
+            for entity in self._entities[match.group().lower()]:
+                mentions[entity].add(sentence)
+
+        co_mentions = {}
+        for chemical in self.chemicals:
+            for effect in self.effects:
+                indices = {
+                    index
+                    for chemical_sentence in mentions.get(chemical, ())
+                    for effect_sentence in mentions.get(effect, ())
+                    if abs(chemical_sentence - effect_sentence) <= self.window
+                    for index in range(
+                        min(chemical_sentence, effect_sentence),
+                        max(chemical_sentence, effect_sentence) + 1,
+                    )
+                }
+                if indices:
+                    co_mentions[chemical, effect] = indices
+        return sentences, co_mentions
+
+
+def _join(sentences: list[str], indices: set[int]) -> str:
+    """Join the sentences at the indices in the order of the text."""
+    return " ".join(sentences[index] for index in sorted(indices))
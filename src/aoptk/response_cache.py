@@ -0,0 +1,131 @@
+from __future__ import annotations
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class ResponseCache:
+    """Persistent cache of LLM responses, addressed by the hash of the request.
+
+    Responses are stored in a SQLite database. Entries older than `max_age` seconds are treated as
+    missing and removed, and only the `max_entries` most recently used entries are kept.
+    The cache is thread-safe, so a single instance can serve concurrent prompts. Hits only record
+    their use in memory, and the uses are written in batches of `touch_batch_size`, before
+    evicting and when the cache is closed.
+    """
+
+    touch_batch_size: int = 100
+
+    def __init__(self, path: Path, max_entries: int | None = None, max_age: float | None = None):
+        """Open the cache, creating the database if it does not exist.
+
+        Args:
+            path (Path): The SQLite database file of the cache.
+            max_entries (int | None): Maximum number of cached responses. Unlimited if None.
+            max_age (float | None): Maximum age of a cached response in seconds. Unlimited if None.
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._touched: dict[str, float] = {}
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, response TEXT, created REAL, last_used REAL) WITHOUT ROWID",
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+            self._entries: int = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def key(**request: object) -> str:
+        """Hash the request parameters into a cache key.
+
+        Args:
+            **request (object): JSON serializable request parameters, e.g. the model, url,
+            sampling parameters and the messages including images.
+        """
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Return the cached response for the key, or None if it is not cached or has expired.
+
+        Args:
+            key (str): The cache key.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and self.max_age is not None and now - row[1] > self.max_age:
+                with self._connection:
+                    self._delete("DELETE FROM responses WHERE key = ?", key)
+                row = None
+            if not row:
+                self.misses += 1
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= self.touch_batch_size:
+                with self._connection:
+                    self._write_touched()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        """Store the response under the key and evict the entries over the limits.
+
+        Args:
+            key (str): The cache key.
+            response (str): The response to cache.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            if not self._connection.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone():
+                self._entries += 1
+            self._connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, response, now, now))
+            self._touched.pop(key, None)
+            if self.max_age is not None:
+                self._delete("DELETE FROM responses WHERE created < ?", now - self.max_age)
+            if self.max_entries is not None and self._entries > self.max_entries:
+                self._write_touched()
+                self._delete(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used ASC LIMIT ?)",
+                    self._entries - self.max_entries,
+                )
+
+    def _write_touched(self) -> None:
+        """Write the recorded uses of the hits, the lock must be held."""
+        self._connection.executemany(
+            "UPDATE responses SET last_used = ? WHERE key = ?",
+            [(last_used, key) for key, last_used in self._touched.items()],
+        )
+        self._touched.clear()
+
+    def _delete(self, statement: str, parameter: object) -> None:
+        """Delete entries and count them out, the lock must be held.
+
+        Args:
+            statement (str): The DELETE statement with a single parameter.
+            parameter (object): The parameter of the statement.
+        """
+        self._entries -= self._connection.execute(statement, (parameter,)).rowcount
+
+    def __len__(self) -> int:
+        """Return the number of cached responses."""
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        """Write the recorded uses of the hits and close the database connection."""
+        with self._lock:
+            with self._connection:
+                self._write_touched()
+            self._connection.close()
@@ -1,15 +1,33 @@
 from __future__ import annotations
 import base64
 import os
+import time
+from collections.abc import Callable
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http import HTTPStatus
 from itertools import product
 from pathlib import Path
+from typing import Any
 from typing import Literal
+from typing import TypeVar
 import pandas as pd
 from dotenv import load_dotenv
-from jinja2 import Template
+from openai import APIConnectionError
+from openai import APIStatusError
+from openai import APITimeoutError
+from openai import InternalServerError
 from openai import OpenAI
+from openai import RateLimitError
+from openai.types.chat import ChatCompletion
 from openai.types.chat import ChatCompletionContentPartParam
 from openai.types.chat import ChatCompletionUserMessageParam
+from tenacity import Retrying
+from tenacity import retry_if_exception_type
+from tenacity import stop_after_attempt
+from tenacity import wait_random_exponential
+from aoptk.adaptive_concurrency import AdaptiveConcurrencyLimiter
 from aoptk.chemical import Chemical
 from aoptk.effect import Effect
 from aoptk.find_chemical import FindChemical
@@ -17,14 +35,21 @@ from aoptk.literature.convert_image import ConvertImage
 from aoptk.literature.convert_pdf_scan import ConvertPDFScan
 from aoptk.literature.find_relevant_publication import FindRelevantPublication
 from aoptk.normalization.normalize_chemical import NormalizeChemical
+from aoptk.prompt_templates import prompt_templates
+from aoptk.relationships.cooccurrence import CooccurrenceFilter
 from aoptk.relationships.find_relationship import FindRelationship
 from aoptk.relationships.relationship import Relationship
 from aoptk.relationships.relationship_type import Causative
 from aoptk.relationships.relationship_type import Inhibitive
 from aoptk.relationships.relationship_type import RelationshipType
+from aoptk.response_cache import ResponseCache
+from aoptk.text_utils import chunk_text
 
 topics = {Inhibitive(), Causative()}
 
+T = TypeVar("T")
+R = TypeVar("R")
+
 
 class LLMFailureError(Exception):
     """Base class for capturing LLM failures."""
@@ -33,6 +58,20 @@ class LLMFailureError(Exception):
         pass
 
 
+RETRIED_ERRORS = (APIConnectionError, RateLimitError, InternalServerError, LLMFailureError)
+
+
+def is_overload(error: Exception) -> bool:
+    """Whether the error signals that the server is overloaded: a 429 or 503 response or a timeout.
+
+    Args:
+        error (Exception): The error raised by the request.
+    """
+    if isinstance(error, (RateLimitError, APITimeoutError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+
 class TextGenerationAPI(
     FindChemical,
     FindRelationship,
@@ -49,8 +88,11 @@ class TextGenerationAPI(
     load_dotenv()
     client: OpenAI
     prompts_dir: Path = Path(__file__).resolve().parent / "prompts"
+    template_dirs: tuple[Path, ...] = ()
+    reload_templates: bool = False
     chemical_prompt_template: str = "chemical_prompt.txt"
     relationship_text_prompt_template: str = "relationship_text_prompt.txt"
+    relationships_text_prompt_template: str = "relationships_text_prompt.txt"
     relationship_text_images_prompt_template: str = "relationship_text_images_prompt.txt"
     relationships_table_prompt_template: str = "relationships_table_prompt.txt"
     normalization_prompt_template: str = "normalization_prompt.txt"
@@ -59,19 +101,38 @@ class TextGenerationAPI(
     find_relevant_publications_prompt_template: str = "find_relevant_publications_prompt.txt"
 
     specification_relationship_text_prompt: str = ""
+    batch_relationship_prompts: bool = False
+    max_chunk_tokens: int | None = None
+    cooccurrence_window: int | None = None
+    response_cache: ResponseCache | None = None
+    concurrency_limiter: AdaptiveConcurrencyLimiter | None = None
+    max_attempts: int = 5
+    retry_wait: float = 1.0
+    max_retry_wait: float = 60.0
 
     def __init__(
         self,
         model: str = "gpt-oss-120b",
         url: str = "https://llm.ai.e-infra.cz/v1",
         api_key: str | None = os.environ.get("CERIT_API_KEY"),
+        max_workers: int = 1,
     ):
+        """Create a client of an OpenAI compatible API.
+
+        Args:
+            model (str): The model to use.
+            url (str): The base URL of the API.
+            api_key (str | None): The API key.
+            max_workers (int): Number of prompts sent concurrently when classifying relationships.
+        """
         self.model = model
         self.url = url
         self.api_key = api_key
+        self.max_workers = max_workers
         self.client = OpenAI(
             base_url=self.url,
             api_key=self.api_key,
+            max_retries=0,
         )
 
     def find_relationships_in_text(
@@ -83,22 +144,223 @@ class TextGenerationAPI(
     ) -> list[Relationship]:
         """Find relationships between chemicals and effects.
 
+        With `batch_relationship_prompts`, all the chemicals are classified in a single prompt per
+        effect and relationship type, so the text is sent once per pair instead of once per chemical.
+
+        With `cooccurrence_window`, only the chemicals and effects mentioned at most that many sentences
+        apart are classified, and only the sentences spanning their mentions are sent as the context.
+
+        Args:
+            text (str): The input text.
+            chemicals (list[Chemical]): List of chemical entities.
+            effects (list[Effect]): List of effect entities.
+            relationship_types (list[RelationshipType]): The relationship types to classify.
+        """
+        if self.batch_relationship_prompts:
+            return self._find_relationships_in_text_batched(text, chemicals, effects, relationship_types)
+        queries = self._relationship_queries(text, chemicals, effects, relationship_types)
+        responses = self._map(lambda query: self._relationship_prompt(*query), queries)
+        return self._collect_relationships(queries, responses)
+
+    def relationship_prompts(
+        self,
+        text: str,
+        chemicals: list[Chemical],
+        effects: list[Effect],
+        relationship_types: list[RelationshipType],
+    ) -> tuple[list[str], Callable[[list[str]], list[Relationship]]]:
+        """Render the prompts finding relationships between chemicals and effects, for sending them elsewhere.
+
+        Args:
+            text (str): The input text.
+            chemicals (list[Chemical]): List of chemical entities.
+            effects (list[Effect]): List of effect entities.
+            relationship_types (list[RelationshipType]): The relationship types to classify.
+
+        Returns:
+            tuple[list[str], Callable[[list[str]], list[Relationship]]]: The prompts and the function
+            turning their responses, in the order of the prompts, into the relationships.
+        """
+        if self.batch_relationship_prompts:
+            batched_queries = self._batched_relationship_queries(text, chemicals, effects, relationship_types)
+            return (
+                [self._relationships_content(*query) for query in batched_queries],
+                partial(self._collect_batched_relationships, batched_queries),
+            )
+        queries = self._relationship_queries(text, chemicals, effects, relationship_types)
+        return [self._relationship_content(*query) for query in queries], partial(self._collect_relationships, queries)
+
+    def _relationship_queries(
+        self,
+        text: str,
+        chemicals: list[Chemical],
+        effects: list[Effect],
+        relationship_types: list[RelationshipType],
+    ) -> list[tuple[str, Chemical, Effect, RelationshipType]]:
+        """List the context, chemical, effect and relationship type of every relationship to classify.
+
         Args:
             text (str): The input text.
             chemicals (list[Chemical]): List of chemical entities.
             effects (list[Effect]): List of effect entities.
             relationship_types (list[RelationshipType]): The relationship types to classify.
         """
+        if self.cooccurrence_window is None:
+            return [(text, *triple) for triple in product(chemicals, effects, relationship_types)]
+        contexts = CooccurrenceFilter(chemicals, effects, self.cooccurrence_window).find(text)
+        return [
+            (context, chemical, effect, relationship_type)
+            for (chemical, effect), context in contexts.items()
+            for relationship_type in relationship_types
+        ]
+
+    def _collect_relationships(
+        self,
+        queries: list[tuple[str, Chemical, Effect, RelationshipType]],
+        responses: list[str],
+    ) -> list[Relationship]:
+        """Turn the responses to the relationship queries into relationships.
+
+        Args:
+            queries (list[tuple[str, Chemical, Effect, RelationshipType]]): The classified relationships.
+            responses (list[str]): The response to each query.
+        """
         relationships = []
-        for chemical, effect, relationship_type in product(chemicals, effects, relationship_types):
-            if (response := self._relationship_prompt(text, chemical, effect, relationship_type)) and (
-                relationship := self._select_relationship_type(response, relationship_type)
-            ):
+        for (context, chemical, effect, relationship_type), response in zip(queries, responses, strict=True):
+            if response and (relationship := self._select_relationship_type(response, relationship_type)):
                 relationships.append(
-                    Relationship(relationship_type=relationship, chemical=chemical, effect=effect, context=text),
+                    Relationship(relationship_type=relationship, chemical=chemical, effect=effect, context=context),
                 )
         return relationships
 
+    def _find_relationships_in_text_batched(
+        self,
+        text: str,
+        chemicals: list[Chemical],
+        effects: list[Effect],
+        relationship_types: list[RelationshipType],
+    ) -> list[Relationship]:
+        """Find relationships between chemicals and effects, classifying all the chemicals in one prompt.
+
+        Lines of the response naming a chemical that was not asked about are ignored.
+
+        Args:
+            text (str): The input text.
+            chemicals (list[Chemical]): List of chemical entities.
+            effects (list[Effect]): List of effect entities.
+            relationship_types (list[RelationshipType]): The relationship types to classify.
+        """
+        queries = self._batched_relationship_queries(text, chemicals, effects, relationship_types)
+        responses = self._map(lambda query: self._relationships_prompt(*query), queries)
+        return self._collect_batched_relationships(queries, responses)
+
+    def _batched_relationship_queries(
+        self,
+        text: str,
+        chemicals: list[Chemical],
+        effects: list[Effect],
+        relationship_types: list[RelationshipType],
+    ) -> list[tuple[str, list[Chemical], Effect, RelationshipType]]:
+        """List the context, chemicals, effect and relationship type of every prompt classifying all the chemicals.
+
+        Args:
+            text (str): The input text.
+            chemicals (list[Chemical]): List of chemical entities.
+            effects (list[Effect]): List of effect entities.
+            relationship_types (list[RelationshipType]): The relationship types to classify.
+        """
+        if not chemicals:
+            return []
+        if self.cooccurrence_window is None:
+            return [(text, chemicals, *pair) for pair in product(effects, relationship_types)]
+        by_effect = CooccurrenceFilter(chemicals, effects, self.cooccurrence_window).find_by_effect(text)
+        return [
+            (context, effect_chemicals, effect, relationship_type)
+            for effect, (effect_chemicals, context) in by_effect.items()
+            for relationship_type in relationship_types
+        ]
+
+    def _collect_batched_relationships(
+        self,
+        queries: list[tuple[str, list[Chemical], Effect, RelationshipType]],
+        responses: list[str],
+    ) -> list[Relationship]:
+        """Turn the responses classifying all the chemicals per effect and relationship type into relationships.
+
+        Args:
+            queries (list[tuple[str, list[Chemical], Effect, RelationshipType]]): The classified relationships.
+            responses (list[str]): The response to each query.
+        """
+        relationships = []
+        for (context, chemicals, effect, relationship_type), response in zip(queries, responses, strict=True):
+            by_name = {chemical.name.lower(): chemical for chemical in chemicals}
+            for relationship in self._process_colon_separated_response(
+                response,
+                effect,
+                relationship_type,
+                image_path="text",
+                context=context,
+            ):
+                if chemical := by_name.get(relationship.chemical.name):
+                    relationship.chemical = chemical
+                    relationships.append(relationship)
+        return relationships
+
+    def _relationships_prompt(
+        self,
+        text: str,
+        chemicals: list[Chemical],
+        effect: Effect,
+        relationship_type: RelationshipType,
+    ) -> str:
+        """Classify the relationships between all the chemicals and an effect.
+
+        Args:
+            text (str): The input text.
+            chemicals (list[Chemical]): The chemical entities.
+            effect (Effect): The effect entity.
+            relationship_type (RelationshipType): The relationship type to classify.
+        """
+        return self._prompt(self._relationships_content(text, chemicals, effect, relationship_type))
+
+    def _relationships_content(
+        self,
+        text: str,
+        chemicals: list[Chemical],
+        effect: Effect,
+        relationship_type: RelationshipType,
+    ) -> str:
+        """Render the prompt classifying the relationships between all the chemicals and an effect.
+
+        Args:
+            text (str): The input text.
+            chemicals (list[Chemical]): The chemical entities.
+            effect (Effect): The effect entity.
+            relationship_type (RelationshipType): The relationship type to classify.
+        """
+        other_topics = topics.difference({relationship_type})
+        return self._render_prompt(
+            self.relationships_text_prompt_template,
+            text=text,
+            chemicals=[chemical.name for chemical in chemicals],
+            effect=effect.name,
+            rel_type=relationship_type,
+            other_topics=", ".join([topic.positive for topic in other_topics]),
+            specification_relationship_text_prompt=self.specification_relationship_text_prompt,
+        )
+
+    def _map(self, func: Callable[[T], R], items: Iterable[T]) -> list[R]:
+        """Apply the function to the items on up to `max_workers` threads, keeping the order of the items.
+
+        Args:
+            func (Callable[[T], R]): The function sending a prompt.
+            items (Iterable[T]): The arguments of the function.
+        """
+        if self.max_workers == 1:
+            return list(map(func, items))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(func, items))
+
     def _relationship_prompt(
         self,
         text: str,
@@ -108,6 +370,23 @@ class TextGenerationAPI(
     ) -> str:
         """Classify the relationship between a chemical and an effect.
 
+        Args:
+            text (str): The input text.
+            chemical (Chemical): The chemical entity.
+            effect (Effect): The effect entity.
+            relationship_type (RelationshipType): The relationship type to classify.
+        """
+        return self._prompt(self._relationship_content(text, chemical, effect, relationship_type))
+
+    def _relationship_content(
+        self,
+        text: str,
+        chemical: Chemical,
+        effect: Effect,
+        relationship_type: RelationshipType,
+    ) -> str:
+        """Render the prompt classifying the relationship between a chemical and an effect.
+
         Args:
             text (str): The input text.
             chemical (Chemical): The chemical entity.
@@ -115,7 +394,7 @@ class TextGenerationAPI(
             relationship_type (RelationshipType): The relationship type to classify.
         """
         other_topics = topics.difference({relationship_type})
-        content = self._render_prompt(
+        return self._render_prompt(
             self.relationship_text_prompt_template,
             text=text,
             chem=chemical.name,
@@ -125,29 +404,143 @@ class TextGenerationAPI(
             specification_relationship_text_prompt=self.specification_relationship_text_prompt,
         )
 
-        return self._prompt(content)
-
     def _render_prompt(self, template_name: str, **context: object) -> str:
-        template_path = self.prompts_dir / template_name
-        with template_path.open(encoding="utf-8") as template_file:
-            template_content = template_file.read()
-        return str(Template(template_content).render(**context))
+        """Render a prompt template.
+
+        The template is looked up in `template_dirs` first and then in `prompts_dir`. Templates are
+        compiled once per process, unless `reload_templates` is set to pick up edited files.
+
+        Args:
+            template_name (str): The file name of the template.
+            **context (object): The variables of the template.
+        """
+        templates = prompt_templates((*self.template_dirs, self.prompts_dir), auto_reload=self.reload_templates)
+        return templates.get_template(template_name).render(**context)
 
     def _prompt(self, content: str | list[ChatCompletionContentPartParam]) -> str:
-        messages: list[ChatCompletionUserMessageParam] = [
+        """Send the prompt and return the response.
+
+        Rate limiting, server errors, timeouts and empty responses are retried with jittered
+        exponential backoff, up to `max_attempts` attempts. With a `concurrency_limiter`, the request
+        waits for its turn and reports its outcome to the limiter.
+
+        Args:
+            content (str | list[ChatCompletionContentPartParam]): The prompt text or content parts.
+
+        Raises:
+            LLMFailureError: If the model keeps returning empty responses.
+        """
+        messages = self._messages(content)
+        cache_key = self._cache_key(messages)
+        cache = self.response_cache
+        if cache is not None and cache_key and (cached := cache.get(cache_key)) is not None:
+            return cached
+
+        for attempt in Retrying(**self._retry_policy()):
+            with attempt:
+                return self._completion_response(self._create_completion(messages), cache_key)
+        msg = "Unexpected control flow: retry exceeded without returning"
+        raise RuntimeError(msg)
+
+    def _retry_policy(self) -> dict[str, Any]:
+        """Return the arguments of the tenacity retrying of a prompt."""
+        return {
+            "retry": retry_if_exception_type(RETRIED_ERRORS),
+            "wait": wait_random_exponential(multiplier=self.retry_wait, max=self.max_retry_wait),
+            "stop": stop_after_attempt(self.max_attempts),
+            "reraise": True,
+        }
+
+    def _create_completion(self, messages: list[ChatCompletionUserMessageParam]) -> ChatCompletion:
+        """Request a chat completion under the concurrency limiter, if there is one.
+
+        Args:
+            messages (list[ChatCompletionUserMessageParam]): The messages of the chat completion.
+        """
+        limiter = self.concurrency_limiter
+        if limiter is None:
+            return self.client.chat.completions.create(**self._completion_request(messages))
+        limiter.acquire()
+        start = time.monotonic()
+        try:
+            completion = self.client.chat.completions.create(**self._completion_request(messages))
+        except (APIConnectionError, APIStatusError) as error:
+            if is_overload(error):
+                limiter.record_overload()
+            raise
+        finally:
+            limiter.release()
+        limiter.record_success(time.monotonic() - start)
+        return completion
+
+    def completion_request(
+        self,
+        content: str | list[ChatCompletionContentPartParam],
+    ) -> tuple[dict[str, Any], str | None]:
+        """Return the arguments of the chat completion request of the prompt and its key in the response cache.
+
+        Args:
+            content (str | list[ChatCompletionContentPartParam]): The prompt text or content parts.
+        """
+        messages = self._messages(content)
+        return self._completion_request(messages), self._cache_key(messages)
+
+    def _completion_request(self, messages: list[ChatCompletionUserMessageParam]) -> dict[str, Any]:
+        """Return the arguments of a chat completion request.
+
+        Args:
+            messages (list[ChatCompletionUserMessageParam]): The messages of the chat completion.
+        """
+        return {
+            "model": self.model,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "messages": messages,
+        }
+
+    def _messages(self, content: str | list[ChatCompletionContentPartParam]) -> list[ChatCompletionUserMessageParam]:
+        """Wrap the prompt content into the messages of a chat completion.
+
+        Args:
+            content (str | list[ChatCompletionContentPartParam]): The prompt text or content parts.
+        """
+        return [
             {
                 "role": self.role,
                 "content": content,
             },
         ]
-        completion = self.client.chat.completions.create(
+
+    def _cache_key(self, messages: list[ChatCompletionUserMessageParam]) -> str | None:
+        """Return the key of the request in the response cache, or None without a cache.
+
+        Args:
+            messages (list[ChatCompletionUserMessageParam]): The messages of the chat completion.
+        """
+        if self.response_cache is None:
+            return None
+        return ResponseCache.key(
             model=self.model,
+            url=self.url,
             temperature=self.temperature,
             top_p=self.top_p,
             messages=messages,
         )
 
+    def _completion_response(self, completion: ChatCompletion, cache_key: str | None) -> str:
+        """Return the stripped response of the completion and cache it under the key.
+
+        Args:
+            completion (ChatCompletion): The chat completion.
+            cache_key (str | None): The key of the request in the response cache.
+
+        Raises:
+            LLMFailureError: If the completion has no content.
+        """
         if response := completion.choices[0].message.content:
+            cache = self.response_cache
+            if cache is not None and cache_key:
+                cache.put(cache_key, response.strip())
             return response.strip()
         raise LLMFailureError
 
@@ -167,10 +560,61 @@ class TextGenerationAPI(
     def find_chemicals(self, text: str) -> list[Chemical]:
         """Find chemicals in the given text.
 
+        With `max_chunk_tokens`, long texts are split into chunks of sections and paragraphs of at most
+        that many estimated tokens, which are searched on up to `max_workers` threads. The chemicals found
+        in the chunks are merged without duplicates.
+
+        Args:
+            text (str): The input text to search for chemicals.
+        """
+        return self._merge_chemicals(self._map(self._find_chemicals_in_chunk, self._chunks(text)))
+
+    def chemical_prompts(self, text: str) -> tuple[list[str], Callable[[list[str]], list[Chemical]]]:
+        """Render the prompts finding chemicals in the chunks of the text, for sending them elsewhere.
+
         Args:
             text (str): The input text to search for chemicals.
+
+        Returns:
+            tuple[list[str], Callable[[list[str]], list[Chemical]]]: The prompts and the function
+            turning their responses, in the order of the prompts, into the chemicals.
+        """
+        contents = [self._render_prompt(self.chemical_prompt_template, text=chunk) for chunk in self._chunks(text)]
+        return contents, lambda responses: self._merge_chemicals(map(self._parse_chemicals, responses))
+
+    def _chunks(self, text: str) -> list[str]:
+        """Split the text into chunks of at most `max_chunk_tokens` estimated tokens, or keep it whole.
+
+        Args:
+            text (str): The input text.
+        """
+        if self.max_chunk_tokens is None:
+            return [text]
+        return chunk_text(text, self.max_chunk_tokens)
+
+    def _find_chemicals_in_chunk(self, chunk: str) -> list[Chemical]:
+        """Find chemicals in a chunk of the text.
+
+        Args:
+            chunk (str): The chunk of the text.
+        """
+        return self._parse_chemicals(self._prompt(self._render_prompt(self.chemical_prompt_template, text=chunk)))
+
+    def _merge_chemicals(self, found: Iterable[list[Chemical]]) -> list[Chemical]:
+        """Merge the chemicals found in the chunks of a text, keeping the first occurrence of every name.
+
+        Args:
+            found (Iterable[list[Chemical]]): The chemicals found in every chunk.
         """
-        if response := self._prompt(self._render_prompt(self.chemical_prompt_template, text=text)).lower():
+        return list(dict.fromkeys(chemical for chemicals in found for chemical in chemicals))
+
+    def _parse_chemicals(self, response: str) -> list[Chemical]:
+        """Parse the chemicals listed in the response.
+
+        Args:
+            response (str): The response from the model with chemicals separated by " ; ".
+        """
+        if response := response.lower():
             if response == "none":
                 return []
             return [Chemical(name=chem.strip().lower()) for chem in response.split(" ; ")] if response.strip() else []
@@ -198,6 +642,7 @@ class TextGenerationAPI(
         effect: Effect,
         relationship_type: RelationshipType,
         image_path: str,
+        context: str | None = None,
     ) -> list[Relationship]:
         """Process the response from the model that is colon seperated.
 
@@ -205,8 +650,8 @@ class TextGenerationAPI(
             response (str): The response from the model.
             effect (Effect): The effect entity.
             relationship_type (RelationshipType): The relationship type to classify.
-            context (str): The path to the image, used for context in the relationship.
             image_path (str): The path to the image, used for context in the relationship.
+            context (str | None): The context of the relationships. Defaults to the name of the image.
         """
         relationships = []
         for raw_line in response.splitlines():
@@ -227,7 +672,7 @@ class TextGenerationAPI(
                     relationship_type=relationship,
                     chemical=Chemical(name=chem_name),
                     effect=effect,
-                    context=Path(image_path).stem,
+                    context=context if context is not None else Path(image_path).stem,
                 ),
             )
 
@@ -246,16 +691,11 @@ class TextGenerationAPI(
             relationship_types (list[RelationshipType]): The relationship types to classify.
             effects (list[Effect]): List of effect entities.
         """
-        relationships = []
-        for effect, relationship_type in product(effects, relationship_types):
-            relationships.extend(
-                self._classify_relationships_in_table(
-                    table_df,
-                    effect,
-                    relationship_type,
-                ),
-            )
-        return relationships
+        classified = self._map(
+            lambda pair: self._classify_relationships_in_table(table_df, *pair),
+            product(effects, relationship_types),
+        )
+        return [relationship for relationships in classified for relationship in relationships]
 
     def _classify_relationships_in_table(
         self,
@@ -273,19 +713,25 @@ class TextGenerationAPI(
         Returns:
             list[Relationship]: List of relationships found in the table.
         """
-        table_text = table_df.to_csv(index=False)
+        if response := self._prompt(self._table_content(table_df, effect, relationship_type)):
+            return self._process_colon_separated_response(response, effect, relationship_type, "table")
+        return []
 
-        content = self._render_prompt(
+    def _table_content(self, table_df: pd.DataFrame, effect: Effect, relationship_type: RelationshipType) -> str:
+        """Render the prompt classifying relationships between chemicals and an effect in a table.
+
+        Args:
+            table_df (pd.DataFrame): Pandas DataFrame.
+            effect (Effect): The effect entity.
+            relationship_type (RelationshipType): The relationship type to classify.
+        """
+        return self._render_prompt(
             self.relationships_table_prompt_template,
             effect=effect.name,
             rel_type=relationship_type,
-            table=table_text,
+            table=table_df.to_csv(index=False),
         )
 
-        if response := self._prompt(content):
-            return self._process_colon_separated_response(response, effect, relationship_type, "table")
-        return []
-
     def normalize_chemical(self, chemical: Chemical, chemical_list: list[Chemical]) -> Chemical:
         """Normalize the chemical name by finding a matching name in the chemical list.
 
@@ -336,7 +782,27 @@ class TextGenerationAPI(
         Returns:
             str: Extracted text from the image.
         """
-        content: list[ChatCompletionContentPartParam] = [
+        if response := self._prompt(self._pdf_scan_content(img_base64, mime_type)):
+            return response
+        return ""
+
+    def convert_pdf_scans(self, images_base64: list[str], mime_type: str) -> list[str]:
+        """Extract text from base64-encoded images of pages, keeping the order of the pages.
+
+        Args:
+            images_base64 (list[str]): Base64-encoded image data of the pages.
+            mime_type (str): MIME type of the images.
+        """
+        return self._map(lambda img_base64: self.convert_pdf_scan(img_base64, mime_type), images_base64)
+
+    def _pdf_scan_content(self, img_base64: str, mime_type: str) -> list[ChatCompletionContentPartParam]:
+        """Build the prompt extracting text from a base64-encoded image.
+
+        Args:
+            img_base64 (str): Base64-encoded image data.
+            mime_type (str): MIME type of the image.
+        """
+        return [
             {
                 "type": "text",
                 "text": self._render_prompt(self.convert_pdf_scan_prompt_template),
@@ -344,10 +810,6 @@ class TextGenerationAPI(
             {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{img_base64.strip()}"}},
         ]
 
-        if response := self._prompt(content):
-            return response
-        return ""
-
     def find_relationships_in_text_and_images(
         self,
         text: str,
@@ -363,12 +825,11 @@ class TextGenerationAPI(
             relationship_types (list[RelationshipType]): The relationship types to classify.
             effects (list[Effect]): List of effect entities.
         """
-        relationships = []
-        for effect, relationship_type in product(effects, relationship_types):
-            relationships.extend(
-                self._classify_relationships_in_text_and_images(text, image_paths, effect, relationship_type),
-            )
-        return relationships
+        classified = self._map(
+            lambda pair: self._classify_relationships_in_text_and_images(text, image_paths, *pair),
+            product(effects, relationship_types),
+        )
+        return [relationship for relationships in classified for relationship in relationships]
 
     def _classify_relationships_in_text_and_images(
         self,
@@ -436,9 +897,19 @@ class TextGenerationAPI(
             image_path (str): Path to the image.
             text (str): The full text of the publication for context.
         """
-        base64_image, mime_type = self._encode_image(image_path)
+        if response := self._prompt(self._image_content(image_path, text)):
+            return response
+        return ""
 
-        content: list[ChatCompletionContentPartParam] = [
+    def _image_content(self, image_path: str, text: str) -> list[ChatCompletionContentPartParam]:
+        """Build the prompt converting an image to text.
+
+        Args:
+            image_path (str): Path to the image.
+            text (str): The full text of the publication for context.
+        """
+        base64_image, mime_type = self._encode_image(image_path)
+        return [
             {
                 "type": "text",
                 "text": self._render_prompt(self.convert_image_prompt_template, text=text),
@@ -446,10 +917,6 @@ class TextGenerationAPI(
             {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{base64_image}"}},
         ]
 
-        if response := self._prompt(content):
-            return response
-        return ""
-
     def find_relevant_publications(self, question: str, text: str) -> bool | None:
         """Answer the question based on a given text.
 
@@ -457,9 +924,19 @@ class TextGenerationAPI(
             question (str): The question to search for relevant publications.
             text (str): The extracted text of the publication.
         """
-        if response := self._prompt(
-            self._render_prompt(self.find_relevant_publications_prompt_template, question=question, text=text),
-        ).lower():
+        return self._parse_answer(
+            self._prompt(
+                self._render_prompt(self.find_relevant_publications_prompt_template, question=question, text=text),
+            ),
+        )
+
+    def _parse_answer(self, response: str) -> bool | None:
+        """Parse a yes or no answer, returning None if the response is neither.
+
+        Args:
+            response (str): The response from the model.
+        """
+        if response := response.lower():
             if response == "yes":
                 return True
             if response == "no":
@@ -0,0 +1,244 @@
+from __future__ import annotations
+import json
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from dataclasses import field
+from http import HTTPStatus
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Generic
+from typing import Literal
+from typing import TypeVar
+from aoptk.chemical import Chemical
+from aoptk.effect import Effect
+from aoptk.relationships.relationship import Relationship
+from aoptk.relationships.relationship_type import RelationshipType
+from aoptk.text_generation_api import LLMFailureError
+
+if TYPE_CHECKING:
+    from aoptk.text_generation_api import TextGenerationAPI
+
+T = TypeVar("T")
+
+BATCH_ENDPOINT: Literal["/v1/chat/completions"] = "/v1/chat/completions"
+FINISHED_BATCH_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchFailureError(LLMFailureError):
+    """The Batch API did not finish a batch."""
+
+    def __init__(self, batch_id: str, status: str):
+        super().__init__()
+        self.batch_id = batch_id
+        self.status = status
+        self.args = (f"Batch {batch_id} finished with status {status}",)
+
+
+@dataclass
+class BatchResult(Generic[T]):
+    """Result of a method queued in a batch, available once the batch has been run."""
+
+    custom_ids: list[str]
+    parse: Callable[[list[str]], T]
+    responses: dict[str, str] = field(default_factory=dict)
+
+    def result(self) -> T:
+        """Return the result of the method.
+
+        Raises:
+            LLMFailureError: If a prompt of the method has not been answered.
+        """
+        if any(custom_id not in self.responses for custom_id in self.custom_ids):
+            raise LLMFailureError
+        return self.parse([self.responses[custom_id] for custom_id in self.custom_ids])
+
+
+class TextGenerationBatch:
+    """Prompts of a text generation API collected and sent through the OpenAI Batch API.
+
+    The methods mirror the ones of `TextGenerationAPI`, but only queue their prompts and return
+    a `BatchResult`. `run` writes the queued prompts into JSON Lines files of at most
+    `max_requests_per_batch` requests, submits them as batches, polls them until they finish and
+    hands the responses of every batch to the results as soon as it is collected. Prompts answered by the
+    response cache of the API are not submitted.
+    """
+
+    poll_interval: float = 60.0
+    completion_window: Literal["24h"] = "24h"
+    max_requests_per_batch: int = 50000
+
+    def __init__(self, text_generation: TextGenerationAPI, batch_dir: Path):
+        """Create an empty batch.
+
+        Args:
+            text_generation (TextGenerationAPI): The API whose client, model and prompts are used.
+            batch_dir (Path): The directory for the JSON Lines files of the batches.
+        """
+        self.text_generation = text_generation
+        self.batch_dir = Path(batch_dir)
+        self._queued = 0
+        self._requests: dict[str, dict] = {}
+        self._cache_keys: dict[str, str] = {}
+        self._results: dict[str, BatchResult] = {}
+
+    def __len__(self) -> int:
+        """Return the number of prompts to be submitted."""
+        return len(self._requests)
+
+    def find_chemicals(self, text: str) -> BatchResult[list[Chemical]]:
+        """Queue finding chemicals in the given text.
+
+        Args:
+            text (str): The input text to search for chemicals.
+        """
+        return self._add(*self.text_generation.chemical_prompts(text))
+
+    def find_relationships_in_text(
+        self,
+        text: str,
+        chemicals: list[Chemical],
+        effects: list[Effect],
+        relationship_types: list[RelationshipType],
+    ) -> BatchResult[list[Relationship]]:
+        """Queue finding relationships between chemicals and effects.
+
+        Args:
+            text (str): The input text.
+            chemicals (list[Chemical]): List of chemical entities.
+            effects (list[Effect]): List of effect entities.
+            relationship_types (list[RelationshipType]): The relationship types to classify.
+        """
+        return self._add(*self.text_generation.relationship_prompts(text, chemicals, effects, relationship_types))
+
+    def _add(self, contents: list[str], parse: Callable[[list[str]], T]) -> BatchResult[T]:
+        """Queue the prompts of a method, answering the cached ones right away.
+
+        Args:
+            contents (list[str]): The prompts of the method.
+            parse (Callable[[list[str]], T]): Turns the responses of the prompts into the result of the method.
+        """
+        api = self.text_generation
+        cache = api.response_cache
+        result = BatchResult(custom_ids=[], parse=parse)
+        for content in contents:
+            custom_id = f"request-{self._queued}"
+            self._queued += 1
+            result.custom_ids.append(custom_id)
+            request, cache_key = api.completion_request(content)
+            if cache is not None and cache_key:
+                if (cached := cache.get(cache_key)) is not None:
+                    result.responses[custom_id] = cached
+                    continue
+                self._cache_keys[custom_id] = cache_key
+            self._requests[custom_id] = request
+            self._results[custom_id] = result
+        return result
+
+    def run(self) -> None:
+        """Submit the queued prompts, wait for the batches to finish and fill in the results.
+
+        The responses of every batch are cached and handed to the results as soon as the batch is
+        collected, so a failed batch neither loses the responses of the other batches nor stops the
+        waiting for them. Prompts the Batch API failed to answer make the results depending on them
+        raise `LLMFailureError`.
+
+        Raises:
+            BatchFailureError: If a batch failed as a whole, e.g. because its file was rejected.
+            The first failure is raised once all the batches have finished.
+        """
+        custom_ids = list(self._requests)
+        batch_ids = [
+            self._submit(custom_ids[start : start + self.max_requests_per_batch])
+            for start in range(0, len(custom_ids), self.max_requests_per_batch)
+        ]
+        failure: BatchFailureError | None = None
+        for batch_id in batch_ids:
+            try:
+                self._distribute(self._collect(self._wait(batch_id)))
+            except BatchFailureError as error:
+                failure = failure or error
+        self._requests.clear()
+        self._cache_keys.clear()
+        self._results.clear()
+        if failure:
+            raise failure
+
+    def _distribute(self, responses: dict[str, str]) -> None:
+        """Cache the responses of a batch and hand them to the results waiting for them.
+
+        Args:
+            responses (dict[str, str]): The responses by the IDs of their requests.
+        """
+        cache = self.text_generation.response_cache
+        for custom_id, response in responses.items():
+            if cache is not None and (cache_key := self._cache_keys.get(custom_id)):
+                cache.put(cache_key, response)
+            self._results[custom_id].responses[custom_id] = response
+
+    def _submit(self, custom_ids: list[str]) -> str:
+        """Write the requests into a JSON Lines file, upload it and create a batch.
+
+        Args:
+            custom_ids (list[str]): The IDs of the requests in the batch.
+
+        Returns:
+            str: The ID of the batch.
+        """
+        client = self.text_generation.client
+        self.batch_dir.mkdir(parents=True, exist_ok=True)
+        path = self.batch_dir / f"{custom_ids[0]}.jsonl"
+        with path.open("w", encoding="utf-8") as f:
+            for custom_id in custom_ids:
+                request = {"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT}
+                f.write(json.dumps({**request, "body": self._requests[custom_id]}) + "\n")
+        with path.open("rb") as f:
+            input_file = client.files.create(file=f, purpose="batch")
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window,
+        )
+        return batch.id
+
+    def _wait(self, batch_id: str) -> str | None:
+        """Poll the batch until it finishes.
+
+        Args:
+            batch_id (str): The ID of the batch.
+
+        Returns:
+            str | None: The ID of the output file, None if nothing was answered.
+
+        Raises:
+            BatchFailureError: If the batch failed.
+        """
+        client = self.text_generation.client
+        while (batch := client.batches.retrieve(batch_id)).status not in FINISHED_BATCH_STATUSES:
+            time.sleep(self.poll_interval)
+        if batch.status == "failed":
+            raise BatchFailureError(batch_id, batch.status)
+        return batch.output_file_id
+
+    def _collect(self, output_file_id: str | None) -> dict[str, str]:
+        """Read the successful responses from the output file of a batch.
+
+        Args:
+            output_file_id (str | None): The ID of the output file.
+
+        Returns:
+            dict[str, str]: The stripped responses by the IDs of their requests.
+        """
+        if not output_file_id:
+            return {}
+        responses = {}
+        for line in self.text_generation.client.files.content(output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            output = json.loads(line)
+            response = output.get("response") or {}
+            if response.get("status_code") != HTTPStatus.OK:
+                continue
+            if content := response["body"]["choices"][0]["message"]["content"]:
+                responses[output["custom_id"]] = content.strip()
+        return responses
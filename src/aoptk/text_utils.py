@@ -1,3 +1,8 @@
+import re
+
+CHARS_PER_TOKEN = 4
+
+
 def ends(text: str) -> bool:
     """Check if text ends with sentence-ending punctuation.
 
@@ -39,3 +44,36 @@ def contains_any(text: str, substrs: list[str]) -> bool:
         substrs (list[str] | None): substrings to match.
     """
     return any(match in text for match in substrs)
+
+
+def chunk_text(text: str, max_tokens: int) -> list[str]:
+    """Split the text into chunks of at most `max_tokens` estimated tokens.
+
+    Paragraphs and section titles, separated by blank lines, are packed into chunks whole. Paragraphs
+    over the budget are split into sentences, and sentences over the budget are cut into pieces.
+
+    Args:
+        text (str): The text to split.
+        max_tokens (int): The token budget of a chunk.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text.strip()):
+        if len(paragraph := paragraph.strip()) <= max_chars:
+            pieces.append(("\n\n", paragraph))
+            continue
+        for index, sentence in enumerate(re.split(r"(?<=[.!?])\s+", paragraph)):
+            pieces.append(("\n\n" if index == 0 else " ", sentence[:max_chars]))
+            pieces.extend(
+                ("", sentence[start : start + max_chars]) for start in range(max_chars, len(sentence), max_chars)
+            )
+
+    chunks: list[str] = []
+    for separator, piece in pieces:
+        if not piece:
+            continue
+        if chunks and len(chunks[-1]) + len(separator) + len(piece) <= max_chars:
+            chunks[-1] += separator + piece
+        else:
+            chunks.append(piece)
+    return chunks
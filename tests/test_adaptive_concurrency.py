@@ -0,0 +1,75 @@
+# ruff: noqa: PLR2004
+from __future__ import annotations
+import asyncio
+import threading
+from aoptk.adaptive_concurrency import AdaptiveConcurrencyLimiter
+
+
+def test_limit_increases_with_healthy_latency():
+    """The limit grows by about one request per round trip of healthy responses."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=4)
+
+    for _ in range(3):
+        limiter.record_success(1.0)
+    assert limiter.limit == 3
+
+    for _ in range(20):
+        limiter.record_success(1.0)
+    assert limiter.limit == 4
+
+
+def test_limit_backs_off_on_overload_and_latency_spike():
+    """Overload and latency spikes halve the limit, down to the minimum."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=16, min_limit=2)
+    limiter.record_success(1.0)
+
+    limiter.record_success(3.0)
+    assert limiter.limit == 8
+
+    limiter.record_overload()
+    assert limiter.limit == 4
+
+    for _ in range(3):
+        limiter.record_overload()
+    assert limiter.limit == 2
+
+
+def test_acquire_blocks_threads_over_the_limit():
+    """A thread waits for a request in flight to finish once the limit is reached."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def acquire() -> None:
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=acquire)
+    thread.start()
+    assert not acquired.wait(0.05)
+
+    limiter.release()
+    assert acquired.wait(1)
+    thread.join()
+    assert limiter.in_flight == 1
+
+
+def test_async_acquire_keeps_tasks_under_the_limit():
+    """Tasks of an event loop never have more requests in flight than the limit."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=3, max_limit=3)
+    in_flight = []
+
+    async def request() -> None:
+        await limiter.async_acquire()
+        in_flight.append(limiter.in_flight)
+        await asyncio.sleep(0.01)
+        limiter.release()
+        limiter.record_success(0.01)
+
+    async def run() -> None:
+        await asyncio.gather(*(request() for _ in range(12)))
+
+    asyncio.run(run())
+
+    assert max(in_flight) == 3
+    assert limiter.in_flight == 0
@@ -0,0 +1,60 @@
+from __future__ import annotations
+from aoptk.chemical import Chemical
+from aoptk.effect import Effect
+from aoptk.relationships.cooccurrence import CooccurrenceFilter
+
+TEXT = (
+    "Thioacetamide (TAA) is a hepatotoxicant. TAA induced liver fibrosis in mice.\n\n"
+    "Ethanol was used as the vehicle. Doses were given daily. Silymarin reduced Liver Fibrosis."
+)
+
+
+def test_find_pairs_mentioned_together():
+    """Only the pairs mentioned within the window are found, with the sentences spanning their mentions."""
+    thioacetamide = Chemical(name="thioacetamide")
+    thioacetamide.synonyms.add("TAA")
+    chemicals = [thioacetamide, Chemical(name="ethanol"), Chemical(name="silymarin"), Chemical(name="carbon")]
+    effects = [Effect(name="liver fibrosis"), Effect(name="steatosis")]
+
+    actual = CooccurrenceFilter(chemicals, effects, window=0).find(TEXT)
+
+    assert {(chemical.name, effect.name): context for (chemical, effect), context in actual.items()} == {
+        ("thioacetamide", "liver fibrosis"): "TAA induced liver fibrosis in mice.",
+        ("silymarin", "liver fibrosis"): "Silymarin reduced Liver Fibrosis.",
+    }
+
+
+def test_window_spans_neighbouring_sentences():
+    """A wider window pairs mentions in neighbouring sentences."""
+    chemicals = [Chemical(name="thioacetamide"), Chemical(name="ethanol")]
+    effects = [Effect(name="liver fibrosis")]
+
+    actual = CooccurrenceFilter(chemicals, effects, window=1).find(TEXT)
+
+    assert list(actual.values()) == [
+        "Thioacetamide (TAA) is a hepatotoxicant. TAA induced liver fibrosis in mice.",
+        "TAA induced liver fibrosis in mice. Ethanol was used as the vehicle.",
+    ]
+
+
+def test_names_match_whole_words_only():
+    """Names inside other words are not mentions."""
+    chemicals = [Chemical(name="TAA"), Chemical(name="iron")]
+
+    actual = CooccurrenceFilter(chemicals, [Effect(name="fibrosis")], window=0).find("Ambient TAAs cause fibrosis.")
+
+    assert actual == {}
+
+
+def test_find_by_effect():
+    """The chemicals mentioned with an effect share the context of all their mentions."""
+    thioacetamide = Chemical(name="thioacetamide")
+    thioacetamide.synonyms.add("TAA")
+    chemicals = [thioacetamide, Chemical(name="silymarin"), Chemical(name="ethanol")]
+
+    actual = CooccurrenceFilter(chemicals, [Effect(name="liver fibrosis")], window=0).find_by_effect(TEXT)
+
+    [(effect, (effect_chemicals, context))] = actual.items()
+    assert effect.name == "liver fibrosis"
+    assert [chemical.name for chemical in effect_chemicals] == ["thioacetamide", "silymarin"]
+    assert context == "TAA induced liver fibrosis in mice. Silymarin reduced Liver Fibrosis."
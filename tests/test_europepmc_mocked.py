@@ -1,10 +1,16 @@
 from __future__ import annotations
+import io
 from pathlib import Path
 import pytest
 from requests import HTTPError
 from requests import Response
+from requests.adapters import MaxRetryError
+from urllib3 import HTTPConnectionPool
+from aoptk.literature.abstract import Abstract
 from aoptk.literature.databases.europepmc import EuropePMC
 from aoptk.literature.id import ID
+from aoptk.literature.publication import Publication
+from aoptk.literature.query import Query
 
 
 class MockResponse(Response):
@@ -67,3 +73,277 @@ def test_generate_abstract_for_given_id_success(provide_temp_storage: Path, prov
         figure_storage=provide_temp_storage_figures,
     ).get_abstracts(ids=[ID("12345678")])[0]
     assert result.text == "Test abstract text"
+
+
+def test_get_publications_concurrently_keeps_order_and_skips_failures(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+):
+    """Test that concurrent fetching returns publications in input order and skips failed IDs."""
+
+    def mock_get_publication(_self: EuropePMC, publication_id: ID, _download_figures_enabled: bool) -> Publication:
+        if publication_id == "PMC2":
+            raise MaxRetryError(pool=HTTPConnectionPool("localhost"), url=str(publication_id))
+        return Publication(
+            id=publication_id,
+            abstract=Abstract(id=publication_id, text=""),
+            full_text=f"Full text of {publication_id}",
+            tables=[],
+            figures=[],
+            figure_descriptions=[],
+        )
+
+    monkeypatch.setattr(EuropePMC, "_get_publication", mock_get_publication)
+    ids = [ID(f"PMC{number}") for number in range(1, 9)]
+
+    actual = EuropePMC(storage=tmp_path, figure_storage=tmp_path / "figures", max_workers=4).get_publications(ids)
+
+    assert [publication.id for publication in actual] == [pub_id for pub_id in ids if pub_id != "PMC2"]
+    assert (tmp_path / "PMC8.txt").read_text(encoding="utf-8") == "Full text of PMC8"
+    assert not (tmp_path / "PMC2.txt").exists()
+
+
+def test_get_publications_metadata_in_one_batched_query(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Test that metadata for several IDs is retrieved with one OR query and mapped back in input order."""
+    queries = []
+
+    def mock_get(*_args: tuple, **kwargs: dict) -> MockResponse:
+        queries.append(kwargs["params"]["query"])
+        return MockResponse(
+            status_code=200,
+            json_data={
+                "resultList": {
+                    "result": [
+                        {"id": "30784932", "pmid": "30784932", "title": "Second", "pubYear": "2019"},
+                        {"id": "123", "pmcid": "PMC5596756", "title": "First", "authorString": "Doe J, Roe R."},
+                    ],
+                },
+            },
+        )
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+
+    actual = EuropePMC(storage=tmp_path, figure_storage=tmp_path / "figures").get_publications_metadata(
+        ids=[ID("PMC5596756"), ID("30784932"), ID("PMC0")],
+    )
+
+    assert queries == ["PMCID:PMC5596756 OR (EXT_ID:30784932 AND SRC:MED) OR PMCID:PMC0"]
+    assert [metadata.title for metadata in actual] == ["First", "Second"]
+    assert actual[0].id == ID("PMC5596756")
+    assert actual[0].authors == ["Doe J", "Roe R"]
+    assert [metadata.year for metadata in actual] == [None, 2019]
+
+
+def test_get_publications_metadata_matches_doi_case_insensitively(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Test that a DOI given in a different case than Europe PMC returns it is mapped back to its result."""
+
+    def mock_get(*_args: tuple, **_kwargs: dict) -> MockResponse:
+        return MockResponse(
+            status_code=200,
+            json_data={"resultList": {"result": [{"id": "1", "doi": "10.1016/J.TOX.2020.152", "title": "Upper"}]}},
+        )
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+
+    actual = EuropePMC(storage=tmp_path, figure_storage=tmp_path / "figures").get_publications_metadata(
+        ids=[ID("10.1016/j.tox.2020.152")],
+    )
+
+    assert [metadata.title for metadata in actual] == ["Upper"]
+    assert actual[0].id == ID("10.1016/j.tox.2020.152")
+
+
+def test_get_publications_metadata_falls_back_to_single_ids(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Test that the IDs of a failed batch are searched one by one and only the failing ID is skipped."""
+
+    def mock_get(*_args: tuple, **kwargs: dict) -> MockResponse:
+        query = kwargs["params"]["query"]
+        if " OR " in query or "PMC2" in query:
+            return MockResponse(status_code=500)
+        pmcid = query.removeprefix("PMCID:")
+        return MockResponse(
+            status_code=200,
+            json_data={"resultList": {"result": [{"id": pmcid, "pmcid": pmcid, "title": f"Title {pmcid}"}]}},
+        )
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+
+    actual = EuropePMC(storage=tmp_path, figure_storage=tmp_path / "figures").get_publications_metadata(
+        ids=[ID("PMC1"), ID("PMC2"), ID("PMC3")],
+    )
+
+    assert [metadata.title for metadata in actual] == ["Title PMC1", "Title PMC3"]
+
+
+def test_get_abstracts_in_one_batched_query(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Test that abstracts for several IDs are retrieved with one request and written to storage."""
+    calls = []
+
+    def mock_get(*_args: tuple, **kwargs: dict) -> MockResponse:
+        calls.append(kwargs["params"])
+        return MockResponse(
+            status_code=200,
+            json_data={
+                "resultList": {
+                    "result": [
+                        {"pmcid": "PMC2", "abstractText": "Second abstract"},
+                        {"pmid": "1", "abstractText": "First abstract"},
+                        {"pmcid": "PMC3"},
+                    ],
+                },
+            },
+        )
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+
+    actual = EuropePMC(storage=tmp_path, figure_storage=tmp_path / "figures").get_abstracts(
+        ids=[ID("1"), ID("PMC2"), ID("PMC3")],
+    )
+
+    assert len(calls) == 1
+    assert actual == [Abstract(id=ID("1"), text="First abstract"), Abstract(id=ID("PMC2"), text="Second abstract")]
+    assert (tmp_path / "PMC2.txt").read_text(encoding="utf-8") == "Second abstract"
+
+
+def test_get_abstracts_falls_back_to_single_ids(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Test that a failed abstract batch does not lose the abstracts of the IDs that can be searched."""
+
+    def mock_get(*_args: tuple, **kwargs: dict) -> MockResponse:
+        query = kwargs["params"]["query"]
+        if " OR " in query or "PMC2" in query:
+            return MockResponse(status_code=503)
+        pmcid = query.removeprefix("PMCID:")
+        return MockResponse(
+            status_code=200,
+            json_data={"resultList": {"result": [{"pmcid": pmcid, "abstractText": f"Abstract of {pmcid}"}]}},
+        )
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+
+    actual = EuropePMC(storage=tmp_path, figure_storage=tmp_path / "figures").get_abstracts(
+        ids=[ID("PMC1"), ID("PMC2"), ID("PMC3")],
+    )
+
+    assert [abstract.text for abstract in actual] == ["Abstract of PMC1", "Abstract of PMC3"]
+    assert (tmp_path / "PMC3.txt").read_text(encoding="utf-8") == "Abstract of PMC3"
+
+
+def test_get_publications_parses_xml_from_stream(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Test that the full text XML is parsed from the response stream without temporary files."""
+    xml = (
+        b"<article><front><abstract><p>Short abstract.</p></abstract></front>"
+        b"<body><sec><title>Results</title><p>Thioacetamide caused liver fibrosis.</p></sec></body></article>"
+    )
+
+    def mock_get(*_args: tuple, **_kwargs: dict) -> MockResponse:
+        response = MockResponse(status_code=200)
+        response.raw = io.BytesIO(xml)
+        return response
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+
+    actual = EuropePMC(storage=tmp_path, figure_storage=tmp_path / "figures").get_publications(
+        ids=[ID("PMC1")],
+        download_figures_enabled=False,
+    )
+
+    assert actual[0].abstract.text == "Short abstract."
+    assert actual[0].full_text == "Short abstract.\n\nResults\n\nThioacetamide caused liver fibrosis."
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["PMC1.txt", "figures"]
+
+
+def test_get_ids_from_date_shards(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Test that sharded harvesting restricts the search per shard and merges the IDs without duplicates."""
+    results_per_shard = {
+        "E_PDATE:[2020-01-01 TO 2021-12-31]": [{"pmcid": "PMC1"}, {"pmid": "2"}],
+        "E_PDATE:[2022-01-01 TO 2022-12-31]": [{"pmid": "2"}, {"id": "PPR3"}],
+        "NOT E_PDATE:[2020-01-01 TO 2022-12-31]": [{"pmcid": "PMC4"}],
+    }
+
+    def mock_get(*_args: tuple, **kwargs: dict) -> MockResponse:
+        search_term, shard = kwargs["params"]["query"].split(" AND ", 1)
+        assert search_term == "(liver fibrosis)"
+        return MockResponse(status_code=200, json_data={"resultList": {"result": results_per_shard[shard]}})
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    europepmc = EuropePMC(
+        storage=tmp_path,
+        figure_storage=tmp_path / "figures",
+        query=Query(search_term="liver fibrosis"),
+        max_workers=3,
+    )
+
+    shards = europepmc.date_shards(first_year=2020, last_year=2022, years_per_shard=2)
+    actual = europepmc.get_ids(shards=shards)
+
+    assert shards == list(results_per_shard)
+    assert actual == [ID("PMC1"), ID("2"), ID("PPR3"), ID("PMC4")]
+
+
+def test_date_shards_without_search_term(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Test that the shards of an empty search term still form complete queries."""
+    queries = []
+
+    def mock_get(*_args: tuple, **kwargs: dict) -> MockResponse:
+        queries.append(kwargs["params"]["query"])
+        return MockResponse(status_code=200, json_data={"resultList": {"result": []}})
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    europepmc = EuropePMC(storage=tmp_path, figure_storage=tmp_path / "figures", query=Query(search_term=""))
+
+    europepmc.get_ids(shards=europepmc.date_shards(first_year=2020, last_year=2020))
+
+    assert sorted(queries) == [
+        "(*) AND E_PDATE:[2020-01-01 TO 2020-12-31]",
+        "(*) AND NOT E_PDATE:[2020-01-01 TO 2020-12-31]",
+    ]
+
+
+def test_iter_ids_follows_cursor(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Test that iterating over IDs requests the next page only once the previous one is consumed."""
+    pages = {
+        "*": {"nextCursorMark": "page2", "resultList": {"result": [{"pmcid": "PMC1"}, {"pmid": "2"}]}},
+        "page2": {"nextCursorMark": "page2", "resultList": {"result": [{"id": "PPR3"}]}},
+    }
+    requested = []
+
+    def mock_get(*_args: tuple, **kwargs: dict) -> MockResponse:
+        requested.append(kwargs["params"]["cursorMark"])
+        return MockResponse(status_code=200, json_data=pages[kwargs["params"]["cursorMark"]])
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    ids = EuropePMC(storage=tmp_path, figure_storage=tmp_path / "figures").iter_ids()
+
+    assert [next(ids), next(ids)] == [ID("PMC1"), ID("2")]
+    assert requested == ["*"]
+    assert list(ids) == [ID("PPR3")]
+    assert requested == ["*", "page2"]
+
+
+def test_get_ids_resumes_from_checkpoint(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Test that an interrupted harvest continues from the last recorded cursor mark."""
+    pages = {
+        "*": {"nextCursorMark": "page2", "resultList": {"result": [{"pmcid": "PMC1"}]}},
+        "page2": {"nextCursorMark": "page3", "resultList": {"result": [{"pmcid": "PMC2"}]}},
+        "page3": {"nextCursorMark": "page3", "resultList": {"result": [{"pmcid": "PMC3"}]}},
+    }
+    requested = []
+
+    def mock_get(*_args: tuple, **kwargs: dict) -> MockResponse:
+        cursor_mark = kwargs["params"]["cursorMark"]
+        requested.append(cursor_mark)
+        if cursor_mark == "page3" and requested.count("page3") == 1:
+            return MockResponse(status_code=500)
+        return MockResponse(status_code=200, json_data=pages[cursor_mark])
+
+    monkeypatch.setattr("requests.Session.get", mock_get)
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    europepmc = EuropePMC(storage=tmp_path, figure_storage=tmp_path / "figures")
+
+    with pytest.raises(HTTPError):
+        europepmc.get_ids(checkpoint=checkpoint)
+    actual = europepmc.get_ids(checkpoint=checkpoint, resume=True)
+
+    assert actual == [ID("PMC1"), ID("PMC2"), ID("PMC3")]
+    assert europepmc.get_ids(checkpoint=checkpoint, resume=True) == actual
+    assert requested == ["*", "page2", "page3", "page3"]
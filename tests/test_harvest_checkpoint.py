@@ -0,0 +1,60 @@
+from pathlib import Path
+import pytest
+from aoptk.literature.harvest_checkpoint import HarvestCheckpoint
+from aoptk.literature.id import ID
+
+
+def test_resume_recorded_progress(tmp_path: Path):
+    """Test that resuming loads the IDs, cursor mark and completed shards recorded before."""
+    path = tmp_path / "checkpoint.jsonl"
+    harvest = HarvestCheckpoint(path, "liver fibrosis")
+    harvest.record([ID("PMC1"), ID("2")], cursor_mark="AoE1")
+    harvest.record([ID("3")], completed="2020")
+
+    actual = HarvestCheckpoint(path, "liver fibrosis", resume=True)
+
+    assert actual.ids == [ID("PMC1"), ID("2"), ID("3")]
+    assert actual.cursor_mark == "AoE1"
+    assert actual.completed == {"2020": [ID("3")]}
+    assert not actual.done
+
+
+def test_start_over_without_resume(tmp_path: Path):
+    """Test that the recorded progress is discarded when not resuming."""
+    path = tmp_path / "checkpoint.jsonl"
+    HarvestCheckpoint(path, "liver fibrosis").record([ID("1")], done=True)
+
+    HarvestCheckpoint(path, "liver fibrosis")
+    actual = HarvestCheckpoint(path, "liver fibrosis", resume=True)
+
+    assert actual.ids == []
+    assert not actual.done
+
+
+def test_drop_interrupted_record(tmp_path: Path):
+    """Test that a record left incomplete by an interrupted write is dropped."""
+    path = tmp_path / "checkpoint.jsonl"
+    HarvestCheckpoint(path, "liver fibrosis").record([ID("1")], cursor_mark="AoE1")
+    with path.open("a", encoding="utf-8") as f:
+        f.write('{"ids": ["2", "3')
+
+    harvest = HarvestCheckpoint(path, "liver fibrosis", resume=True)
+    harvest.record([ID("4")], cursor_mark="AoE2")
+    actual = HarvestCheckpoint(path, "liver fibrosis", resume=True)
+
+    assert actual.ids == [ID("1"), ID("4")]
+    assert actual.cursor_mark == "AoE2"
+
+
+def test_resume_different_search_term(tmp_path: Path):
+    """Test that a checkpoint cannot be resumed with a different search term."""
+    path = tmp_path / "checkpoint.jsonl"
+    HarvestCheckpoint(path, "liver fibrosis")
+    with pytest.raises(ValueError):
+        HarvestCheckpoint(path, "liver cancer", resume=True)
+
+
+def test_without_path_nothing_is_recorded(tmp_path: Path):
+    """Test that a checkpoint without a path does not write any file."""
+    HarvestCheckpoint(None, "liver fibrosis").record([ID("1")], done=True)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,64 @@
+from __future__ import annotations
+import io
+from pathlib import Path
+import pandas as pd
+import pytest
+from aoptk.literature.jats_parser import JATSArticle
+from aoptk.literature.jats_parser import parse_jats
+
+jats_article = Path("tests/test_data/jats_article.xml")
+
+
+@pytest.fixture(scope="module")
+def article() -> JATSArticle:
+    """Provide the parsed JATS test article."""
+    return parse_jats(jats_article)
+
+
+def test_parse_from_stream(article: JATSArticle):
+    """Test that parsing from a binary stream gives the same result as parsing from a path."""
+    actual = parse_jats(io.BytesIO(jats_article.read_bytes()))
+    assert actual.abstract == article.abstract
+    assert actual.full_text == article.full_text
+    assert actual.figure_descriptions == article.figure_descriptions
+
+
+def test_extract_first_abstract(article: JATSArticle):
+    """Test that only the first abstract is extracted."""
+    assert article.abstract.startswith("Background")
+    assert "well-known" in article.abstract
+    assert "Graphical abstract" not in article.abstract
+
+
+def test_extract_full_text_in_document_order(article: JATSArticle):
+    """Test that titles and paragraphs are extracted in document order, skipping empty ones."""
+    lines = article.full_text.split("\n\n")
+    assert lines[:2] == ["Background", "Thioacetamide is a well-known hepatotoxicant used to model liver fibrosis."]
+    assert lines.index("Viability of HepG2 spheroids.") < lines.index("Markers of fibrosis.")
+    assert lines[-1] == "References"
+    assert "" not in lines
+
+
+def test_extract_figure_descriptions(article: JATSArticle):
+    """Test that the figure descriptions contain the label and caption of every figure."""
+    descriptions = article.figure_descriptions.split("\n\n")
+    assert len(descriptions) == len(["Figure 1", "Figure 2"])
+    assert descriptions[1].startswith("Figure 2")
+    assert "Collagen staining" in descriptions[1]
+
+
+def test_extract_tables(article: JATSArticle):
+    """Test that tables are extracted in order, with header rows and without table wraps lacking a table."""
+    expected = [
+        pd.DataFrame(
+            [
+                ["Chemical", "Collagen", "α-SMA"],
+                ["Thioacetamide", "increased", "increased"],
+                ["Silymarin", "decreased", "n.s."],
+            ],
+        ),
+        pd.DataFrame([["Concentration (mM)", "Viability (%)"], ["1", "95"], ["10", "42"]]),
+    ]
+    assert len(article.tables) == len(expected)
+    for actual_table, expected_table in zip(article.tables, expected, strict=True):
+        pd.testing.assert_frame_equal(actual_table, expected_table)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+import io
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import boto3
+import pytest
+from botocore import UNSIGNED
+from botocore.client import Config
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+from requests.adapters import MaxRetryError
+from urllib3 import HTTPConnectionPool
+from aoptk.literature.databases.pmc import PMC
+from aoptk.literature.databases.pmc import shared_s3_client
+from aoptk.literature.id import ID
+
+
+def test_get_publications_concurrently_keeps_order(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Test that publications fetched concurrently keep the order of the IDs and failures are skipped."""
+
+    def mock_full_text(_self: PMC, publication_id: ID) -> str:
+        if publication_id == ID("PMC2"):
+            raise MaxRetryError(pool=HTTPConnectionPool("localhost"), url="")
+        return f"full text of {publication_id}"
+
+    monkeypatch.setattr(PMC, "_get_full_text", mock_full_text)
+    pmc = PMC(storage=tmp_path, figure_storage=tmp_path / "figures", max_workers=4)
+
+    actual = pmc.get_publications([ID("PMC1"), ID("PMC2"), ID("PMC3")], download_figures_enabled=False)
+
+    assert [publication.id for publication in actual] == [ID("PMC1"), ID("PMC3")]
+    assert (tmp_path / "PMC3.txt").read_text(encoding="utf-8") == "full text of PMC3"
+
+
+def test_figures_downloaded_concurrently(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Test that the figures of a publication are downloaded on several threads."""
+    threads = set()
+    barrier = threading.Barrier(2, timeout=5)
+
+    def mock_download(_self: PMC, _key: str, filepath: Path) -> None:
+        threads.add(threading.get_ident())
+        barrier.wait()
+        filepath.touch()
+
+    monkeypatch.setattr(PMC, "_download", mock_download)
+    pmc = PMC(storage=tmp_path, figure_storage=tmp_path / "figures", max_workers=2)
+
+    with ThreadPoolExecutor(max_workers=pmc.max_workers) as downloads:
+        actual = pmc._extract_figures_from_supplements(  # noqa: SLF001
+            ID("PMC1"),
+            [
+                "https://pmc-oa-opendata.s3.amazonaws.com/PMC1.1/f1.png",
+                "https://pmc-oa-opendata.s3.amazonaws.com/PMC1.1/f2.png",
+            ],
+            downloads,
+        )
+
+    assert actual == [tmp_path / "figures" / "PMC1" / "f1.png", tmp_path / "figures" / "PMC1" / "f2.png"]
+    assert len(threads) == len(actual)
+
+
+def test_s3_client_shared_for_pool_size(tmp_path: Path):
+    """Test that instances needing a larger connection pool share one S3 client."""
+    first = PMC(storage=tmp_path, figure_storage=tmp_path / "figures", max_workers=8)
+    second = PMC(storage=tmp_path, figure_storage=tmp_path / "figures", max_workers=8)
+
+    assert first.s3 is second.s3
+    assert first.s3.meta.config.max_pool_connections == 2 * first.max_workers
+    assert PMC(storage=tmp_path, figure_storage=tmp_path / "figures").s3 is shared_s3_client()
+
+
+@pytest.fixture
+def s3_stubber(monkeypatch: pytest.MonkeyPatch):
+    """Provide a stubber for the S3 client used by PMC."""
+    client = boto3.client("s3", config=Config(signature_version=UNSIGNED), region_name="us-east-1")
+    monkeypatch.setattr(PMC, "s3", client)
+    with Stubber(client) as stubber:
+        yield stubber
+
+
+def add_object(stubber: Stubber, key: str, content: bytes):
+    """Stub the lookup and the read of a single object."""
+    stubber.add_response(
+        "list_objects_v2",
+        {"Contents": [{"Key": key}]},
+        {"Bucket": PMC.bucket, "Prefix": key, "MaxKeys": 1},
+    )
+    stubber.add_response(
+        "get_object",
+        {"Body": StreamingBody(io.BytesIO(content), len(content))},
+        {"Bucket": PMC.bucket, "Key": key},
+    )
+
+
+def test_full_text_and_json_read_in_memory(s3_stubber: Stubber, tmp_path: Path):
+    """Test that the full text and JSON are read from S3 without being written to the storage."""
+    add_object(s3_stubber, "PMC1.1/PMC1.1.txt", "Thioacetamide – fibrosis".encode())
+    add_object(s3_stubber, "PMC1.1/PMC1.1.json", b'{"media_urls": []}')
+    storage = tmp_path / "storage"
+    pmc = PMC(storage=storage, figure_storage=tmp_path / "figures")
+
+    assert pmc._get_full_text(ID("PMC1")) == "Thioacetamide – fibrosis"  # noqa: SLF001
+    assert pmc._get_json(ID("PMC1")) == {"media_urls": []}  # noqa: SLF001
+    assert list(storage.iterdir()) == []
+    s3_stubber.assert_no_pending_responses()
+
+
+def test_missing_full_text(s3_stubber: Stubber, tmp_path: Path):
+    """Test that a publication without a full text file is not read."""
+    s3_stubber.add_response(
+        "list_objects_v2",
+        {},
+        {"Bucket": PMC.bucket, "Prefix": "PMC1.1/PMC1.1.txt", "MaxKeys": 1},
+    )
+    pmc = PMC(storage=tmp_path, figure_storage=tmp_path / "figures")
+
+    assert pmc.get_publications([ID("PMC1")]) == []
+
+
+def test_import_does_not_load_boto3():
+    """Test that importing the PMC module does not import boto3 before S3 is used."""
+    code = "import sys, aoptk.literature.databases.pmc; print('boto3' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout  # noqa: S603
+    assert output.strip() == "False"
+
+
+def test_get_publications_leaves_no_download_threads(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Test that the figure download pool is shut down once the publications are retrieved."""
+
+    def mock_json(_self: PMC, publication_id: ID) -> dict:
+        return {"media_urls": [f"https://pmc-oa-opendata.s3.amazonaws.com/{publication_id}.1/f1.png"]}
+
+    monkeypatch.setattr(PMC, "_get_full_text", lambda _self, publication_id: f"full text of {publication_id}")
+    monkeypatch.setattr(PMC, "_get_json", mock_json)
+    monkeypatch.setattr(PMC, "_download", lambda _self, _key, filepath: filepath.touch())
+    threads = threading.active_count()
+    pmc = PMC(storage=tmp_path, figure_storage=tmp_path / "figures", max_workers=4)
+
+    actual = pmc.get_publications([ID("PMC1"), ID("PMC2")])
+
+    assert [publication.id for publication in actual] == [ID("PMC1"), ID("PMC2")]
+    assert threading.active_count() == threads
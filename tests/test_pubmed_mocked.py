@@ -1,6 +1,16 @@
 # ruff: noqa: ANN001
+import datetime as dt
+import threading
+import time
+from email.message import Message
+from pathlib import Path
+from urllib.error import HTTPError
 import pytest
+from Bio import Entrez
+from aoptk.literature.databases.ncbi import NCBI
+from aoptk.literature.databases.pmc import PMC
 from aoptk.literature.databases.pubmed import PubMed
+from aoptk.literature.harvest_checkpoint import HarvestCheckpoint
 from aoptk.literature.id import ID
 from aoptk.literature.query import Query
 
@@ -73,3 +83,187 @@ def test_get_id_list(mock_entrez, tmp_path_factory: pytest.TempPathFactory):
     number_of_expected_ids = 4
     assert len(actual) == number_of_expected_ids
     assert ID("36835489") in actual
+
+
+def test_iter_ids(mock_entrez, tmp_path_factory: pytest.TempPathFactory):
+    """Iterating over IDs yields the same IDs as get_ids."""
+    expected = ["36835489", "37913737", "37891562", "36838959"]
+    mock_entrez.responses[mock_entrez.handles["search"]] = {"Count": "4", "IdList": expected}
+
+    pubmed_instance = PubMed(storage=tmp_path_factory.mktemp("pubmed"), query=Query(search_term="hepg2 methotrexate"))
+    actual = pubmed_instance.iter_ids()
+
+    assert next(actual) == ID("36835489")
+    assert list(actual) == expected[1:]
+    assert pubmed_instance.get_ids() == expected
+
+
+def test_iter_ids_leaves_no_worker_threads(mock_entrez, tmp_path: Path):
+    """Iterating over IDs shuts down the threads of its private event loop."""
+    mock_entrez.responses[mock_entrez.handles["search"]] = {"Count": "2", "IdList": ["36835489", "37913737"]}
+    threads = threading.active_count()
+
+    for _ in range(3):
+        list(PubMed(storage=tmp_path, query=Query(search_term="hepg2 methotrexate")).iter_ids())
+
+    assert threading.active_count() == threads
+
+
+def mock_dense_first_week(search_term, mindate=None, maxdate=None):  # noqa: ARG001
+    """Simulate a search with 5000 hits on each day of the first week of the year and none later."""
+    if mindate is None:
+        return 20000, []
+    first = dt.datetime.strptime(mindate, "%Y/%m/%d").replace(tzinfo=dt.UTC).date()
+    last = dt.datetime.strptime(maxdate, "%Y/%m/%d").replace(tzinfo=dt.UTC).date()
+    first_week = dt.date(first.year, 1, 7)
+    days_in_first_week = max(0, (min(last, first_week) - first).days + 1)
+    return 5000 * days_in_first_week, [mindate] if days_in_first_week else []
+
+
+def test_get_ids_bisects_dense_date_ranges(mocker):
+    """Only date ranges over the result limit are split, down to single days."""
+    current_year = dt.datetime.now(dt.UTC).year
+    mocker.patch.object(NCBI, "minimal_year_publication", current_year)
+    mocker.patch.object(NCBI, "max_requests_per_second", 1000)
+    search = mocker.patch.object(NCBI, "_get_publication_count_and_ids", side_effect=mock_dense_first_week)
+
+    actual = NCBI(database="pubmed").get_ids("hepg2 methotrexate")
+
+    assert sorted(actual, key=str) == [ID(f"{current_year}/01/0{day}") for day in range(1, 8)]
+    max_searches = 40
+    assert search.call_count < max_searches
+
+
+def test_get_ids_resumes_completed_date_ranges(mocker, tmp_path: Path):
+    """Date ranges recorded in the checkpoint are not searched again when resuming."""
+    current_year = dt.datetime.now(dt.UTC).year
+    mocker.patch.object(NCBI, "minimal_year_publication", current_year)
+    mocker.patch.object(NCBI, "max_requests_per_second", 1000)
+    search = mocker.patch.object(NCBI, "_get_publication_count_and_ids", side_effect=mock_dense_first_week)
+    first_day, last_day = dt.date(current_year, 1, 1), dt.date(current_year, 12, 31)
+    first_half = first_day + (last_day - first_day) // 2
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    harvest = HarvestCheckpoint(checkpoint, "hepg2 methotrexate")
+    harvest.record([ID("recorded")], completed=f"{current_year}/01/01-{first_half:%Y/%m/%d}")
+
+    actual = NCBI(database="pubmed").get_ids("hepg2 methotrexate", checkpoint=checkpoint, resume=True)
+
+    assert actual == [ID("recorded")]
+    assert [call.kwargs.get("mindate") for call in search.call_args_list] == [
+        None,
+        f"{first_half + dt.timedelta(days=1):%Y/%m/%d}",
+    ]
+    assert HarvestCheckpoint(checkpoint, "hepg2 methotrexate", resume=True).done
+
+
+def test_batch_requests_run_concurrently_in_order(mocker):
+    """Batches are sent concurrently and the records keep the order of the IDs."""
+    mocker.patch.object(NCBI, "max_requests_per_second", 100)
+    mocker.patch.object(NCBI, "batch_size", 2)
+    in_flight = []
+    max_in_flight = []
+
+    def fetch_batch(_self, batch_ids, func) -> tuple[str, float]:  # noqa: ARG001
+        in_flight.append(batch_ids)
+        max_in_flight.append(len(in_flight))
+        time.sleep(0.05)
+        in_flight.remove(batch_ids)
+        return ",".join(map(str, batch_ids)), 0.0
+
+    mocker.patch.object(NCBI, "_fetch_batch", fetch_batch)
+    mocker.patch.object(NCBI, "max_concurrency", 2)
+    ncbi = NCBI(database="pmc")
+    ids = [ID(str(i)) for i in range(7)]
+
+    assert ncbi.get_publications_metadata_records(ids) == ["0,1", "2,3", "4,5", "6"]
+    assert ncbi.get_abstract_records(ids) == ["0,1", "2,3", "4,5", "6"]
+    assert max(max_in_flight) == ncbi.concurrency
+
+
+def test_batch_retried_on_error(mocker):
+    """A failing batch is retried on its own."""
+    mocker.patch.object(NCBI, "max_requests_per_second", 100)
+    mocker.patch.object(NCBI, "batch_size", 2)
+    failures = [HTTPError("url", 503, "Service unavailable", Message(), None)]
+
+    def fetch_batch(_self, batch_ids, func) -> tuple[str, float]:  # noqa: ARG001
+        if batch_ids[0] == ID("2") and failures:
+            raise failures.pop()
+        return ",".join(map(str, batch_ids)), 0.0
+
+    fetch = mocker.patch.object(NCBI, "_fetch_batch", autospec=True, side_effect=fetch_batch)
+
+    actual = NCBI(database="pmc").get_abstract_records([ID(str(i)) for i in range(4)])
+
+    assert actual == ["0,1", "2,3"]
+    assert fetch.call_count == len(actual) + 1
+
+
+def test_batch_size_adapts_to_response_time():
+    """Batches grow for fast responses and shrink for slow ones, within the limits."""
+    ncbi = NCBI(database="pubmed")
+
+    assert ncbi._next_batch_size(0.0, 0) == NCBI.batch_size  # noqa: SLF001
+    assert ncbi._next_batch_size(2.0, 200) == NCBI.target_batch_seconds * 100  # noqa: SLF001
+    assert ncbi._next_batch_size(0.1, 200) == NCBI.max_batch_size  # noqa: SLF001
+    assert ncbi._next_batch_size(1000.0, 200) == NCBI.min_batch_size  # noqa: SLF001
+
+
+def test_get_abstracts_for_search_pages_history(mock_entrez, mocker, tmp_path: Path):
+    """Abstracts of a search are paged through the History Server without sending IDs."""
+    mocker.patch.object(NCBI, "history_batch_size", 2)
+    mock_entrez.responses[mock_entrez.handles["search"]] = {"Count": "3", "WebEnv": "MCID_1", "QueryKey": "1"}
+    mock_entrez.responses[mock_entrez.handles["fetch"]] = {
+        "PubmedArticle": [
+            {"MedlineCitation": {"PMID": "12345", "Article": {"Abstract": {"AbstractText": ["Test abstract text"]}}}},
+        ],
+    }
+
+    actual = PubMed(storage=tmp_path, query=Query(search_term="hepg2 thioacetamide")).get_abstracts_for_search()
+
+    assert [abstract.text for abstract in actual] == ["Test abstract text", "Test abstract text"]
+    assert mock_entrez.esearch.call_args.kwargs["usehistory"] == "y"
+    assert sorted(call.kwargs["retstart"] for call in mock_entrez.efetch.call_args_list) == [0, 2]
+    assert all(call.kwargs["webenv"] == "MCID_1" for call in mock_entrez.efetch.call_args_list)
+    assert "id" not in mock_entrez.efetch.call_args.kwargs
+
+
+def test_search_history_retried_on_error(mock_entrez, tmp_path: Path):
+    """Storing the search on the History Server is retried like the other NCBI requests."""
+    mock_entrez.responses[mock_entrez.handles["search"]] = {"Count": "0", "WebEnv": "MCID_1", "QueryKey": "1"}
+    mock_entrez.esearch.side_effect = [
+        HTTPError("url", 503, "Service unavailable", Message(), None),
+        mock_entrez.handles["search"],
+    ]
+
+    actual = PubMed(storage=tmp_path, query=Query(search_term="liver")).get_abstracts_for_search()
+
+    assert actual == []
+    assert mock_entrez.esearch.call_count == 2  # noqa: PLR2004
+
+
+def test_pubmed_history_limit(mock_entrez, tmp_path: Path):
+    """PubMed searches above the History Server limit are refused."""
+    mock_entrez.responses[mock_entrez.handles["search"]] = {"Count": "20000", "WebEnv": "MCID_1", "QueryKey": "1"}
+
+    with pytest.raises(ValueError):
+        PubMed(storage=tmp_path, query=Query(search_term="liver")).get_publications_metadata_for_search()
+
+
+@pytest.mark.parametrize(("api_key", "expected"), [("key", 10), (None, 3)])
+def test_rate_follows_api_key(monkeypatch: pytest.MonkeyPatch, api_key, expected):
+    """The request rate and concurrency follow the NCBI limit for requests with and without an API key."""
+    monkeypatch.setattr(Entrez, "api_key", api_key)
+
+    ncbi = NCBI(database="pubmed")
+
+    assert ncbi.limiter.min_interval == pytest.approx(1 / expected)
+    assert ncbi.concurrency == expected
+
+
+def test_limiter_shared_by_pubmed_and_pmc(tmp_path: Path):
+    """PubMed and PMC clients of one process draw from the same rate limit."""
+    pubmed = PubMed(storage=tmp_path)
+    pmc = PMC(storage=tmp_path / "pmc", figure_storage=tmp_path / "figures")
+
+    assert pubmed._ncbi.limiter is pmc._ncbi.limiter  # noqa: SLF001
@@ -0,0 +1,102 @@
+from __future__ import annotations
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+from aoptk.response_cache import ResponseCache
+from aoptk.text_generation_api import TextGenerationAPI
+
+
+def test_cached_response_persists(tmp_path: Path):
+    """Test that a stored response is found again after reopening the cache."""
+    key = ResponseCache.key(model="gpt-oss-120b", messages=[{"role": "user", "content": "text"}])
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    assert cache.get(key) is None
+    cache.put(key, "causation")
+    cache.close()
+
+    reopened = ResponseCache(tmp_path / "cache.sqlite")
+
+    assert reopened.get(key) == "causation"
+    assert (reopened.hits, reopened.misses) == (1, 0)
+
+
+def test_key_depends_on_request():
+    """Test that the key changes with any request parameter and not with their order."""
+    key = ResponseCache.key(model="a", temperature=0, messages=[{"content": "text"}])
+
+    assert key == ResponseCache.key(messages=[{"content": "text"}], temperature=0, model="a")
+    assert key != ResponseCache.key(model="a", temperature=0.5, messages=[{"content": "text"}])
+    assert key != ResponseCache.key(model="a", temperature=0, messages=[{"content": "other text"}])
+
+
+def test_least_recently_used_evicted(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that the least recently used entries are evicted over the size limit."""
+    now = [0.0]
+    monkeypatch.setattr("aoptk.response_cache.time.time", lambda: now[0])
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_entries=2)
+    for key in ("a", "b"):
+        now[0] += 1
+        cache.put(key, key)
+    now[0] += 1
+    cache.get("a")
+    now[0] += 1
+    cache.put("c", "c")
+
+    assert [cache.get(key) for key in ("a", "b", "c")] == ["a", None, "c"]
+    assert len(cache) == len(["a", "c"])
+
+
+def test_expired_entries_are_misses(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that entries older than the maximum age are not returned."""
+    now = [0.0]
+    monkeypatch.setattr("aoptk.response_cache.time.time", lambda: now[0])
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_age=60)
+    cache.put("a", "a")
+    now[0] = 61
+
+    assert cache.get("a") is None
+    assert cache.misses == 1
+    assert len(cache) == 0
+
+
+def test_prompt_uses_cache(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Test that a repeated prompt is answered from the cache without calling the API."""
+    calls = []
+
+    def create(**kwargs: object) -> SimpleNamespace:
+        calls.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=" causation\n"))])
+
+    api = TextGenerationAPI(api_key="test")
+    monkeypatch.setattr(
+        api,
+        "client",
+        SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))),
+    )
+    api.response_cache = ResponseCache(tmp_path / "cache.sqlite")
+
+    assert api._prompt("text") == "causation"  # noqa: SLF001
+    assert api._prompt("text") == "causation"  # noqa: SLF001
+    assert api._prompt("other text") == "causation"  # noqa: SLF001
+    assert len(calls) == len(["text", "other text"])
+    assert (api.response_cache.hits, api.response_cache.misses) == (1, 2)
+
+
+def test_uses_of_hits_written_on_close(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that the uses of hits recorded in memory still decide the eviction after reopening."""
+    now = [0.0]
+    monkeypatch.setattr("aoptk.response_cache.time.time", lambda: now[0])
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_entries=2)
+    for key in ("a", "b"):
+        now[0] += 1
+        cache.put(key, key)
+    now[0] += 1
+    cache.get("a")
+    cache.close()
+
+    reopened = ResponseCache(tmp_path / "cache.sqlite", max_entries=2)
+    now[0] += 1
+    reopened.put("c", "c")
+
+    assert [reopened.get(key) for key in ("a", "b", "c")] == ["a", None, "c"]
+    assert len(reopened) == len(["a", "c"])
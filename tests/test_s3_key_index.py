@@ -0,0 +1,111 @@
+from __future__ import annotations
+from pathlib import Path
+import boto3
+import pytest
+from botocore import UNSIGNED
+from botocore.client import Config
+from botocore.stub import Stubber
+from aoptk.literature.databases.pmc import PMC
+from aoptk.literature.databases.s3_key_index import S3KeyIndex
+
+# ruff: noqa: PLR2004
+# ruff: noqa: SLF001
+
+bucket = "pmc-oa-opendata"
+
+
+@pytest.fixture
+def s3():
+    """Provide an S3 client whose responses are stubbed."""
+    client = boto3.client("s3", config=Config(signature_version=UNSIGNED), region_name="us-east-1")
+    with Stubber(client) as stubber:
+        yield client, stubber
+
+
+def listing(keys: list[str], next_token: str | None = None) -> dict:
+    """Build a list_objects_v2 response with the given keys."""
+    response = {"Contents": [{"Key": key} for key in keys], "IsTruncated": bool(next_token)}
+    if next_token:
+        response["NextContinuationToken"] = next_token
+    return response
+
+
+def test_refresh_lists_all_pages(s3: tuple, tmp_path: Path):
+    """Test that the keys of all listed pages are found in the index."""
+    client, stubber = s3
+    stubber.add_response("list_objects_v2", listing(["PMC1.1/PMC1.1.json"], "token"), {"Bucket": bucket, "Prefix": ""})
+    stubber.add_response(
+        "list_objects_v2",
+        listing(["PMC1.1/PMC1.1.txt"]),
+        {"Bucket": bucket, "Prefix": "", "ContinuationToken": "token"},
+    )
+    index = S3KeyIndex(tmp_path / "index.sqlite", bucket)
+
+    assert index.refresh(client.get_paginator("list_objects_v2")) == 2
+    assert index.covers("PMC2.1/PMC2.1.txt")
+    assert index.find("PMC1.1/PMC1.1.txt") == "PMC1.1/PMC1.1.txt"
+    assert index.find("PMC2.1/PMC2.1.txt") is None
+
+
+def test_refresh_continues_after_last_key(s3: tuple, tmp_path: Path):
+    """Test that a later refresh only lists the keys after the previously listed ones."""
+    client, stubber = s3
+    stubber.add_response("list_objects_v2", listing(["PMC12.1/PMC12.1.txt"]), {"Bucket": bucket, "Prefix": "PMC1"})
+    stubber.add_response(
+        "list_objects_v2",
+        listing(["PMC13.1/PMC13.1.txt"]),
+        {"Bucket": bucket, "Prefix": "PMC1", "StartAfter": "PMC12.1/PMC12.1.txt"},
+    )
+    index = S3KeyIndex(tmp_path / "index.sqlite", bucket)
+    index.refresh(client.get_paginator("list_objects_v2"), "PMC1")
+
+    assert index.refresh(client.get_paginator("list_objects_v2"), "PMC1") == 1
+    assert index.find("PMC12.1/PMC12.1.txt") == "PMC12.1/PMC12.1.txt"
+    assert index.find("PMC13.1/PMC13.1.txt") == "PMC13.1/PMC13.1.txt"
+
+
+def test_index_persists(s3: tuple, tmp_path: Path):
+    """Test that a reopened index covers the prefixes listed before."""
+    client, stubber = s3
+    stubber.add_response("list_objects_v2", listing(["PMC1.1/PMC1.1.txt"]), {"Bucket": bucket, "Prefix": "PMC1"})
+    path = tmp_path / "index.sqlite"
+    S3KeyIndex(path, bucket).refresh(client.get_paginator("list_objects_v2"), "PMC1")
+
+    index = S3KeyIndex(path, bucket)
+
+    assert index.covers("PMC1.1/PMC1.1.txt")
+    assert not index.covers("PMC2.1/PMC2.1.txt")
+    assert index.find("PMC1.1/PMC1.1.txt") == "PMC1.1/PMC1.1.txt"
+
+
+def test_pmc_uses_index_instead_of_listing(s3: tuple, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that PMC finds files in a covering key index without listing the bucket."""
+    client, stubber = s3
+    stubber.add_response("list_objects_v2", listing(["PMC1.1/PMC1.1.txt"]), {"Bucket": bucket, "Prefix": "PMC1.1/"})
+    monkeypatch.setattr(PMC, "s3", client)
+    pmc = PMC(storage=tmp_path, figure_storage=tmp_path / "figures", key_index=tmp_path / "index.sqlite")
+    pmc.refresh_key_index("PMC1.1/")
+
+    assert pmc._find_key("PMC1.1/PMC1.1.txt") == "PMC1.1/PMC1.1.txt"
+    assert pmc._find_key("PMC1.1/PMC1.1.pdf") is None
+    stubber.assert_no_pending_responses()
+
+
+def test_refresh_without_index(tmp_path: Path):
+    """Test that refreshing fails when PMC has no key index."""
+    with pytest.raises(ValueError):
+        PMC(storage=tmp_path, figure_storage=tmp_path / "figures").refresh_key_index()
+
+
+def test_find_key_falls_back_to_listing(s3: tuple, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that PMC lists the bucket for prefixes the key index does not cover."""
+    client, stubber = s3
+    stubber.add_response(
+        "list_objects_v2",
+        listing(["PMC2.1/PMC2.1.txt"]),
+        {"Bucket": bucket, "Prefix": "PMC2.1/PMC2.1.txt", "MaxKeys": 1},
+    )
+    monkeypatch.setattr(PMC, "s3", client)
+    pmc = PMC(storage=tmp_path, figure_storage=tmp_path / "figures", key_index=tmp_path / "index.sqlite")
+
+    assert pmc._find_key("PMC2.1/PMC2.1.txt") == "PMC2.1/PMC2.1.txt"
@@ -0,0 +1,206 @@
+from __future__ import annotations
+import json
+import threading
+from collections.abc import Iterator
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+import pytest
+from aoptk.chemical import Chemical
+from aoptk.effect import Effect
+from aoptk.relationships.relationship_type import Causative
+from aoptk.response_cache import ResponseCache
+from aoptk.text_generation_api import LLMFailureError
+from aoptk.text_generation_api import TextGenerationAPI
+from aoptk.text_generation_batch import BatchFailureError
+from aoptk.text_generation_batch import TextGenerationBatch
+
+
+class BatchServer(ThreadingHTTPServer):
+    """Local stand-in for the Files and Batches endpoints of the OpenAI API."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), BatchHandler)
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict] = {}
+        self.failing_batches: set[str] = set()
+
+    def answer(self, request: dict) -> dict:
+        """Answer a request of a batch, failing the prompts about carbon."""
+        content = request["body"]["messages"][0]["content"]
+        if "carbon" in content:
+            return {"custom_id": request["custom_id"], "response": {"status_code": 500, "body": {}}}
+        if content.startswith("Task:\nExtract chemical entities"):
+            answer = "Thioacetamide ; Silymarin"
+        elif "chemical thioacetamide" in content:
+            answer = "causation"
+        else:
+            answer = "no causation"
+        body = {"choices": [{"message": {"role": "assistant", "content": answer}}]}
+        return {"custom_id": request["custom_id"], "response": {"status_code": 200, "body": body}}
+
+
+class BatchHandler(BaseHTTPRequestHandler):
+    """Request handler of the stand-in server."""
+
+    server: BatchServer
+
+    def log_message(self, *_args: object) -> None:
+        """Keep the test output quiet."""
+
+    def _send(self, payload: dict | bytes) -> None:
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _batch(self, batch_id: str) -> dict:
+        return {"object": "batch", "created_at": 0} | self.server.batches[batch_id]
+
+    def do_POST(self) -> None:
+        """Upload a file or create a batch."""
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path == "/v1/files":
+            header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+            message = BytesParser(policy=HTTP).parsebytes(header + body)
+            file_id = f"file-{len(self.server.files)}"
+            for part in message.iter_parts():
+                payload = part.get_payload(decode=True)
+                if part.get_param("name", header="content-disposition") == "file" and isinstance(payload, bytes):
+                    self.server.files[file_id] = payload
+            file = {"id": file_id, "object": "file", "bytes": len(body), "created_at": 0, "filename": "batch.jsonl"}
+            self._send(file | {"purpose": "batch", "status": "processed"})
+        elif self.path == "/v1/batches":
+            batch_id = f"batch-{len(self.server.batches)}"
+            self.server.batches[batch_id] = {"id": batch_id, "status": "in_progress", **json.loads(body)}
+            self._send(self._batch(batch_id))
+
+    def do_GET(self) -> None:
+        """Poll a batch, finishing it on the second poll, or download a file."""
+        if self.path.startswith("/v1/batches/"):
+            batch = self.server.batches[self.path.rsplit("/", 1)[1]]
+            if batch["status"] == "in_progress":
+                batch["status"] = "finalizing"
+            elif batch["id"] in self.server.failing_batches:
+                batch["status"] = "failed"
+            elif batch["status"] == "finalizing":
+                requests = self.server.files[batch["input_file_id"]].decode().splitlines()
+                output = "\n".join(json.dumps(self.server.answer(json.loads(line))) for line in requests)
+                batch["output_file_id"] = f"file-{len(self.server.files)}"
+                self.server.files[batch["output_file_id"]] = output.encode()
+                batch["status"] = "completed"
+            self._send(self._batch(batch["id"]))
+        elif self.path.endswith("/content"):
+            self._send(self.server.files[self.path.split("/")[-2]])
+
+
+@pytest.fixture
+def batch_server() -> Iterator[BatchServer]:
+    """Run the stand-in server on a free local port."""
+    server = BatchServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def text_generation(batch_server: BatchServer) -> TextGenerationAPI:
+    """Text generation API pointed at the stand-in server."""
+    return TextGenerationAPI(url=f"http://127.0.0.1:{batch_server.server_port}/v1", api_key="test")
+
+
+def test_batch_maps_results_back(
+    monkeypatch: pytest.MonkeyPatch,
+    batch_server: BatchServer,
+    text_generation: TextGenerationAPI,
+    tmp_path: Path,
+):
+    """Queued prompts are submitted in batches and their responses are parsed into chemicals and relationships."""
+    monkeypatch.setattr(TextGenerationBatch, "poll_interval", 0)
+    monkeypatch.setattr(TextGenerationBatch, "max_requests_per_batch", 2)
+    text = "Thioacetamide induced liver fibrosis, silymarin did not."
+    batch = TextGenerationBatch(text_generation, tmp_path)
+
+    chemicals = batch.find_chemicals(text)
+    relationships = batch.find_relationships_in_text(
+        text=text,
+        chemicals=[Chemical(name="thioacetamide"), Chemical(name="silymarin")],
+        effects=[Effect(name="liver fibrosis")],
+        relationship_types=[Causative()],
+    )
+    failed = batch.find_relationships_in_text(
+        text=text,
+        chemicals=[Chemical(name="carbon")],
+        effects=[Effect(name="liver fibrosis")],
+        relationship_types=[Causative()],
+    )
+    batch.run()
+
+    assert len(batch_server.batches) == 2  # noqa: PLR2004
+    assert [chemical.name for chemical in chemicals.result()] == ["thioacetamide", "silymarin"]
+    assert [(r.chemical.name, r.relationship_type) for r in relationships.result()] == [
+        ("thioacetamide", "causation"),
+        ("silymarin", "no causation"),
+    ]
+    with pytest.raises(LLMFailureError):
+        failed.result()
+
+
+def test_batch_skips_cached_prompts(
+    monkeypatch: pytest.MonkeyPatch,
+    batch_server: BatchServer,
+    text_generation: TextGenerationAPI,
+    tmp_path: Path,
+):
+    """Prompts answered by the response cache are not submitted again."""
+    monkeypatch.setattr(TextGenerationBatch, "poll_interval", 0)
+    text_generation.response_cache = ResponseCache(tmp_path / "cache.sqlite")
+    first = TextGenerationBatch(text_generation, tmp_path / "first")
+    first.find_chemicals("Thioacetamide.")
+    first.run()
+
+    second = TextGenerationBatch(text_generation, tmp_path / "second")
+    chemicals = second.find_chemicals("Thioacetamide.")
+
+    assert len(second) == 0
+    second.run()
+    assert len(batch_server.batches) == 1
+    assert [chemical.name for chemical in chemicals.result()] == ["thioacetamide", "silymarin"]
+    text_generation.response_cache.close()
+
+
+def test_batch_keeps_responses_of_other_batches_on_failure(
+    monkeypatch: pytest.MonkeyPatch,
+    batch_server: BatchServer,
+    text_generation: TextGenerationAPI,
+    tmp_path: Path,
+):
+    """A failed batch does not lose the responses of the batches collected before or after it."""
+    monkeypatch.setattr(TextGenerationBatch, "poll_interval", 0)
+    monkeypatch.setattr(TextGenerationBatch, "max_requests_per_batch", 1)
+    batch_server.failing_batches.add("batch-1")
+    text_generation.response_cache = ResponseCache(tmp_path / "cache.sqlite")
+    batch = TextGenerationBatch(text_generation, tmp_path)
+    first = batch.find_chemicals("Thioacetamide.")
+    failed = batch.find_chemicals("Silymarin.")
+    last = batch.find_chemicals("Acetaminophen.")
+
+    with pytest.raises(BatchFailureError):
+        batch.run()
+
+    assert len(batch) == 0
+    assert [chemical.name for chemical in first.result()] == ["thioacetamide", "silymarin"]
+    assert [chemical.name for chemical in last.result()] == ["thioacetamide", "silymarin"]
+    with pytest.raises(LLMFailureError):
+        failed.result()
+    again = TextGenerationBatch(text_generation, tmp_path / "again")
+    again.find_chemicals("Thioacetamide.")
+    again.find_chemicals("Acetaminophen.")
+    assert len(again) == 0
+    text_generation.response_cache.close()
@@ -0,0 +1,342 @@
+from __future__ import annotations
+import asyncio
+import os
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+import pytest
+from openai import RateLimitError
+from aoptk.adaptive_concurrency import AdaptiveConcurrencyLimiter
+from aoptk.async_text_generation_api import AsyncTextGenerationAPI
+from aoptk.chemical import Chemical
+from aoptk.effect import Effect
+from aoptk.relationships.relationship import Relationship
+from aoptk.relationships.relationship_type import Causative
+from aoptk.relationships.relationship_type import Inhibitive
+from aoptk.relationships.relationship_type import RelationshipType
+from aoptk.text_generation_api import LLMFailureError
+from aoptk.text_generation_api import TextGenerationAPI
+
+
+def test_find_relationships_in_text_concurrently(monkeypatch: pytest.MonkeyPatch):
+    """Relationships are classified concurrently and returned in the order of the pairs."""
+    barrier = threading.Barrier(4, timeout=5)
+
+    def mock_relationship_prompt(
+        _self: TextGenerationAPI,
+        _text: str,
+        chemical: Chemical,
+        _effect: Effect,
+        relationship_type: RelationshipType,
+    ) -> str:
+        barrier.wait()
+        return relationship_type.positive if chemical.name == "thioacetamide" else relationship_type.negative
+
+    monkeypatch.setattr(TextGenerationAPI, "_relationship_prompt", mock_relationship_prompt)
+    api = TextGenerationAPI(api_key="test", max_workers=4)
+
+    actual = api.find_relationships_in_text(
+        text="Thioacetamide induced liver fibrosis, silymarin did not.",
+        chemicals=[Chemical(name="thioacetamide"), Chemical(name="silymarin")],
+        effects=[Effect(name="liver fibrosis")],
+        relationship_types=[Causative(), Inhibitive()],
+    )
+
+    assert [(r.chemical.name, r.relationship_type) for r in actual] == [
+        ("thioacetamide", Causative().positive),
+        ("thioacetamide", Inhibitive().positive),
+        ("silymarin", Causative().negative),
+        ("silymarin", Inhibitive().negative),
+    ]
+
+
+def test_find_relationships_in_text_batched(monkeypatch: pytest.MonkeyPatch):
+    """All chemicals are classified in one prompt per effect and relationship type."""
+    prompts = []
+
+    def mock_prompt(_self: TextGenerationAPI, content: str) -> str:
+        prompts.append(content)
+        return "thioacetamide : causation\nsilymarin : no causation\nethanol : causation\ncarbon : none"
+
+    monkeypatch.setattr(TextGenerationAPI, "_prompt", mock_prompt)
+    monkeypatch.setattr(TextGenerationAPI, "batch_relationship_prompts", True)
+    text = "Thioacetamide induced liver fibrosis, silymarin did not."
+    thioacetamide = Chemical(name="Thioacetamide")
+
+    actual = TextGenerationAPI(api_key="test").find_relationships_in_text(
+        text=text,
+        chemicals=[thioacetamide, Chemical(name="silymarin"), Chemical(name="carbon")],
+        effects=[Effect(name="liver fibrosis")],
+        relationship_types=[Causative()],
+    )
+
+    assert len(prompts) == 1
+    assert prompts[0].count(text) == 1
+    assert "silymarin\n" in prompts[0]
+    assert [(r.chemical.name, r.relationship_type, r.context) for r in actual] == [
+        ("Thioacetamide", "causation", text),
+        ("silymarin", "no causation", text),
+    ]
+    assert actual[0].chemical is thioacetamide
+
+
+def test_user_template_dir_overrides_prompt(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Templates in user template directories take precedence over the packaged prompts."""
+    (tmp_path / "chemical_prompt.txt").write_text("Custom prompt: {{ text }}", encoding="utf-8")
+    monkeypatch.setattr(TextGenerationAPI, "template_dirs", (tmp_path,))
+    api = TextGenerationAPI(api_key="test")
+
+    assert api._render_prompt("chemical_prompt.txt", text="liver") == "Custom prompt: liver"  # noqa: SLF001
+    packaged = api._render_prompt("find_relevant_publications_prompt.txt", question="liver")  # noqa: SLF001
+    assert "question with YES or NO:\nliver" in packaged
+
+
+def test_reload_edited_template(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Edited templates are picked up when reloading is enabled."""
+    template = tmp_path / "prompt.txt"
+    template.write_text("first {{ text }}", encoding="utf-8")
+    monkeypatch.setattr(TextGenerationAPI, "template_dirs", (tmp_path,))
+    monkeypatch.setattr(TextGenerationAPI, "reload_templates", True)
+    api = TextGenerationAPI(api_key="test")
+    assert api._render_prompt("prompt.txt", text="liver") == "first liver"  # noqa: SLF001
+
+    template.write_text("second {{ text }}", encoding="utf-8")
+    os.utime(template, (template.stat().st_mtime + 10,) * 2)
+
+    assert api._render_prompt("prompt.txt", text="liver") == "second liver"  # noqa: SLF001
+
+
+def test_render_prompt_does_not_resolve_template_dirs_again(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """The template directories are only resolved when their registry is created."""
+    (tmp_path / "prompt.txt").write_text("cached {{ text }}", encoding="utf-8")
+    monkeypatch.setattr(TextGenerationAPI, "template_dirs", (tmp_path,))
+    api = TextGenerationAPI(api_key="test")
+    assert api._render_prompt("prompt.txt", text="liver") == "cached liver"  # noqa: SLF001
+
+    monkeypatch.setattr(Path, "resolve", lambda _self: pytest.fail("template directory resolved again"))
+
+    assert api._render_prompt("prompt.txt", text="liver") == "cached liver"  # noqa: SLF001
+
+
+def test_async_find_relationships_in_text_limits_completions_in_flight(monkeypatch: pytest.MonkeyPatch):
+    """Completions are sent concurrently up to the shared limit and returned in the order of the triples."""
+    in_flight = [0]
+
+    async def mock_create(messages: list[dict], **_kwargs: object) -> SimpleNamespace:
+        in_flight.append(in_flight[-1] + 1)
+        await asyncio.sleep(0.01)
+        in_flight.append(in_flight[-1] - 1)
+        content = "causation" if "chemical thioacetamide" in messages[0]["content"] else "no causation"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    async def classify() -> list[list[Relationship]]:
+        limiter = asyncio.Semaphore(2)
+        first = AsyncTextGenerationAPI(api_key="test", limiter=limiter)
+        second = AsyncTextGenerationAPI(api_key="test", limiter=limiter)
+        for api in (first, second):
+            client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=mock_create)))
+            monkeypatch.setattr(api, "async_client", client)
+        return await asyncio.gather(
+            *(
+                api.async_find_relationships_in_text(
+                    text="Thioacetamide induced liver fibrosis.",
+                    chemicals=[Chemical(name="thioacetamide"), Chemical(name="silymarin")],
+                    effects=[Effect(name="liver fibrosis"), Effect(name="steatosis")],
+                    relationship_types=[Causative()],
+                )
+                for api in (first, second)
+            ),
+        )
+
+    for actual in asyncio.run(classify()):
+        assert [(r.chemical.name, r.effect.name, r.relationship_type) for r in actual] == [
+            ("thioacetamide", "liver fibrosis", "causation"),
+            ("thioacetamide", "steatosis", "causation"),
+            ("silymarin", "liver fibrosis", "no causation"),
+            ("silymarin", "steatosis", "no causation"),
+        ]
+    assert max(in_flight) == 2  # noqa: PLR2004
+
+
+def test_async_methods_mirror_sync_methods(monkeypatch: pytest.MonkeyPatch):
+    """The coroutines parse the responses like their synchronous counterparts."""
+    responses = iter(["Thioacetamide ; Silymarin", "YES", "page one", "page two"])
+
+    async def mock_create(**_kwargs: object) -> SimpleNamespace:
+        await asyncio.sleep(0)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=next(responses)))])
+
+    async def run() -> tuple:
+        api = AsyncTextGenerationAPI(api_key="test")
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=mock_create)))
+        monkeypatch.setattr(api, "async_client", client)
+        return (
+            await api.async_find_chemicals("Thioacetamide and silymarin."),
+            await api.async_find_relevant_publications("Is it about the liver?", "Liver fibrosis."),
+            await api.async_convert_pdf_scans(["cGFnZSBvbmU=", "cGFnZSB0d28="], mime_type="image/png"),
+        )
+
+    chemicals, relevant, pages = asyncio.run(run())
+
+    assert [chemical.name for chemical in chemicals] == ["thioacetamide", "silymarin"]
+    assert relevant is True
+    assert pages == ["page one", "page two"]
+
+
+def _completion(content: str | None) -> SimpleNamespace:
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_prompt_retries_rate_limiting_and_backs_off(monkeypatch: pytest.MonkeyPatch):
+    """Rate limited requests are retried and cut the limit of requests in flight."""
+    response: Any = SimpleNamespace(status_code=429, request=None, headers={})
+    replies: Iterator[Exception | SimpleNamespace] = iter(
+        [
+            RateLimitError("Too many requests", response=response, body=None),
+            _completion(None),
+            _completion("yes"),
+        ],
+    )
+
+    def mock_create(**_kwargs: object) -> SimpleNamespace:
+        reply = next(replies)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, latency_tolerance=float("inf"))
+    monkeypatch.setattr(TextGenerationAPI, "retry_wait", 0)
+    monkeypatch.setattr(TextGenerationAPI, "concurrency_limiter", limiter)
+    api = TextGenerationAPI(api_key="test")
+    monkeypatch.setattr(
+        api,
+        "client",
+        SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=mock_create))),
+    )
+
+    assert api.find_relevant_publications("Is it about the liver?", "Liver fibrosis.") is True
+    assert limiter.limit == 4  # noqa: PLR2004
+    assert limiter.in_flight == 0
+
+
+def test_prompt_gives_up_after_max_attempts(monkeypatch: pytest.MonkeyPatch):
+    """Empty responses are retried up to the maximum number of attempts."""
+    attempts = []
+
+    def mock_create(**_kwargs: object) -> SimpleNamespace:
+        attempts.append(1)
+        return _completion("")
+
+    monkeypatch.setattr(TextGenerationAPI, "retry_wait", 0)
+    monkeypatch.setattr(TextGenerationAPI, "max_attempts", 3)
+    api = TextGenerationAPI(api_key="test")
+    monkeypatch.setattr(
+        api,
+        "client",
+        SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=mock_create))),
+    )
+
+    with pytest.raises(LLMFailureError):
+        api.find_chemicals("Thioacetamide.")
+    assert len(attempts) == 3  # noqa: PLR2004
+
+
+def test_find_chemicals_in_chunks(monkeypatch: pytest.MonkeyPatch):
+    """Chunks of a long text are searched concurrently and the chemicals are merged without duplicates."""
+    barrier = threading.Barrier(3, timeout=5)
+
+    def mock_find_chemicals_in_chunk(_self: TextGenerationAPI, chunk: str) -> list[Chemical]:
+        barrier.wait()
+        return [Chemical(name=word.strip(".").lower()) for word in chunk.split() if word[0].isupper()]
+
+    monkeypatch.setattr(TextGenerationAPI, "_find_chemicals_in_chunk", mock_find_chemicals_in_chunk)
+    monkeypatch.setattr(TextGenerationAPI, "max_chunk_tokens", 10)
+    api = TextGenerationAPI(api_key="test", max_workers=3)
+
+    actual = api.find_chemicals(
+        "Thioacetamide was dosed.\n\nSilymarin and Thioacetamide were mixed.\n\nEthanol and Silymarin too.",
+    )
+
+    assert [chemical.name for chemical in actual] == ["thioacetamide", "silymarin", "ethanol"]
+
+
+def test_find_chemicals_keeps_text_whole_by_default(monkeypatch: pytest.MonkeyPatch):
+    """Without `max_chunk_tokens`, the text is searched in one piece, untouched."""
+    chunks = []
+
+    def mock_find_chemicals_in_chunk(_self: TextGenerationAPI, chunk: str) -> list[Chemical]:
+        chunks.append(chunk)
+        return []
+
+    monkeypatch.setattr(TextGenerationAPI, "_find_chemicals_in_chunk", mock_find_chemicals_in_chunk)
+    api = TextGenerationAPI(api_key="test")
+    text = "Thioacetamide  was dosed.\n\n" * 5000
+
+    api.find_chemicals(text)
+
+    assert chunks == [text]
+
+
+def test_find_relationships_in_text_skips_pairs_not_mentioned_together(monkeypatch: pytest.MonkeyPatch):
+    """Only chemicals and effects mentioned together are classified, in the context of their sentences."""
+    prompts = []
+
+    def mock_relationship_prompt(
+        _self: TextGenerationAPI,
+        text: str,
+        chemical: Chemical,
+        effect: Effect,
+        relationship_type: RelationshipType,
+    ) -> str:
+        prompts.append((text, chemical.name, effect.name))
+        return relationship_type.positive
+
+    monkeypatch.setattr(TextGenerationAPI, "_relationship_prompt", mock_relationship_prompt)
+    monkeypatch.setattr(TextGenerationAPI, "cooccurrence_window", 0)
+    text = "Thioacetamide induced liver fibrosis. Silymarin was given orally. Ethanol caused steatosis."
+
+    actual = TextGenerationAPI(api_key="test").find_relationships_in_text(
+        text=text,
+        chemicals=[Chemical(name="thioacetamide"), Chemical(name="silymarin"), Chemical(name="ethanol")],
+        effects=[Effect(name="liver fibrosis"), Effect(name="steatosis")],
+        relationship_types=[Causative()],
+    )
+
+    assert prompts == [
+        ("Thioacetamide induced liver fibrosis.", "thioacetamide", "liver fibrosis"),
+        ("Ethanol caused steatosis.", "ethanol", "steatosis"),
+    ]
+    assert [(r.chemical.name, r.effect.name, r.context) for r in actual] == [
+        ("thioacetamide", "liver fibrosis", "Thioacetamide induced liver fibrosis."),
+        ("ethanol", "steatosis", "Ethanol caused steatosis."),
+    ]
+
+
+def test_async_api_runs_in_several_event_loops(monkeypatch: pytest.MonkeyPatch):
+    """The default limiter of an instance works in every event loop the instance is used in."""
+
+    async def mock_create(**_kwargs: object) -> SimpleNamespace:
+        await asyncio.sleep(0.001)
+        return _completion("causation")
+
+    api = AsyncTextGenerationAPI(api_key="test")
+    api.max_concurrency = 2
+    monkeypatch.setattr(
+        api,
+        "async_client",
+        SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=mock_create))),
+    )
+    chemicals = [Chemical(name=f"chemical {index}") for index in range(40)]
+
+    for _ in range(2):
+        actual = asyncio.run(
+            api.async_find_relationships_in_text(
+                text="Thioacetamide induced liver fibrosis.",
+                chemicals=chemicals,
+                effects=[Effect(name="liver fibrosis")],
+                relationship_types=[Causative()],
+            ),
+        )
+        assert len(actual) == len(chemicals)
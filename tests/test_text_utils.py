@@ -1,4 +1,6 @@
 import pytest
+from aoptk.text_utils import CHARS_PER_TOKEN
+from aoptk.text_utils import chunk_text
 from aoptk.text_utils import contains_any
 from aoptk.text_utils import ends
 from aoptk.text_utils import endswith_digit
@@ -89,3 +91,24 @@ def test_contains_any(text: str, patterns: list[str], output: bool):
     """Test identifying formatting artifacts."""
     actual = contains_any(text, patterns)
     assert actual == output
+
+
+def test_chunk_text_packs_whole_paragraphs():
+    """Paragraphs are packed into chunks whole while they fit the budget."""
+    text = "Introduction\n\nThioacetamide is toxic.\n\n  \n\nSilymarin is protective."
+
+    assert chunk_text(text, 10) == ["Introduction\n\nThioacetamide is toxic.", "Silymarin is protective."]
+    assert chunk_text(text, 1000) == [text.replace("\n\n  \n\n", "\n\n")]
+    assert chunk_text("", 10) == []
+
+
+def test_chunk_text_splits_long_paragraphs():
+    """Paragraphs over the budget are split into sentences and sentences over the budget are cut."""
+    max_tokens = 10
+    text = "Thioacetamide caused fibrosis. Silymarin reduced it. " + "x" * 100
+
+    chunks = chunk_text(text, max_tokens)
+
+    assert chunks[:2] == ["Thioacetamide caused fibrosis.", "Silymarin reduced it."]
+    assert "".join(chunks[2:]) == "x" * 100
+    assert all(len(chunk) <= max_tokens * CHARS_PER_TOKEN for chunk in chunks)
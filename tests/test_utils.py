@@ -1,7 +1,11 @@
+import asyncio
 import shutil
+import threading
+import time
 from pathlib import Path
 import pytest
 from aoptk.literature.id import ID
+from aoptk.literature.utils import RequestLimiter
 from aoptk.literature.utils import convert_image_format
 from aoptk.literature.utils import remove_pmc_prefix
 
@@ -42,3 +46,39 @@ def test_remove_pmc_prefix():
     expected = [ID("12345"), ID("67890")]
     actual = remove_pmc_prefix(ids)
     assert actual == expected
+
+
+def test_request_limiter_spaces_requests():
+    """Test that the thread-safe request limiter enforces the minimal interval between requests."""
+    limiter = RequestLimiter(requests_per_second=20)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.wait_turn()
+    assert time.monotonic() - start >= 4 * limiter.min_interval
+
+
+def test_request_limiter_allows_burst():
+    """Test that a burst passes immediately and later requests are spaced by the rate."""
+    limiter = RequestLimiter(requests_per_second=10, burst=3)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.wait_turn()
+    burst_duration = time.monotonic() - start
+    limiter.wait_turn()
+    assert burst_duration < limiter.min_interval
+    assert time.monotonic() - start >= 0.9 * limiter.min_interval
+
+
+def test_request_limiter_shared_by_threads_and_asyncio():
+    """Test that threads and asyncio tasks draw from the same bucket."""
+    limiter = RequestLimiter(requests_per_second=20)
+
+    async def wait_turns() -> None:
+        await asyncio.gather(*(limiter.async_wait_turn() for _ in range(2)))
+
+    start = time.monotonic()
+    thread = threading.Thread(target=lambda: [limiter.wait_turn() for _ in range(2)])
+    thread.start()
+    asyncio.run(wait_turns())
+    thread.join()
+    assert time.monotonic() - start >= 3 * limiter.min_interval